@@ -0,0 +1,9 @@
+"""Benchmarks for loading and processing alignment data.
+
+These use synthetic data at the scale of the real corpora, generated
+locally: see fixtures.py. Run them with
+
+    $ python -m benchmarks.run --size nt
+
+See run.py for options.
+"""
@@ -0,0 +1,201 @@
+"""Generate synthetic alignment data for benchmarks.
+
+The data has the same formats and roughly the same sizes as the real
+corpora, but the content is random (with a fixed seed, so it's
+reproducible):
+
+- 'nt': SBLGNT-sized source (~137k tokens) with a BSB-sized target
+  (~200k tokens)
+- 'ot': WLCM-sized source (~475k tokens) with a target ~1.4x larger
+- 'small': a few hundred verses, for quick checks
+
+Data is written once to a directory under the system temporary
+directory and reused.
+
+>>> from benchmarks import fixtures
+>>> alset = fixtures.make_alignmentset("nt")
+>>> alset.sourcepath
+PosixPath('/tmp/bible_alignments_benchmarks/nt-1/sources/SBLGNT.tsv')
+"""
+
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import random
+import tempfile
+
+from bible_alignments.burrito import AlignmentSet
+
+
+@dataclass
+class CorpusSize:
+    """Parameters for the size of a synthetic corpus."""
+
+    sourceid: str
+    # range of book numbers
+    books: range
+    verses: int
+    # average tokens per verse
+    sourcetokens: float
+    targettokens: float
+
+
+SIZES: dict[str, CorpusSize] = {
+    "small": CorpusSize(sourceid="SBLGNT", books=range(40, 42), verses=300, sourcetokens=17.3, targettokens=25.3),
+    "nt": CorpusSize(sourceid="SBLGNT", books=range(40, 67), verses=7957, sourcetokens=17.3, targettokens=25.3),
+    "ot": CorpusSize(sourceid="WLCM", books=range(1, 40), verses=23145, sourcetokens=20.5, targettokens=28.7),
+}
+
+DATAROOT = Path(tempfile.gettempdir()) / "bible_alignments_benchmarks"
+# number of languages and alignments per language for catalog data
+CATALOGLANGUAGES = 40
+CATALOGVERSIONS = 3
+
+POS = ["noun", "verb", "adj", "adv", "det", "cj", "prep", "pron", "ptcl"]
+MORPHS = [f"{pos[0].upper()}-{case}{num}{gen}" for pos in POS for case in "NGDA" for num in "SP" for gen in "MFN"]
+ENGLISH = "the and of to he in that his for was with is not they him them a you on all it from be said".split()
+
+
+def _words(rng: random.Random, alphabet: str, count: int) -> list[str]:
+    """Return a list of count random words using alphabet."""
+    return ["".join(rng.choices(alphabet, k=rng.randint(2, 9))) for _ in range(count)]
+
+
+def _zipf(rng: random.Random, vocabulary: list[str]) -> str:
+    """Return a word from vocabulary, favoring earlier words."""
+    return vocabulary[min(int(rng.paretovariate(1.1)) - 1, len(vocabulary) - 1)]
+
+
+def _verses(size: CorpusSize) -> list[str]:
+    """Return a list of BCV references for size."""
+    perbook = max(1, size.verses // len(size.books))
+    chapters = max(1, perbook // 25)
+    return [
+        f"{book:02d}{chapter:03d}{verse:03d}"
+        for book in size.books
+        for chapter in range(1, chapters + 1)
+        for verse in range(1, (perbook // chapters) + 1)
+    ]
+
+
+def write_corpus(alset: AlignmentSet, size: CorpusSize, seed: int = 1) -> None:
+    """Write source, target, and alignments files for alset."""
+    rng = random.Random(seed)
+    is_nt = size.sourceid == "SBLGNT"
+    alphabet = "αβγδεζηθικλμνξοπρστυφχψω" if is_nt else "אבגדהוזחטיכלמנסעפצקרשת"
+    lemmas = _words(rng, alphabet, 6000 if is_nt else 9000)
+    lemmaindex = {lemma: index for index, lemma in enumerate(lemmas)}
+    targetwords = ENGLISH + _words(rng, "abcdefghijklmnopqrstuvwxyz", 12000)
+    prefix = "n" if is_nt else "o"
+    for path in (alset.sourcepath, alset.targetpath, alset.alignmentpath):
+        path.parent.mkdir(parents=True, exist_ok=True)
+    records = []
+    with alset.sourcepath.open("w", encoding="utf-8") as src, alset.targetpath.open("w", encoding="utf-8") as trg:
+        src.write("\t".join(("id", "altId", "text", "strongs", "gloss", "gloss2", "lemma", "pos", "morph")) + "\n")
+        trg.write("\t".join(("id", "source_verse", "text", "skip_space_after", "exclude")) + "\n")
+        for bcv in _verses(size):
+            nsources = max(1, int(rng.gauss(size.sourcetokens, 4)))
+            ntargets = max(1, int(rng.gauss(size.targettokens, 6)))
+            sourceids = [f"{bcv}{word:03d}" + ("" if is_nt else "1") for word in range(1, nsources + 1)]
+            targetids = [f"{bcv}{word:03d}1" for word in range(1, ntargets + 1)]
+            for sourceid in sourceids:
+                lemma = _zipf(rng, lemmas)
+                strongs = str(lemmaindex[lemma] + 1) if is_nt else f"H{lemmaindex[lemma] % 8674 + 1}"
+                gloss = _zipf(rng, targetwords)
+                src.write(
+                    "\t".join(
+                        (prefix + sourceid, f"{lemma}-1", lemma, strongs, gloss, gloss, lemma, rng.choice(POS), rng.choice(MORPHS))
+                    )
+                    + "\n"
+                )
+            for targetid in targetids:
+                punc = rng.random() < 0.1
+                trg.write(
+                    "\t".join(
+                        (targetid, bcv, "," if punc else _zipf(rng, targetwords), "y" if punc else "", "y" if punc else "")
+                    )
+                    + "\n"
+                )
+            # align most source tokens, in groups of 1-2, to 1-3 target tokens
+            sourcepos = targetpos = 0
+            for recno in range(1, nsources + 1):
+                if sourcepos >= nsources or targetpos >= ntargets:
+                    break
+                nsrc, ntrg = rng.randint(1, 2), rng.randint(1, 3)
+                records.append(
+                    {
+                        "meta": {"id": f"{bcv}.{recno:03d}", "origin": "manual", "status": "created"},
+                        "source": [prefix + sid for sid in sourceids[sourcepos : sourcepos + nsrc]],
+                        "target": targetids[targetpos : targetpos + ntrg],
+                    }
+                )
+                sourcepos += nsrc
+                targetpos += ntrg
+    alignments = {"meta": {"creator": "GrapeCity", "conformsTo": "0.3"}, "type": "translation", "records": records}
+    with alset.alignmentpath.open("w", encoding="utf-8") as f:
+        json.dump(alignments, f, ensure_ascii=False, indent=2)
+
+
+def write_catalog_data(
+    root: Path, languages: int = CATALOGLANGUAGES, versions: int = CATALOGVERSIONS, repos: bool = False
+) -> Path:
+    """Write TOML metadata for many alignments under root, and return root.
+
+    With repos = True, each language is in its own
+    alignments-<lang>/data directory, as for separate repositories.
+    """
+    for lang in range(languages):
+        langcode = f"x{lang:02d}"
+        langpath = root / f"alignments-{langcode}" / "data" if repos else root / langcode
+        for version in range(versions):
+            targetid = f"V{lang:02d}{version}"
+            tomlpath = langpath / "alignments" / targetid / f"SBLGNT-{targetid}-manual.toml"
+            tomlpath.parent.mkdir(parents=True, exist_ok=True)
+            tomlpath.write_text(
+                f"""[source]
+identifier = "SBLGNT"
+license = "CC-BY-4.0"
+
+[target]
+identifier = "{targetid}"
+license = "CC-BY-4.0"
+name.{langcode} = "Version {targetid}"
+url = "https://example.org/{targetid}"
+copyright = "Public domain"
+
+[alignment]
+identifier = "SBLGNT-{targetid}-manual"
+format = "Scripture Burrito 0.3"
+license = "CC-BY-4.0"
+process = "manual"
+scope = "NT"
+team = "Biblica"
+""",
+                encoding="utf-8",
+            )
+    return root
+
+
+def datapath(sizename: str, seed: int = 1) -> Path:
+    """Return the data directory for sizename and seed."""
+    return DATAROOT / f"{sizename}-{seed}"
+
+
+def make_alignmentset(sizename: str, seed: int = 1) -> AlignmentSet:
+    """Return an AlignmentSet for synthetic data, writing the data if necessary."""
+    size = SIZES[sizename]
+    root = datapath(sizename, seed)
+    alset = AlignmentSet(
+        sourceid=size.sourceid,
+        targetid="BSB",
+        targetlanguage="eng",
+        sourcedatapath=root / "sources",
+        langdatapath=root / "eng",
+    )
+    if not alset.alignmentpath.exists():
+        write_corpus(alset, size, seed=seed)
+    if not (root / "catalog").exists():
+        write_catalog_data(root / "catalog")
+    if not (root / "catalogrepos").exists():
+        write_catalog_data(root / "catalogrepos", repos=True)
+    return alset
@@ -0,0 +1,446 @@
+"""Run benchmarks for the hot paths in loading and processing alignment data.
+
+Each stage runs in its own process, so peak memory is measured
+separately for each. For each stage this reports:
+
+- wall time: best and mean of --repeat runs
+- peak RSS: the maximum resident set size of the process, and the
+  increase over the RSS before the stage ran (after any setup)
+- allocations: from one extra run under tracemalloc, the number of
+  memory blocks still allocated by the stage result, and the peak
+  traced memory while it ran
+- objects: the net increase in objects tracked by the garbage
+  collector
+- bytes per token: for stages that return a reader, the traced memory
+  held by the result, divided by the number of tokens
+
+Examples:
+
+    # all stages on NT-sized data
+    $ python -m benchmarks.run --size nt
+    # just two stages on OT-sized data, saving results
+    $ python -m benchmarks.run --size ot --stage source_reader --stage manager --output ot.json
+    # fail if any stage is more than 20% slower than saved results
+    $ python -m benchmarks.run --size ot --compare ot.json --tolerance 0.2
+
+"""
+
+import argparse
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass, field
+import gc
+import io
+import json
+from pathlib import Path
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from bible_alignments.burrito import AlignmentSet, AlignmentsReader, Manager, SourceReader, TargetReader
+from bible_alignments.burrito.util import groupby_bcv
+
+from . import fixtures
+
+
+@dataclass
+class Stage:
+    """A benchmarked operation.
+
+    setup(alset) returns a context value (untimed), and
+    run(alset, context) is the timed operation, returning a result
+    that is kept until measurements are done.
+    """
+
+    name: str
+    run: Callable[[AlignmentSet, Any], Any]
+    setup: Callable[[AlignmentSet], Any] = lambda alset: None
+    description: str = ""
+
+
+@dataclass
+class StageResult:
+    """Measurements for a stage."""
+
+    stage: str
+    size: str
+    times: list[float] = field(default_factory=list)
+    peak_rss_mb: float = 0.0
+    rss_increase_mb: float = 0.0
+    blocks: int = 0
+    traced_peak_mb: float = 0.0
+    objects: int = 0
+    # any extra measurements reported by the stage
+    extra: dict[str, Any] = field(default_factory=dict)
+    skipped: str = ""
+
+    @property
+    def best(self) -> float:
+        """Return the best time."""
+        return min(self.times) if self.times else 0.0
+
+    @property
+    def mean(self) -> float:
+        """Return the mean time."""
+        return sum(self.times) / len(self.times) if self.times else 0.0
+
+
+STAGES: dict[str, Stage] = {}
+
+
+def stage(name: str, setup: Callable[[AlignmentSet], Any] = lambda alset: None) -> Callable:
+    """Register the decorated function as the run() for a Stage."""
+
+    def decorator(runfn: Callable[[AlignmentSet, Any], Any]) -> Callable:
+        STAGES[name] = Stage(name=name, run=runfn, setup=setup, description=(runfn.__doc__ or "").strip())
+        return runfn
+
+    return decorator
+
+
+def _quiet(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Call fn, discarding anything printed."""
+    with redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+@stage("source_reader")
+def source_reader(alset: AlignmentSet, context: Any) -> SourceReader:
+    """SourceReader() from TSV."""
+    return SourceReader(alset.sourcepath)
+
+
+@stage("source_reader_bulk")
+def source_reader_bulk(alset: AlignmentSet, context: Any) -> SourceReader:
+    """SourceReader() from TSV, reading by column."""
+    return SourceReader(alset.sourcepath, bulk=True)
+
+
+@stage("target_reader")
+def target_reader(alset: AlignmentSet, context: Any) -> TargetReader:
+    """TargetReader() from TSV."""
+    return _quiet(TargetReader, alset.targetpath)
+
+
+@stage("target_reader_bulk")
+def target_reader_bulk(alset: AlignmentSet, context: Any) -> TargetReader:
+    """TargetReader() from TSV, reading by column."""
+    return _quiet(TargetReader, alset.targetpath, bulk=True)
+
+
+@stage("source_reader_interned")
+def source_reader_interned(alset: AlignmentSet, context: Any) -> SourceReader:
+    """SourceReader() from TSV, interning categorical fields."""
+    return SourceReader(alset.sourcepath, intern=True)
+
+
+@stage("target_reader_interned")
+def target_reader_interned(alset: AlignmentSet, context: Any) -> TargetReader:
+    """TargetReader() from TSV, interning categorical fields."""
+    return _quiet(TargetReader, alset.targetpath, intern=True)
+
+
+@stage("read_alignments")
+def read_alignments(alset: AlignmentSet, context: Any) -> Any:
+    """AlignmentsReader.read_alignments() from JSON."""
+    return _quiet(AlignmentsReader(alset, lazy=True).read_alignments)
+
+
+@stage("manager")
+def manager(alset: AlignmentSet, context: Any) -> Manager:
+    """Manager() from source, target, and alignments files."""
+    return _quiet(Manager, alset)
+
+
+def _parquet_setup(alset: AlignmentSet) -> Path:
+    """Return the path to a Parquet export of alset."""
+    from bible_alignments.burrito import parquet
+
+    return parquet.write_manager(_quiet(Manager, alset), Path(tempfile.mkdtemp()))
+
+
+@stage("parquet_manager", setup=_parquet_setup)
+def parquet_manager(alset: AlignmentSet, exportpath: Path) -> Manager:
+    """Manager() from a Parquet export."""
+    from bible_alignments.burrito import parquet
+
+    return _quiet(parquet.ParquetExport(exportpath).manager)
+
+
+def _snapshot_setup(alset: AlignmentSet) -> Path:
+    """Return a directory with a snapshot of a Manager for alset."""
+    snapshotdir = Path(tempfile.mkdtemp())
+    _quiet(Manager, alset, snapshotdir=snapshotdir)
+    return snapshotdir
+
+
+@stage("snapshot_manager", setup=_snapshot_setup)
+def snapshot_manager(alset: AlignmentSet, snapshotdir: Path) -> Manager:
+    """Manager() restored from a snapshot."""
+    return _quiet(Manager, alset, snapshotdir=snapshotdir)
+
+
+def _records_setup(alset: AlignmentSet) -> list:
+    """Return the alignment records for alset."""
+    return _quiet(AlignmentsReader(alset, lazy=True).read_alignments).records
+
+
+@stage("selectors_asdict", setup=_records_setup)
+def selectors_asdict(alset: AlignmentSet, records: list) -> list:
+    """AlignmentRecord.asdict() for every record, as Manager used to read selectors.
+
+    Results are kept, so the blocks column counts what each call allocates.
+    """
+    return [rec.asdict(withmaculaprefix=False) for rec in records]
+
+
+@stage("selectors", setup=_records_setup)
+def selectors(alset: AlignmentSet, records: list) -> list:
+    """AlignmentRecord.selectors for every record."""
+    return [rec.selectors for rec in records]
+
+
+@stage("group_records", setup=_records_setup)
+def group_records(alset: AlignmentSet, records: list) -> dict:
+    """Group records by AlignmentRecord.source_bcv, as Manager does."""
+    return groupby_bcv(records, lambda r: r.source_bcv)
+
+
+@stage("group_tokens", setup=lambda alset: _quiet(TargetReader, alset.targetpath))
+def group_tokens(alset: AlignmentSet, reader: TargetReader) -> dict:
+    """Group target tokens by BCV, as Manager does."""
+    return groupby_bcv(reader.values())
+
+
+@stage("make_versedata", setup=lambda alset: _quiet(Manager, alset))
+def make_versedata(alset: AlignmentSet, mgr: Manager) -> list:
+    """Manager.make_versedata() for every verse."""
+    return [mgr.make_versedata(bcvid, mgr.bcv["records"]) for bcvid in mgr.bcv["records"]]
+
+
+@stage("versedata_dataframe", setup=lambda alset: _quiet(Manager, alset))
+def versedata_dataframe(alset: AlignmentSet, mgr: Manager) -> list:
+    """VerseData.dataframe() for the first 1000 verses."""
+    return [mgr[bcvid].dataframe() for bcvid in list(mgr)[:1000]]
+
+
+@stage("verse_matrices", setup=lambda alset: _quiet(Manager, alset))
+def verse_matrices(alset: AlignmentSet, mgr: Manager) -> list:
+    """VerseData.matrix() for every verse of the first book."""
+    book = next(iter(mgr))[:2]
+    return [mgr[bcvid].matrix() for bcvid in mgr if bcvid.startswith(book)]
+
+
+@stage("book_matrices", setup=lambda alset: _quiet(Manager, alset))
+def book_matrices(alset: AlignmentSet, mgr: Manager) -> dict:
+    """Manager.alignment_matrices() for the first book."""
+    return mgr.alignment_matrices(next(iter(mgr))[:2])
+
+
+def _database_setup(alset: AlignmentSet) -> Any:
+    """Return a StoredManager for alset in a new database."""
+    from bible_alignments.burrito.database import AlignmentDatabase
+
+    db = AlignmentDatabase(Path(tempfile.mkdtemp()) / "alignments.db")
+    db.add(_quiet(Manager, alset))
+    return db[alset.identifier]
+
+
+@stage("database_verses", setup=_database_setup)
+def database_verses(alset: AlignmentSet, stored: Any) -> list:
+    """StoredManager lookups for the first 1000 verses."""
+    return [stored[bcvid] for bcvid in list(stored)[:1000]]
+
+
+def _catalog_setup(alset: AlignmentSet, cached: bool = False) -> Any:
+    """Return a Catalog class for synthetic catalog data.
+
+    With cached = True, the catalog is written once first, so the
+    TOML cache is current.
+    """
+    from bible_alignments import catalog
+
+    outdir = Path(tempfile.mkdtemp())
+
+    class SyntheticCatalog(catalog.Catalog):
+        alignments = alset.sourcedatapath.parent / "catalog"
+        catalogpath = outdir / "catalog.tsv"
+        cachepath = (outdir / "catalog-cache.json") if cached else None
+
+    if cached:
+        catalog_write(alset, SyntheticCatalog)
+    return SyntheticCatalog
+
+
+@stage("catalog_write", setup=_catalog_setup)
+def catalog_write(alset: AlignmentSet, catalogclass: Any) -> Any:
+    """Catalog() and Catalog.write() for synthetic metadata."""
+    import warnings
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        cat = catalogclass()
+        cat.write()
+    return cat
+
+
+@stage("catalog_write_cached", setup=lambda alset: _catalog_setup(alset, cached=True))
+def catalog_write_cached(alset: AlignmentSet, catalogclass: Any) -> Any:
+    """Catalog() and Catalog.write() for unchanged synthetic metadata, with a current cache."""
+    return catalog_write(alset, catalogclass)
+
+
+def _catalog_roots_setup(alset: AlignmentSet) -> Any:
+    """Return a Catalog class and data roots for synthetic alignments-<lang> repositories."""
+    catalogclass = _catalog_setup(alset)
+    return catalogclass, sorted((alset.sourcedatapath.parent / "catalogrepos").glob("alignments-*/data"))
+
+
+@stage("catalog_roots", setup=_catalog_roots_setup)
+def catalog_roots(alset: AlignmentSet, setup: Any, threads: Optional[int] = 1) -> Any:
+    """Catalog(roots) and Catalog.write() for one data root per language, scanned in turn."""
+    import warnings
+
+    catalogclass, roots = setup
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        cat = catalogclass(roots=roots, threads=threads)
+        cat.write()
+    return cat
+
+
+@stage("catalog_roots_threaded", setup=_catalog_roots_setup)
+def catalog_roots_threaded(alset: AlignmentSet, setup: Any) -> Any:
+    """Catalog(roots) and Catalog.write() for one data root per language, scanned concurrently."""
+    return catalog_roots(alset, setup, threads=None)
+
+
+def _rss_mb() -> float:
+    """Return the current resident set size in MB, if available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1 << 20)
+    except OSError:
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss / (1 << 20) if sys.platform == "darwin" else maxrss / 1024
+
+
+def measure(stagename: str, sizename: str, repeat: int, seed: int = 1) -> StageResult:
+    """Run and measure a stage in this process."""
+    benchstage = STAGES[stagename]
+    result = StageResult(stage=stagename, size=sizename)
+    alset = fixtures.make_alignmentset(sizename, seed=seed)
+    try:
+        context = benchstage.setup(alset)
+    except ImportError as e:
+        result.skipped = f"setup failed: {e}"
+        return result
+    gc.collect()
+    rss_before = _rss_mb()
+    objects_before = len(gc.get_objects())
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = benchstage.run(alset, context)
+        result.times.append(time.perf_counter() - start)
+        if isinstance(output, dict) and "_extra" in output:
+            result.extra.update(output["_extra"])
+        del output
+        gc.collect()
+    result.peak_rss_mb = _peak_rss_mb()
+    result.rss_increase_mb = max(0.0, result.peak_rss_mb - rss_before)
+    # one more run to count allocations and objects
+    tracemalloc.start()
+    output = benchstage.run(alset, context)
+    snapshot_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    current, peak = tracemalloc.get_traced_memory()
+    result.traced_peak_mb = peak / (1 << 20)
+    if isinstance(output, (SourceReader, TargetReader)) and len(output):
+        result.extra["bytes_per_token"] = round(current / len(output))
+    tracemalloc.stop()
+    result.blocks = snapshot_blocks
+    result.objects = len(gc.get_objects()) - objects_before
+    del output
+    return result
+
+
+def run_stage_subprocess(stagename: str, sizename: str, repeat: int, seed: int = 1) -> StageResult:
+    """Run a stage in a fresh Python process and return its results."""
+    cmd = [sys.executable, "-m", "benchmarks.run", "--child", "--size", sizename, "--repeat", str(repeat)]
+    cmd += ["--seed", str(seed), "--stage", stagename]
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        return StageResult(stage=stagename, size=sizename, skipped=f"failed: {proc.stderr.strip().splitlines()[-1:]}")
+    resultdict = json.loads(proc.stdout.strip().splitlines()[-1])
+    return StageResult(**resultdict)
+
+
+def report(results: list[StageResult]) -> str:
+    """Return a table of results."""
+    header = f"{'stage':<22} {'size':<6} {'best s':>8} {'mean s':>8} {'peak MB':>8} {'+RSS MB':>8} {'blocks':>10} {'traced MB':>9} {'objects':>9}"
+    lines = [header, "-" * len(header)]
+    for res in results:
+        if res.skipped:
+            lines.append(f"{res.stage:<22} {res.size:<6} skipped: {res.skipped}")
+            continue
+        lines.append(
+            f"{res.stage:<22} {res.size:<6} {res.best:8.3f} {res.mean:8.3f} {res.peak_rss_mb:8.1f} "
+            f"{res.rss_increase_mb:8.1f} {res.blocks:10d} {res.traced_peak_mb:9.1f} {res.objects:9d}"
+        )
+        for key, value in res.extra.items():
+            lines.append(f"    {key}: {value}")
+    return "\n".join(lines)
+
+
+def compare(results: list[StageResult], baselinepath: Path, tolerance: float) -> list[str]:
+    """Return messages for stages more than tolerance slower than the baseline."""
+    baseline = {(res["stage"], res["size"]): res for res in json.loads(baselinepath.read_text())}
+    regressions = []
+    for res in results:
+        if res.skipped or not (base := baseline.get((res.stage, res.size))) or not base["times"]:
+            continue
+        basebest = min(base["times"])
+        if res.best > basebest * (1 + tolerance):
+            regressions.append(f"{res.stage} ({res.size}): {res.best:.3f}s vs. {basebest:.3f}s baseline")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=sorted(fixtures.SIZES), default="nt", help="size of synthetic data")
+    parser.add_argument("--stage", action="append", choices=sorted(STAGES), help="stage to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs per stage")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for synthetic data")
+    parser.add_argument("--output", type=Path, help="write results as JSON to this path")
+    parser.add_argument("--compare", type=Path, help="compare with results saved by --output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown with --compare")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    stagenames = args.stage or list(STAGES)
+    if args.child:
+        print(json.dumps(asdict(measure(stagenames[0], args.size, args.repeat, seed=args.seed))))
+        return 0
+    # write any synthetic data before timing
+    fixtures.make_alignmentset(args.size, seed=args.seed)
+    results = [run_stage_subprocess(name, args.size, args.repeat, seed=args.seed) for name in stagenames]
+    print(report(results))
+    if args.output:
+        args.output.write_text(json.dumps([asdict(res) for res in results], indent=2))
+    if args.compare:
+        if regressions := compare(results, args.compare, args.tolerance):
+            print("Regressions:\n" + "\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,7 @@ from pathlib import Path
 
 from pydantic import BaseModel, constr
 
-from .strongs import normalize_strongs
+from .strongs import normalize_strongs, normalize_strongs_many
 
 
 ROOT = Path(__file__).parent.parent
@@ -65,4 +65,5 @@ __all__ = [
     "SourceidEnum",
     # strongs
     "normalize_strongs",
+    "normalize_strongs_many",
 ]
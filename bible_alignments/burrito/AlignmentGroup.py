@@ -18,15 +18,25 @@ spec that are not supported by this code.
 
 from dataclasses import dataclass, field, fields
 import datetime as dt
-from itertools import groupby
+from functools import cache
+from pathlib import Path
 from typing import Any, Optional
 
 from biblelib.word import bcvwpid
+import jsonlines
 
 from bible_alignments import SourceidEnum
 
 from .AlignmentType import TranslationType
+from .BaseToken import bcv_from_id
 from .source import macula_prefixer
+from .util import groupby_bcv
+
+
+@cache
+def _fieldnames(cls: type) -> tuple[str, ...]:
+    """Return the sorted names of the dataclass fields of cls, except _fieldnames."""
+    return tuple(sorted(f.name for f in fields(cls) if f.name != "_fieldnames"))
 
 
 # hoisting means this can be defined at several different levels, so
@@ -159,7 +169,7 @@ class Metadata:
 
     def __post_init__(self) -> None:
         """Compute values after initialization."""
-        self._fieldnames = tuple(sorted(tuple([f.name for f in fields(self) if f.name != "_fieldnames"])))
+        self._fieldnames = _fieldnames(type(self))
 
     def __repr__(self) -> str:
         """Return a printed representation."""
@@ -183,12 +193,40 @@ class AlignmentRecord:
     references: dict[str, AlignmentReference]
     # TranslationType wires roles to 'source' and 'target'
     type: TranslationType = field(default_factory=TranslationType)
+    # computed from the source selectors by _set_source_bcv(): None
+    # if not computed, or the selectors aren't valid identifiers
+    _source_bcv: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    # any other verses spanned by the source selectors: usually the
+    # shared empty tuple
+    _other_bcvs: tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """Compute values after initialization."""
         for role in self.roles:
             assert role in self.references, f"role missing from references: {role}"
         assert len(self.roles) == len(self.references), "different numbers of roles and references"
+        self._set_source_bcv()
+
+    def _set_source_bcv(self) -> None:
+        """Compute the source BCV and any other verses for the source selectors.
+
+        BCV strings come from bcv_from_id(), so they're shared across
+        records rather than stored once per record. If any selector
+        isn't a valid identifier (like "" or "MISSING"), nothing is
+        stored, and source_bcv is computed from the first selector when
+        used, raising an error if that isn't valid.
+        """
+        self._source_bcv, self._other_bcvs = None, ()
+        try:
+            bcvs = [bcv_from_id(sel) for sel in self.source_selectors]
+        except (AssertionError, ValueError):
+            return
+        if bcvs:
+            self._source_bcv = bcvs[0]
+            if any(bcv != bcvs[0] for bcv in bcvs):
+                self._other_bcvs = tuple(bcv for bcv in dict.fromkeys(bcvs) if bcv != bcvs[0])
+        else:
+            self._source_bcv = ""
 
     def __repr__(self) -> str:
         """Return a printed representation."""
@@ -213,6 +251,17 @@ class AlignmentRecord:
         assert role in self.roles, f"Invalid role: {role}"
         return self.references[role].selectors
 
+    @property
+    def selectors(self) -> tuple[list[str], list[str]]:
+        """Return the lists of selectors for the two roles, in role order.
+
+        These are the lists in self.references, not copies, so this is
+        much cheaper than asdict() for just reading selectors: don't
+        modify them.
+        """
+        first, second = self.type.roles
+        return (self.references[first].selectors, self.references[second].selectors)
+
     @property
     def source_selectors(self) -> list[str]:
         """Return the source selectors for this record."""
@@ -228,15 +277,32 @@ class AlignmentRecord:
         """Return the source BCV identifier for this record.
 
         Returns data for the first selector, though multiples should
-        have the same BCV.
+        have the same BCV: see source_verses. This is computed once
+        when the record is made.
 
         """
-        if self.source_selectors:
-            firstbcv: str = [bcvwpid.to_bcv(sel) for sel in self.source_selectors][0]
+        if self._source_bcv is not None:
+            return self._source_bcv
+        elif self.source_selectors:
+            firstbcv: str = bcvwpid.to_bcv(self.source_selectors[0])
             return firstbcv
         else:
             return ""
 
+    @property
+    def source_verses(self) -> tuple[str, ...]:
+        """Return the BCV identifiers for all the verses of the source selectors.
+
+        The first is source_bcv. More than one means the record
+        crosses a verse boundary.
+        """
+        if self._source_bcv is None:
+            return tuple(dict.fromkeys(bcvwpid.to_bcv(sel) for sel in self.source_selectors))
+        elif self._source_bcv:
+            return (self._source_bcv, *self._other_bcvs)
+        else:
+            return ()
+
     @property
     def incomplete(self) -> bool:
         """True if any selectors in references are incomplete."""
@@ -343,9 +409,21 @@ class AlignmentGroup:
             "records": [rec.asdict(positional=positional, withmeta=withmeta) for rec in self.records],
         }
 
+    def write_jsonl(self, outpath: Path) -> None:
+        """Write the group as JSON Lines.
+
+        The first line has group metadata and type, and each following
+        line is a record, including its metadata. This can be read
+        back incrementally by alignments.AlignmentsReader.
+        """
+        with jsonlines.open(outpath, mode="w") as writer:
+            writer.write({"meta": self.meta.asdict(), "type": self._type})
+            writer.write_all(rec.asdict() for rec in self.records)
+
     def verserecords(self) -> dict[str, list[AlignmentRecord]]:
-        """Return a dict mapping source BCV references to their alignment records."""
-        verserecords: dict[str, list[AlignmentRecord]] = {
-            k: list(g) for k, g in groupby(self.records, lambda r: r.source_bcv)
-        }
+        """Return a dict mapping source BCV references to their alignment records.
+
+        Records needn't be sorted by BCV.
+        """
+        verserecords: dict[str, list[AlignmentRecord]] = groupby_bcv(self.records, lambda r: r.source_bcv)
         return verserecords
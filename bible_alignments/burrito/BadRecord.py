@@ -1,7 +1,18 @@
-"""Support for logging errors in alignment records."""
+"""Support for logging errors in alignment records.
 
+find_badrecords() checks many records at once: selectors for all
+records are flattened into arrays, and checked with whole-array
+operations, so only records that turn out to be bad need any more
+work.
+"""
+
+from collections import UserDict
+from collections.abc import Container, Mapping
 from dataclasses import dataclass
 from enum import Enum
+from itertools import chain
+
+import numpy as np
 
 from .AlignmentGroup import AlignmentRecord
 
@@ -54,3 +65,75 @@ class BadRecord:
             print(
                 f"{self.identifier}: {self.reason.name}. Sources: {self.record.source_selectors}, targets: {self.record.target_selectors}"
             )
+
+
+def _selector_counts(
+    records: list[AlignmentRecord], role: str, items: Container[str]
+) -> tuple[list[list[str]], np.ndarray, np.ndarray, np.ndarray]:
+    """Return selectors for role in records, and arrays of counts for each record.
+
+    The counts are of all, empty, and missing selectors: selectors
+    are missing if they're not in items, but empty selectors aren't
+    counted as missing.
+    """
+    selectors = [rec.references[role].selectors for rec in records]
+    lengths = np.fromiter(map(len, selectors), dtype=np.int64, count=len(selectors))
+    flat = list(chain.from_iterable(selectors))
+    empty = np.fromiter(map("".__eq__, flat), dtype=bool, count=len(flat))
+    # for readers (UserDicts), skip the extra Python call for each lookup
+    contains = (items.data if isinstance(items, UserDict) else items).__contains__
+    missing = ~np.fromiter(map(contains, flat), dtype=bool, count=len(flat)) & ~empty
+    # the record for each selector
+    positions = np.repeat(np.arange(len(records)), lengths)
+    counts = [np.bincount(positions[mask], minlength=len(records)) for mask in (empty, missing)]
+    return selectors, lengths, counts[0], counts[1]
+
+
+def find_badrecords(
+    records: Mapping[str, AlignmentRecord], sourceitems: Container[str], targetitems: Container[str]
+) -> dict[str, BadRecord]:
+    """Return a dict of BadRecord instances for records, by their keys in records.
+
+    Records are checked for missing or empty selectors, and for
+    selectors that aren't in sourceitems or targetitems (like a
+    SourceReader and TargetReader). As in Manager._bad_reason(), each
+    bad record gets the first of these reasons that applies:
+    NOSOURCE, EMPTYSOURCE, NOTARGET, EMPTYTARGET, MISSINGSOURCE, and
+    MISSINGTARGETSOME or MISSINGTARGETALL.
+    """
+    recids = list(records)
+    reclist = list(records.values())
+    sources, sourcelengths, sourceempty, sourcemissing = _selector_counts(reclist, "source", sourceitems)
+    targets, targetlengths, targetempty, targetmissing = _selector_counts(reclist, "target", targetitems)
+    # in order of precedence: the first that applies is the reason
+    conditions = [
+        (Reason.NOSOURCE, sourcelengths == 0),
+        (Reason.EMPTYSOURCE, sourceempty > 0),
+        (Reason.NOTARGET, targetlengths == 0),
+        (Reason.EMPTYTARGET, targetempty > 0),
+        (Reason.MISSINGSOURCE, sourcemissing > 0),
+        (Reason.MISSINGTARGETSOME, (targetmissing > 0) & (targetmissing < targetlengths)),
+        (Reason.MISSINGTARGETALL, targetmissing > 0),
+    ]
+    reasons = list(Reason)
+    reasonindexes = np.select(
+        [condition for _, condition in conditions], [reasons.index(reason) for reason, _ in conditions], default=-1
+    )
+    badrecords: dict[str, BadRecord] = {}
+    for position in np.flatnonzero(reasonindexes >= 0).tolist():
+        reason = reasons[reasonindexes[position]]
+        badrecdict = {"identifier": reclist[position].identifier, "record": reclist[position], "reason": reason}
+        if reason == Reason.MISSINGSOURCE:
+            badrecdict["data"] = [tok for tok in sources[position] if tok not in sourceitems]
+        elif reason in (Reason.MISSINGTARGETSOME, Reason.MISSINGTARGETALL):
+            badrecdict["data"] = [tok for tok in targets[position] if tok not in targetitems]
+        badrecords[recids[position]] = BadRecord(**badrecdict)
+    return badrecords
+
+
+def count_reasons(badrecords: Mapping[str, BadRecord]) -> dict[Reason, int]:
+    """Return a dict of counts of badrecords by reason, for reasons that occur."""
+    counts = {reason: 0 for reason in Reason}
+    for badrec in badrecords.values():
+        counts[badrec.reason] += 1
+    return {reason: count for reason, count in counts.items() if count}
@@ -1,13 +1,59 @@
 """Base class for Source and Target."""
 
-from dataclasses import dataclass
+from dataclasses import MISSING, dataclass, field, fields
+from functools import cache
+import gc
+import re
+import sys
+from typing import Any, Callable, ClassVar, Optional
 
 from biblelib.word import bcvwpid
 
+from . import tokenids
 
-@dataclass(order=True)
+
+# optional canon prefix, BBCCCVVV, then word and optional part
+_bcvwpidre = re.compile(r"[no]?(\d{8})\d{3,4}")
+# prefix + BBCCCVVV -> validated BCV: see bcv_from_id()
+_bcvcache: dict[str, str] = {}
+
+
+def bcv_from_id(identifier: str) -> str:
+    """Return the BCV reference for a token identifier.
+
+    This matches bcvwpid.to_bcv(), but only validates the first
+    identifier for each verse: after that, the BCV is just a slice of
+    the identifier.
+    """
+    if not (match := _bcvwpidre.fullmatch(identifier)):
+        # let BibleLib raise an appropriate error
+        return str(bcvwpid.to_bcv(identifier))
+    key = identifier[: match.end(1)]
+    if (bcv := _bcvcache.get(key)) is None:
+        bcv = _bcvcache[key] = str(bcvwpid.to_bcv(identifier))
+    return bcv
+
+
+@cache
+def _field_defaults(cls: type) -> dict[str, Any]:
+    """Return a dict of default values for the dataclass fields of cls."""
+    return {fld.name: fld.default for fld in fields(cls) if fld.default is not MISSING}
+
+
+@cache
+def _field_setters(cls: type) -> dict[str, Callable[[Any, Any], None]]:
+    """Return a dict of functions that set the slot for each dataclass field of cls."""
+    return {fld.name: getattr(cls, fld.name).__set__ for fld in fields(cls)}
+
+
+@dataclass(order=True, slots=True)
 class BaseToken:
-    """Common structure for Source and Target tokens."""
+    """Common structure for Source and Target tokens.
+
+    Tokens use __slots__ rather than a per-instance __dict__, which
+    matters for corpora with hundreds of thousands of tokens. So
+    attributes other than the dataclass fields can't be added.
+    """
 
     # Identifies the word/morph in BBCCCVVVWWWP format
     # note, no word part: so this doesn't support sub-word tokens
@@ -20,6 +66,11 @@ class BaseToken:
     aligned: bool = False
     # variant text if this text occurs multiple times in a verse
     text_unique: str = ""
+    # cached value for bcv, and the id it was computed from
+    _bcv: str = field(default="", init=False, repr=False, compare=False)
+    _bcvid: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    # fields with few distinct values: see intern()
+    _categorical_fields: ClassVar[tuple[str, ...]] = ()
 
     def __repr__(self) -> str:
         """Return a printed representation."""
@@ -30,16 +81,83 @@ class BaseToken:
         """Return a hash key."""
         return hash(self.id)
 
+    @classmethod
+    def _fromnormalized(cls, **kwargs: Any) -> "BaseToken":
+        """Return an instance from values that are already normalized.
+
+        This bypasses __post_init__(), so only use it for values that
+        have been through it before (like cached token data).
+        """
+        return cls._fromcolumns({name: [value] for name, value in kwargs.items()})[0]
+
+    @classmethod
+    def _fromcolumns(cls, columns: dict[str, list[Any]]) -> list["BaseToken"]:
+        """Return a list of instances from columns of normalized values.
+
+        Keys of columns are attribute names. As with _fromnormalized(),
+        this bypasses __post_init__().
+
+        Garbage collection is paused meanwhile: tokens can't form
+        reference cycles, and otherwise creating many of them triggers
+        repeated, useless collections.
+        """
+        setters = _field_setters(cls)
+        defaults = [(setters[name], value) for name, value in _field_defaults(cls).items() if name not in columns]
+        columnsetters = [setters[name] for name in columns]
+        tokens = []
+        gcenabled = gc.isenabled()
+        gc.disable()
+        try:
+            for values in zip(*columns.values()):
+                token = cls.__new__(cls)
+                for setter, value in defaults:
+                    setter(token, value)
+                for setter, value in zip(columnsetters, values):
+                    setter(token, value)
+                tokens.append(token)
+        finally:
+            if gcenabled:
+                gc.enable()
+        return tokens
+
+    def intern(self) -> None:
+        """Intern the string values of _categorical_fields.
+
+        Values like parts of speech repeat across many tokens: this
+        makes tokens share one copy of each.
+        """
+        for name in self._categorical_fields:
+            setattr(self, name, sys.intern(getattr(self, name)))
+
     @property
     def bcv(self) -> str:
-        """Return the BCV-format verse reference for a token instance."""
-        return str(bcvwpid.to_bcv(self.id))
+        """Return the BCV-format verse reference for a token instance.
+
+        This is computed once and cached, unless id changes.
+        """
+        if self._bcvid is not self.id:
+            self._bcv = bcv_from_id(self.id)
+            self._bcvid = self.id
+        return self._bcv
+
+    @property
+    def bcvint(self) -> int:
+        """Return the BCV reference as an integer.
+
+        This sorts in the same order as the string, but compares faster.
+        """
+        return int(self.bcv)
 
     # variant so it can be passed as a Callable to methods
     def to_bcv(self) -> str:
         """Return the BCV-format verse reference for a token instance."""
         return str(self.bcv)
 
+    @property
+    def idint(self) -> int:
+        """Return the integer encoding of id: see tokenids."""
+        return tokenids.encode(self.id)
+
     @property
     def idtext(self) -> tuple[str, str]:
         """Return a tuple of id and text.
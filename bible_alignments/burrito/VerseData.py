@@ -3,8 +3,9 @@
 from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
+import numpy as np
 import pandas as pd
 
 
@@ -50,6 +51,50 @@ class DiffRecord:
         return basestr
 
 
+def _aligned_offsets(versedata: "VerseData", start: int = 0) -> list[int]:
+    """Return the flat offsets of aligned (source, target) positions in a matrix for versedata.
+
+    The offset for source i and target j is start + i * len(targets) + j.
+    Tokens are matched by identifier, and any not in versedata.sources
+    or versedata.targets are ignored.
+    """
+    ntargets = len(versedata.targets)
+    sourceoffsets = {src.id: start + index * ntargets for index, src in enumerate(versedata.sources)}
+    targetindex = {trg.id: index for index, trg in enumerate(versedata.targets)}
+    offsets: list[int] = []
+    for sources, targets in versedata.alignments:
+        rows = [sourceoffsets[src.id] for src in sources if src.id in sourceoffsets]
+        columns = [targetindex[trg.id] for trg in targets if trg.id in targetindex]
+        offsets.extend(row + column for row in rows for column in columns)
+    return offsets
+
+
+def alignment_matrices(versedatas: Iterable["VerseData"]) -> dict[str, np.ndarray]:
+    """Return a dict mapping BCV references to alignment matrices for versedatas.
+
+    Each matrix is a boolean array with a row for each source and a
+    column for each target, in the order of the VerseData sources and
+    targets, and True where they're aligned. The matrices are views
+    into a single array, filled in one operation, rather than one
+    array for each verse as with VerseData.matrix().
+    """
+    shapes: dict[str, tuple[int, int]] = {}
+    offsets: list[int] = []
+    size = 0
+    for versedata in versedatas:
+        shape = shapes[versedata.bcvid] = (len(versedata.sources), len(versedata.targets))
+        offsets.extend(_aligned_offsets(versedata, size))
+        size += shape[0] * shape[1]
+    flat = np.zeros(size, dtype=bool)
+    flat[np.array(offsets, dtype=np.int64)] = True
+    matrices: dict[str, np.ndarray] = {}
+    start = 0
+    for bcvid, (nsources, ntargets) in shapes.items():
+        matrices[bcvid] = flat[start : start + nsources * ntargets].reshape(nsources, ntargets)
+        start += nsources * ntargets
+    return matrices
+
+
 @dataclass
 class VerseData:
     """Manage alignments, sources, and targets for a verse.
@@ -113,6 +158,15 @@ class VerseData:
             texts = [item.text for item in getattr(self, typeattr)]
         return texts
 
+    def matrix(self) -> np.ndarray:
+        """Return a boolean array of alignments, with a row for each source and a column for each target.
+
+        Values are True where the source and target are aligned.
+        """
+        matrix = np.zeros((len(self.sources), len(self.targets)), dtype=bool)
+        matrix.flat[_aligned_offsets(self)] = True
+        return matrix
+
     # no typing hints for pd.Dataframe
     def dataframe(self, hitmark: str = "-G-", missmark: str = "  ", srcattr: str = "text") -> Any:
         """Return a DataFrame showing alignments.
@@ -122,17 +176,12 @@ class VerseData:
         otherwise the missmark string is used.
 
         """
-        # dict mapping each target instance to aligned source instances
-        target_sources = {trg: alpair[0] for alpair in self.alignments for trg in alpair[1]}
-        # dict mapping
-        dfdata = {
-            textdisplay: [(hitmark if (src in target_sources.get(trg, {})) else missmark) for src in self.sources]
-            for (index, alpair) in enumerate(self.alignments)
-            if (targettextpair := zip(self.targets, self.get_texts("targets", unique=True)))
-            for (trg, textdisplay) in targettextpair
-        }
-        # add source items as index
-        return pd.DataFrame(dfdata, index=[getattr(src, srcattr) for src in self.sources])
+        matrix = self.matrix()
+        return pd.DataFrame(
+            np.where(matrix, hitmark, missmark),
+            index=[getattr(src, srcattr) for src in self.sources],
+            columns=self.get_texts("targets", unique=True),
+        )
 
     @staticmethod
     def _diff_pair(basedict: dict[str, str], pair: tuple[tuple[list[Source], list[Target]]]) -> Optional[DiffRecord]:
@@ -10,9 +10,10 @@ from .AlignmentSet import AlignmentSet
 from .AlignmentType import TranslationType
 from .alignments import AlignmentsReader
 from .manager import Manager, VerseData
-from .BaseToken import BaseToken, asbool, bare_id
+from .BaseToken import BaseToken, asbool, bare_id, bcv_from_id
 from .source import macula_prefixer, macula_unprefixer, Source, SourceReader
 from .target import Target, TargetReader
+from . import tokenids
 
 
 __all__ = [
@@ -33,6 +34,7 @@ __all__ = [
     "BaseToken",
     "asbool",
     "bare_id",
+    "bcv_from_id",
     # alignments
     "AlignmentsReader",
     # manager
@@ -47,4 +49,6 @@ __all__ = [
     "Target",
     "TargetReader",
     "TargetWriter",
+    # tokenids
+    "tokenids",
 ]
@@ -7,16 +7,142 @@ This provides support for manager.Manager to read the combination of source, tar
 >>> targetlang = "hin"
 >>> alset = AlignmentSet(targetlanguage=targetlang, targetid="IRVHin", sourceid="SBLGNT", langdatapath=(DATAPATH / targetlang))
 >>> algroup = alignments.AlignmentsReader(alset).read_alignments()
+
+# or process one record at a time, with bounded memory
+>>> alreader = alignments.AlignmentsReader(alset, lazy=True)
+>>> for alrec in alreader.iter_records():
+...     pass
+
+# or read only the records for a verse, from their positions in the file
+>>> recordindex = alreader.record_index()
+>>> recordindex["40001024"]
 """
 
+from codecs import BOM_UTF8
+import io
 import json
-from typing import Any, Optional
+from operator import itemgetter
+from pathlib import Path
+import re
+from typing import Any, Iterator, Optional, TextIO
 
+import jsonlines
+import numpy as np
 
 from .AlignmentGroup import Document, Metadata, AlignmentGroup, AlignmentReference, AlignmentRecord
 from .AlignmentSet import AlignmentSet
 from .AlignmentType import TranslationType
+from .BaseToken import bcv_from_id
+from .columnar import cache_path, load_arrays, save_arrays
 from .source import macula_unprefixer
+from .util import BCVIndex, bcv_offsets
+
+
+class _JSONStream:
+    """Decode JSON values incrementally from a text file.
+
+    Only as much of the file as is needed to decode the next value is
+    kept in memory.
+
+    With items(spans=True), each array element comes with its start
+    and end positions in the file, counted in characters: open the
+    file as Latin-1 to make these byte positions.
+    """
+
+    _whitespace = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, f: TextIO, chunksize: int = 1 << 16) -> None:
+        """Initialize an instance for file f."""
+        self.f = f
+        self.chunksize = chunksize
+        self.decoder = json.JSONDecoder()
+        self.buffer: str = ""
+        self.pos: int = 0
+        # the number of characters dropped from the start of the buffer
+        self.dropped: int = 0
+        self.eof: bool = False
+
+    def _fill(self) -> bool:
+        """Read another chunk into the buffer, dropping consumed text. Return False at end of file."""
+        chunk = self.f.read(self.chunksize)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.dropped += self.pos
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at end of file."""
+        while True:
+            self.pos = self._whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume char, which must be the next non-whitespace character."""
+        if (nextchar := self.peek()) != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}, found {nextchar!r}", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode and return the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def position(self) -> int:
+        """Return the position in the file of the next character to decode."""
+        return self.dropped + self.pos
+
+    def items(self, arraykey: str, spans: bool = False) -> Iterator[tuple[str, Any]]:
+        """Yield (key, value) pairs from a top-level object.
+
+        For arraykey, the array is not returned whole: instead, yield
+        (arraykey, element) for each element. With spans = True
+        (default is False), yield (arraykey, (element, start, end))
+        instead, with the positions of the element in the file.
+        """
+        if self.peek() == "[":
+            raise ValueError("Expecting an object, not a list")
+        self.expect("{")
+        if self.peek() == "}":
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            if key == arraykey:
+                self.expect("[")
+                if self.peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        self.peek()
+                        start = self.position()
+                        element = self.value()
+                        yield key, ((element, start, self.position()) if spans else element)
+                        if self.peek() != ",":
+                            break
+                        self.pos += 1
+                    self.expect("]")
+            else:
+                yield key, self.value()
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        self.expect("}")
 
 
 class AlignmentsReader:
@@ -25,26 +151,65 @@ class AlignmentsReader:
     This does not check for bad records: use manager.Manager for
     robustness.
 
+    Records are decoded incrementally, so the whole JSON tree is never
+    in memory. Use iter_records() to process one AlignmentRecord at a
+    time. If the alignments file has a .jsonl suffix, it is read as
+    JSON Lines: the first line has the group 'meta' and 'type', and
+    each following line is a record (see
+    AlignmentGroup.write_jsonl()).
+
+    With lazy = True (default is False), the AlignmentGroup is not
+    read until self.alignmentgroup is first used.
+
+    record_index() maps BCV references to the records for each verse,
+    noting only where each record is in the file: records are read
+    and made when their verse is looked up.
+
     """
 
     scheme = "BCVWP"
     altype: TranslationType = TranslationType()
 
-    def __init__(self, alignmentset: AlignmentSet, keeptargetwordpart: bool = False) -> None:
-        """Initialize a Reader instance."""
+    def __init__(
+        self,
+        alignmentset: AlignmentSet,
+        keeptargetwordpart: bool = False,
+        lazy: bool = False,
+        alignmentpath: Optional[Path] = None,
+    ) -> None:
+        """Initialize a Reader instance.
+
+        alignmentpath overrides alignmentset.alignmentpath: for
+        example, for a JSON Lines version of the alignments.
+        """
         self.keeptargetwordpart: bool = keeptargetwordpart
         # the configuration of alignment data
         self.alignmentset: AlignmentSet = alignmentset
+        self.alignmentpath: Path = alignmentpath or self.alignmentset.alignmentpath
         # Document instances for AlignmentGroup
         self.sourcedoc: Document = Document(docid=self.alignmentset.sourceid, scheme=self.scheme)
         self.targetdoc: Document = Document(docid=self.alignmentset.targetid, scheme=self.scheme)
+        # group-level metadata: set when read
+        self.meta: Optional[Metadata] = None
         # Read the data and instantiate an AlignmentGroup (with
         # AlignmentRecords, etc. all the way down)
-        self.alignmentgroup: AlignmentGroup = self.read_alignments()
+        self._alignmentgroup: Optional[AlignmentGroup] = None if lazy else self.read_alignments()
         # can't do all the checking without sources, targets, etc. Use
         # manager.Manager to read the data and collect any bad records
         # if you're not sure about it.
 
+    @property
+    def alignmentgroup(self) -> AlignmentGroup:
+        """Return the AlignmentGroup, reading it first if necessary."""
+        if self._alignmentgroup is None:
+            self._alignmentgroup = self.read_alignments()
+        return self._alignmentgroup
+
+    @alignmentgroup.setter
+    def alignmentgroup(self, value: AlignmentGroup) -> None:
+        """Set the AlignmentGroup."""
+        self._alignmentgroup = value
+
     def _targetid(self, targetid: str) -> str:
         """Return a normalized target ID.
 
@@ -84,30 +249,156 @@ class AlignmentsReader:
         targetref: AlignmentReference = AlignmentReference(document=self.targetdoc, selectors=trgselectors)
         return AlignmentRecord(meta=meta, references={"source": sourceref, "target": targetref}, type=self.altype)
 
-    def read_alignments(self) -> AlignmentGroup:
-        """Read JSON alignments data and return an AlignmentGroup."""
-        with self.alignmentset.alignmentpath.open("rb") as f:
-            agroupdict = json.load(f)
-            if isinstance(agroupdict, list):
-                raise ValueError(
-                    f"{self.alignmentspath} should contain an object, not a list. Perhaps not converted to Burrito"
-                    " format yet?"
-                )
-            meta: Metadata = Metadata(**agroupdict["meta"])
+    def _group_item(self, key: str, value: Any) -> None:
+        """Process a group-level key and value."""
+        if key == "meta":
+            self.meta = Metadata(**value)
+        elif key == "type":
             # assumes default TranslationType to match self.altype,
             # and one value for the whole group: true for GC data, not
             # necessarily others
-            assert agroupdict["type"] == self.altype.type, f"Unexpected alignment type: {agroupdict['type']}"
-            records: list[AlignmentRecord] = [
-                record for alrec in agroupdict["records"] if (record := self._make_record(alrec)) if record
-            ]
-            return AlignmentGroup(
-                documents=(
-                    self.sourcedoc,
-                    self.targetdoc,
-                ),
-                meta=meta,
-                records=records,
-                # should be the same throughout
-                roles=records[0].roles,
+            assert value == self.altype.type, f"Unexpected alignment type: {value}"
+
+    def _iter_items(self) -> Iterator[tuple[str, Any]]:
+        """Yield (key, value) pairs for group data, and ('records', recorddict) for each record."""
+        if self.alignmentpath.suffix == ".jsonl":
+            with jsonlines.open(self.alignmentpath) as reader:
+                for lineno, line in enumerate(reader):
+                    if lineno == 0:
+                        yield from line.items()
+                    else:
+                        yield "records", line
+        else:
+            with self.alignmentpath.open("r", encoding="utf-8-sig") as f:
+                try:
+                    yield from _JSONStream(f).items(arraykey="records")
+                except ValueError as e:
+                    if isinstance(e, json.JSONDecodeError):
+                        raise
+                    raise ValueError(
+                        f"{self.alignmentpath} should contain an object, not a list. Perhaps not converted to"
+                        " Burrito format yet?"
+                    ) from e
+
+    def _iter_spans(self) -> Iterator[tuple[dict[str, Any], int, int]]:
+        """Yield (recorddict, start, end) for each record, with its byte positions in the file.
+
+        JSON files are decoded as Latin-1, so character positions are
+        byte positions: only use ASCII values from recorddict, like
+        selectors.
+        """
+        with self.alignmentpath.open("rb") as f:
+            if self.alignmentpath.suffix == ".jsonl":
+                # the first line has the group data
+                start = len(f.readline())
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line), start, start + len(line)
+                    start += len(line)
+            else:
+                bomlength = len(BOM_UTF8) if f.read(len(BOM_UTF8)) == BOM_UTF8 else 0
+                f.seek(bomlength)
+                stream = _JSONStream(io.TextIOWrapper(f, encoding="latin-1"))
+                for key, value in stream.items(arraykey="records", spans=True):
+                    if key == "records":
+                        recorddict, start, end = value
+                        yield recorddict, bomlength + start, bomlength + end
+
+    @staticmethod
+    def _source_bcv(selectors: list[str]) -> str:
+        """Return the source BCV for the source selectors of a record, as for AlignmentRecord.source_bcv.
+
+        Return '' if there are no selectors, or any aren't valid
+        identifiers.
+        """
+        try:
+            return min(bcv_from_id(macula_unprefixer(sel)) for sel in selectors) if selectors else ""
+        except (AssertionError, ValueError):
+            return ""
+
+    def record_index(self, cachedir: Optional[Path] = None) -> BCVIndex:
+        """Return a BCVIndex mapping BCV references to lists of AlignmentRecords.
+
+        Only the positions of records in the file are indexed, in a
+        single pass that doesn't make any AlignmentRecords: the records
+        for a BCV reference are read and made each time it is looked
+        up. Records are not checked. Records without a source BCV (no
+        selectors, or invalid ones) aren't indexed.
+
+        With cachedir, the positions are kept in a cache in that
+        directory, grouped by BCV and keyed by a hash of the file
+        content, so later indexes of an unchanged file don't read the
+        records at all.
+        """
+        cachepath: Optional[Path] = (
+            cache_path(cachedir, self.alignmentpath, kind="records", suffix="") if cachedir else None
+        )
+        if cachepath and cachepath.exists():
+            arrays, _ = load_arrays(cachepath)
+            bcvs = [bcv.decode("ascii") for bcv in arrays["bcvs"].tolist()]
+            offsets = dict(zip(bcvs, map(tuple, arrays["bounds"].tolist())))
+            spans = arrays["spans"].tolist()
+        else:
+            positions = (
+                (bcv, start, end)
+                for recorddict, start, end in self._iter_spans()
+                if (bcv := self._source_bcv(recorddict["source"]))
             )
+            values, offsets = bcv_offsets(positions, bcvfn=itemgetter(0))
+            spans = [(start, end) for _, start, end in values]
+            if cachepath:
+                arrays = {
+                    "bcvs": np.array(list(offsets), dtype="S"),
+                    "bounds": np.array(list(offsets.values()), dtype=np.int64).reshape(-1, 2),
+                    "spans": np.array(spans, dtype=np.int64).reshape(-1, 2),
+                }
+                save_arrays(cachepath, arrays, meta={"alignmentpath": str(self.alignmentpath)})
+        return BCVIndex.fromoffsets(spans, offsets, groupgetter=self._records_at)
+
+    def _records_at(self, spans: list[tuple[int, int]]) -> list[AlignmentRecord]:
+        """Read and return the AlignmentRecords at spans, the (start, end) byte positions of records.
+
+        The records for a verse are usually adjacent, so when they
+        cover most of the bytes between the first and last, those are
+        read at once. Otherwise, each record is read separately.
+        """
+        if not spans:
+            return []
+        first, last = min(start for start, _ in spans), max(end for _, end in spans)
+        with self.alignmentpath.open("rb") as f:
+            if last - first <= 2 * sum(end - start for start, end in spans):
+                f.seek(first)
+                block = f.read(last - first)
+                chunks = [block[start - first : end - first] for start, end in spans]
+            else:
+                chunks = []
+                for start, end in spans:
+                    f.seek(start)
+                    chunks.append(f.read(end - start))
+        return [self._make_record(json.loads(chunk)) for chunk in chunks]
+
+    def iter_records(self) -> Iterator[AlignmentRecord]:
+        """Read alignments data and yield one AlignmentRecord at a time.
+
+        Group-level metadata is set as self.meta when it is read.
+        """
+        for key, value in self._iter_items():
+            if key == "records":
+                if record := self._make_record(value):
+                    yield record
+            else:
+                self._group_item(key, value)
+
+    def read_alignments(self) -> AlignmentGroup:
+        """Read JSON alignments data and return an AlignmentGroup."""
+        records: list[AlignmentRecord] = list(self.iter_records())
+        return AlignmentGroup(
+            documents=(
+                self.sourcedoc,
+                self.targetdoc,
+            ),
+            meta=self.meta,
+            records=records,
+            # should be the same throughout
+            roles=records[0].roles if records else self.altype.roles,
+        )
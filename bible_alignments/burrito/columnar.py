@@ -0,0 +1,221 @@
+"""Columnar storage for token data.
+
+Token attributes are stored column by column. String values are
+interned in a single string table, serialized as a UTF-8 buffer plus
+byte offsets, and each column is an array of integer indexes into
+that table. This is much more compact than one object per token, and
+can be written and read without any per-token parsing.
+
+Caches are keyed by a hash of the content of the file they were
+derived from, and by FORMAT_VERSION and NORMALIZATION_VERSION. The
+content hash catches changed data files, but not changes to the code
+that parses and normalizes them: whenever that changes the values
+that are cached, NORMALIZATION_VERSION must be incremented, or old
+caches will still be used.
+
+>>> from bible_alignments.burrito import columnar
+>>> strtable = columnar.StringTable()
+>>> strtable.indexes(["noun", "verb", "noun"])
+array([0, 1, 0], dtype=int32)
+>>> strtable.strings
+['noun', 'verb']
+
+"""
+
+from glob import escape
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+# increment when the layout of cache files changes
+FORMAT_VERSION = 1
+# increment when reading or normalizing data changes the values that
+# are cached or snapshotted: for example, normalize_strongs() in
+# strongs.py, identifier normalization in source.py, or TRUTHYRE in
+# target.py
+NORMALIZATION_VERSION = 1
+
+
+def version_tag() -> str:
+    """Return the version tag for cache names, for FORMAT_VERSION and NORMALIZATION_VERSION."""
+    return f"v{FORMAT_VERSION}.{NORMALIZATION_VERSION}"
+
+
+def file_digest(path: Path, chunksize: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest for the content of path."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(chunksize):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def path_digest(*paths: Path) -> str:
+    """Return a short digest of the resolved locations of paths.
+
+    This distinguishes files with the same name in different
+    directories, like SBLGNT.tsv in several data roots.
+    """
+    digest = hashlib.sha256("\0".join(str(path.resolve()) for path in paths).encode("utf-8"))
+    return digest.hexdigest()[:8]
+
+
+def cache_path(cachedir: Path, datapath: Path, kind: str, suffix: str = ".npz") -> Path:
+    """Return the cache path for datapath in cachedir.
+
+    The name includes the stem of datapath and a digest of its
+    location, the kind of data (like 'source'), the format and
+    normalization versions, and a digest of the file content. So
+    caches for different files with the same name can share cachedir.
+
+    """
+    digest = file_digest(datapath)
+    return cachedir / f"{datapath.stem}-{path_digest(datapath)}-{kind}-{version_tag()}-{digest[:16]}{suffix}"
+
+
+def _remove_stale(cachepath: Path) -> None:
+    """Remove other cache files or directories for the same data and kind as cachepath.
+
+    These are the ones whose names only differ in the version and
+    content digest: older versions of the same file.
+    """
+    # drop the version and digest
+    basename = cachepath.name.rsplit("-", 2)[0]
+    for path in cachepath.parent.glob(f"{escape(basename)}-v*"):
+        if path == cachepath or path.name.endswith(".tmp"):
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+
+class StringTable:
+    """Intern strings as integer indexes."""
+
+    def __init__(self, strings: Optional[list[str]] = None) -> None:
+        """Initialize an instance, optionally with existing strings."""
+        self.strings: list[str] = list(strings) if strings else []
+        self._indexes: dict[str, int] = {string: index for index, string in enumerate(self.strings)}
+
+    def __len__(self) -> int:
+        """Return the number of strings."""
+        return len(self.strings)
+
+    def index(self, string: str) -> int:
+        """Return the index for string, adding it if necessary."""
+        if (index := self._indexes.get(string)) is None:
+            index = self._indexes[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+    def indexes(self, values: Iterable[str]) -> np.ndarray:
+        """Return an array of indexes for values."""
+        return np.fromiter((self.index(value) for value in values), dtype=np.int32)
+
+    def tobuffers(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return a UTF-8 buffer and byte offsets for the strings.
+
+        String i is buffer[offsets[i]:offsets[i + 1]].
+        """
+        encoded = [string.encode("utf-8") for string in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(enc) for enc in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+    @staticmethod
+    def frombuffers(buffer: np.ndarray, offsets: np.ndarray) -> "StringTable":
+        """Return a StringTable from a buffer and offsets."""
+        rawbytes = buffer.tobytes()
+        bounds = offsets.tolist()
+        return StringTable([rawbytes[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])])
+
+
+def save_columns(path: Path, columns: dict[str, Iterable[str]], meta: Optional[dict[str, Any]] = None) -> None:
+    """Write string columns to path as a .npz archive.
+
+    meta is stored with the columns, and must be JSON-serializable.
+
+    The archive is written to a temporary file and then moved into
+    place, so concurrent readers never see a partial file. Caches for
+    older content of the same data are removed.
+
+    """
+    strtable = StringTable()
+    arrays: dict[str, np.ndarray] = {f"col_{name}": strtable.indexes(values) for name, values in columns.items()}
+    arrays["strings"], arrays["offsets"] = strtable.tobuffers()
+    metadict = {"version": FORMAT_VERSION, "columns": list(columns), **(meta or {})}
+    arrays["meta"] = np.frombuffer(json.dumps(metadict).encode("utf-8"), dtype=np.uint8)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmppath = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmppath.open("wb") as f:
+        np.savez(f, **arrays)
+    tmppath.replace(path)
+    _remove_stale(path)
+
+
+def load_columns(path: Path) -> tuple[dict[str, list[str]], dict[str, Any]]:
+    """Return a dict of string columns and the metadata from path.
+
+    Raise ValueError if path was written with a different format version.
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        meta: dict[str, Any] = json.loads(archive["meta"].tobytes().decode("utf-8"))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache version {meta.get('version')} in {path}")
+        strings = np.array(StringTable.frombuffers(archive["strings"], archive["offsets"]).strings, dtype=object)
+        columns = {name: strings[archive[f"col_{name}"]].tolist() for name in meta["columns"]}
+    return columns, meta
+
+
+def save_arrays(dirpath: Path, arrays: dict[str, np.ndarray], meta: Optional[dict[str, Any]] = None) -> None:
+    """Write arrays to dirpath as one .npy file per array, plus meta.json.
+
+    Unlike save_columns(), the arrays can then be memory-mapped by
+    load_arrays(). The directory is written under a temporary name
+    and then moved into place.
+
+    """
+    tmpdir = dirpath.with_name(f"{dirpath.name}.{os.getpid()}.tmp")
+    tmpdir.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(tmpdir / f"{name}.npy", array, allow_pickle=False)
+    metadict = {"version": FORMAT_VERSION, "arrays": list(arrays), **(meta or {})}
+    (tmpdir / "meta.json").write_text(json.dumps(metadict), encoding="utf-8")
+    try:
+        tmpdir.rename(dirpath)
+    except OSError:
+        # another process got there first: its content is the same
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    _remove_stale(dirpath)
+
+
+def load_arrays(dirpath: Path, mmap: bool = True) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    """Return a dict of arrays and the metadata from dirpath.
+
+    With mmap = True (the default), arrays are read-only memory maps
+    of the files, so data is only paged in as it is used.
+
+    Raise ValueError if dirpath was written with a different format version.
+    """
+    meta: dict[str, Any] = json.loads((dirpath / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache version {meta.get('version')} in {dirpath}")
+    arrays = {name: _load_array(dirpath / f"{name}.npy", mmap=mmap) for name in meta["arrays"]}
+    return arrays, meta
+
+
+def _load_array(path: Path, mmap: bool = True) -> np.ndarray:
+    """Return the array in path, memory-mapped if possible."""
+    if mmap:
+        try:
+            return np.load(path, mmap_mode="r", allow_pickle=False)
+        except ValueError:
+            # empty arrays can't be memory-mapped
+            pass
+    return np.load(path, allow_pickle=False)
@@ -0,0 +1,564 @@
+"""Store alignment data for many alignment sets in a SQLite database.
+
+Each alignment set is read once with Manager, and its target tokens,
+alignment records, and bad records (with the reasons from
+Manager._bad_reason()) are stored in indexed tables. Source tokens
+are stored once per source file, and shared by every alignment set
+that uses it.
+
+StoredManager provides a read API like Manager's over the stored
+data, but only reads what is used: VerseData instances, tokens and
+records are made from indexed queries as they're needed. So many
+alignment sets can be served from one file without loading them all
+into memory.
+
+>>> from bible_alignments.burrito import DATAPATH, AlignmentSet, Manager, database
+>>> db = database.AlignmentDatabase(DATAPATH / "alignments.db")
+>>> alsets = {lang: AlignmentSet(targetlanguage=lang, targetid=targetid, sourceid="SBLGNT",
+...                              langdatapath=(DATAPATH / lang))
+...           for lang, targetid in [("eng", "BSB"), ("hin", "IRVHin")]}
+>>> for alset in alsets.values():
+...     db.add_alignmentset(alset)
+>>> list(db)
+['SBLGNT-BSB-manual', 'SBLGNT-IRVHin-manual']
+>>> mgr = db["SBLGNT-BSB-manual"]
+>>> mgr["41004003"]
+<VerseData: 41004003>
+
+# records by Strong's number, with one indexed query: the same
+# records as from a Manager, which reads the whole alignment set
+>>> records = mgr.token_alignments("G0191", tokenattr="strong")
+>>> records == Manager(alsets["eng"]).token_alignments("G0191", tokenattr="strong")
+True
+
+"""
+
+from collections.abc import Mapping
+import json
+from pathlib import Path
+import sqlite3
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from .AlignmentGroup import Document, Metadata, AlignmentReference, AlignmentRecord
+from .AlignmentSet import AlignmentSet
+from .AlignmentType import TranslationType
+from .BadRecord import BadRecord, Reason
+from .VerseData import VerseData
+from .alignments import AlignmentsReader
+from .columnar import file_digest
+from .manager import Manager
+from .source import Source, SourceReader
+from .target import Target, TargetReader
+
+# increment when the schema changes
+SCHEMA_VERSION = 1
+SOURCEFIELDS: tuple[str, ...] = Source._input_fields
+TARGETFIELDS: tuple[str, ...] = tuple(TargetReader.inmap.values())
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS corpora (
+    corpus INTEGER PRIMARY KEY,
+    sourceid TEXT NOT NULL,
+    digest TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS alignmentsets (
+    alset INTEGER PRIMARY KEY,
+    identifier TEXT NOT NULL UNIQUE,
+    corpus INTEGER NOT NULL REFERENCES corpora,
+    alignmentset TEXT NOT NULL,
+    meta TEXT NOT NULL,
+    digests TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    corpus INTEGER NOT NULL,
+    bcv TEXT NOT NULL,
+    {", ".join(f"{field} TEXT NOT NULL" for field in SOURCEFIELDS)},
+    PRIMARY KEY (corpus, id)
+);
+CREATE INDEX IF NOT EXISTS sources_bcv ON sources (corpus, bcv);
+CREATE INDEX IF NOT EXISTS sources_lemma ON sources (corpus, lemma);
+CREATE INDEX IF NOT EXISTS sources_strong ON sources (corpus, strong);
+CREATE TABLE IF NOT EXISTS targets (
+    alset INTEGER NOT NULL,
+    bcv TEXT NOT NULL,
+    {", ".join(f"{field} {'INTEGER' if field in Target._boolean_fields else 'TEXT'} NOT NULL"
+               for field in TARGETFIELDS)},
+    PRIMARY KEY (alset, id)
+);
+CREATE INDEX IF NOT EXISTS targets_bcv ON targets (alset, bcv);
+CREATE INDEX IF NOT EXISTS targets_text ON targets (alset, text);
+CREATE TABLE IF NOT EXISTS records (
+    alset INTEGER NOT NULL,
+    record INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    source_bcv TEXT NOT NULL,
+    meta TEXT NOT NULL,
+    PRIMARY KEY (alset, record)
+);
+CREATE INDEX IF NOT EXISTS records_id ON records (alset, id);
+CREATE INDEX IF NOT EXISTS records_bcv ON records (alset, source_bcv, record);
+CREATE TABLE IF NOT EXISTS record_tokens (
+    alset INTEGER NOT NULL,
+    record INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    selector TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS record_tokens_record ON record_tokens (alset, record);
+CREATE INDEX IF NOT EXISTS record_tokens_selector ON record_tokens (alset, role, selector);
+CREATE TABLE IF NOT EXISTS badrecords (
+    alset INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    data TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS badrecords_alset ON badrecords (alset);
+"""
+
+
+def _documents(alignmentset: AlignmentSet) -> tuple[Document, Document]:
+    """Return source and target Documents for alignmentset, as AlignmentsReader makes them."""
+    scheme = AlignmentsReader.scheme
+    return Document(docid=alignmentset.sourceid, scheme=scheme), Document(docid=alignmentset.targetid, scheme=scheme)
+
+
+def _record(
+    identifier: str,
+    meta: dict[str, Any],
+    selectors: dict[str, list[str]],
+    documents: tuple[Document, Document],
+) -> AlignmentRecord:
+    """Return an AlignmentRecord from stored values."""
+    references = {
+        role: AlignmentReference(document=document, selectors=selectors.get(role, []))
+        for role, document in zip(("source", "target"), documents)
+    }
+    return AlignmentRecord(meta=Metadata(**meta), references=references, type=TranslationType())
+
+
+class TokenTable(Mapping):
+    """Read-only mapping of identifiers to Source or Target instances in a database.
+
+    Like TargetStore, each retrieval makes a new (but equal)
+    instance. Use term_tokens() to find tokens by attribute values.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, table: str, keycolumn: str, key: int) -> None:
+        """Initialize an instance for rows in table where keycolumn is key."""
+        self.conn = conn
+        self.table = table
+        self.keycolumn = keycolumn
+        self.key = key
+        self.tokenclass: type = Source if table == "sources" else Target
+        self.fields: tuple[str, ...] = SOURCEFIELDS if table == "sources" else TARGETFIELDS
+        self._select = f"SELECT {', '.join(self.fields)} FROM {table} WHERE {keycolumn} = ?"
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        return f"<TokenTable: {self.table}, {len(self)} tokens>"
+
+    def __len__(self) -> int:
+        """Return the number of tokens."""
+        query = f"SELECT count(*) FROM {self.table} WHERE {self.keycolumn} = ?"
+        return self.conn.execute(query, (self.key,)).fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over identifiers in their original order."""
+        query = f"SELECT id FROM {self.table} WHERE {self.keycolumn} = ? ORDER BY rowid"
+        return (identifier for (identifier,) in self.conn.execute(query, (self.key,)))
+
+    def __contains__(self, identifier: object) -> bool:
+        """Return True if identifier is in the table."""
+        query = f"SELECT 1 FROM {self.table} WHERE {self.keycolumn} = ? AND id = ?"
+        return isinstance(identifier, str) and self.conn.execute(query, (self.key, identifier)).fetchone() is not None
+
+    def __getitem__(self, identifier: str) -> Union[Source, Target]:
+        """Return a new token instance for identifier."""
+        tokens = self._tokens(f"{self._select} AND id = ?", (self.key, identifier))
+        if not tokens:
+            raise KeyError(identifier)
+        return tokens[0]
+
+    def _columns(self, query: str, parameters: Iterable[Any]) -> dict[str, list[Any]]:
+        """Return a dict of token attribute values by column for the rows from query."""
+        rows = self.conn.execute(query, tuple(parameters)).fetchall()
+        columns: dict[str, list[Any]] = {field: list(values) for field, values in zip(self.fields, zip(*rows))}
+        for field in getattr(self.tokenclass, "_boolean_fields", ()):
+            if field in columns:
+                columns[field] = [bool(value) for value in columns[field]]
+        return columns
+
+    def _tokens(self, query: str, parameters: Iterable[Any]) -> list[Union[Source, Target]]:
+        """Return a list of token instances for the rows from query."""
+        columns = self._columns(query, parameters)
+        return self.tokenclass._fromcolumns(columns) if columns else []
+
+    def columns(self) -> dict[str, list[Any]]:
+        """Return a dict of attribute values by column for all the tokens, in order.
+
+        This is the form SourceReader(columns=...) and
+        TargetReader(columns=...) take.
+        """
+        return self._columns(f"{self._select} ORDER BY rowid", (self.key,)) or {field: [] for field in self.fields}
+
+    def get_many(self, identifiers: Iterable[str]) -> dict[str, Union[Source, Target]]:
+        """Return a dict of token instances for those of identifiers that are present."""
+        identifiers = list(dict.fromkeys(identifiers))
+        query = f"{self._select} AND id IN (SELECT value FROM json_each(?))"
+        tokens = {token.id: token for token in self._tokens(query, (self.key, json.dumps(identifiers)))}
+        return {identifier: tokens[identifier] for identifier in identifiers if identifier in tokens}
+
+    def verse_tokens(self, bcvid: str) -> list[Union[Source, Target]]:
+        """Return the tokens for a BCV reference, in order."""
+        return self._tokens(f"{self._select} AND bcv = ? ORDER BY rowid", (self.key, bcvid))
+
+    def _term_condition(self, tokenattr: str, lowercase: bool, prefix: str = "") -> str:
+        """Return an SQL condition matching tokenattr to a parameter.
+
+        prefix qualifies the column name, like 't.'.
+        """
+        assert tokenattr in self.fields, f"tokenattr must be one of {self.fields}"
+        # SQLite's lower() only handles ASCII
+        return f"pylower({prefix}{tokenattr}) = ?" if lowercase else f"{prefix}{tokenattr} = ?"
+
+    def term_tokens(self, term: str, tokenattr: str = "text", lowercase: bool = False) -> list[Union[Source, Target]]:
+        """Return a list of tokens containing term, as for SourceReader.term_tokens()."""
+        if not term:
+            return []
+        condition = self._term_condition(tokenattr, lowercase)
+        return self._tokens(
+            f"{self._select} AND {condition} ORDER BY rowid", (self.key, term.lower() if lowercase else term)
+        )
+
+
+class StoredManager(Mapping):
+    """Read alignment data for an alignment set from an AlignmentDatabase.
+
+    self is a mapping of BCV identifiers -> VerseData instances, like
+    Manager, but VerseData instances are made from the database as
+    they are used. sourceitems, targetitems and alignmentrecords are
+    read-only mappings that also query the database.
+    """
+
+    tokentypeattrs: set[str] = Manager.tokentypeattrs
+
+    def __init__(self, conn: sqlite3.Connection, alset: int) -> None:
+        """Initialize an instance for the alignment set with key alset."""
+        self.conn = conn
+        self.alset = alset
+        corpus, alsetjson, metajson = conn.execute(
+            "SELECT corpus, alignmentset, meta FROM alignmentsets WHERE alset = ?", (alset,)
+        ).fetchone()
+        alsetdict = json.loads(alsetjson)
+        self.alignmentset = AlignmentSet(**alsetdict)
+        self.meta = Metadata(**json.loads(metajson))
+        self.documents = _documents(self.alignmentset)
+        self.sourceitems = TokenTable(conn, "sources", "corpus", corpus)
+        self.targetitems = TokenTable(conn, "targets", "alset", alset)
+        self.alignmentrecords = StoredRecords(self)
+        self._badrecords: Optional[dict[str, BadRecord]] = None
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        return f"<StoredManager: {self.alignmentset.identifier}>"
+
+    def __len__(self) -> int:
+        """Return the number of BCV references with alignment records."""
+        query = "SELECT count(DISTINCT source_bcv) FROM records WHERE alset = ?"
+        return self.conn.execute(query, (self.alset,)).fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over BCV references with alignment records, in record order."""
+        query = "SELECT source_bcv FROM records WHERE alset = ? GROUP BY source_bcv ORDER BY min(record)"
+        return (bcvid for (bcvid,) in self.conn.execute(query, (self.alset,)))
+
+    def __contains__(self, bcvid: object) -> bool:
+        """Return True if bcvid has alignment records."""
+        query = "SELECT 1 FROM records WHERE alset = ? AND source_bcv = ? LIMIT 1"
+        return isinstance(bcvid, str) and self.conn.execute(query, (self.alset, bcvid)).fetchone() is not None
+
+    def __getitem__(self, bcvid: str) -> VerseData:
+        """Return a VerseData instance for bcvid."""
+        records = self.verse_records(bcvid)
+        if not records:
+            raise KeyError(bcvid)
+        sources = self.sourceitems.verse_tokens(bcvid)
+        targets = self.targetitems.verse_tokens(bcvid)
+        sourcedict = {token.id: token for token in sources}
+        targetdict = {token.id: token for token in targets}
+        # any tokens from other verses
+        sourcedict.update(
+            self.sourceitems.get_many(sel for rec in records for sel in rec.source_selectors if sel not in sourcedict)
+        )
+        targetdict.update(
+            self.targetitems.get_many(sel for rec in records for sel in rec.target_selectors if sel not in targetdict)
+        )
+        # as in Manager.make_versedata()
+        alinstpairs = [
+            (sourceinst, targetinst)
+            for rec in records
+            if (sourceinst := [sourcedict[tok] for tok in rec.source_selectors if tok in sourcedict])
+            if (targetinst := [targetdict[tok] for tok in rec.target_selectors if tok in targetdict])
+        ]
+        return VerseData(bcvid=bcvid, alignments=alinstpairs, sources=sources, targets=targets)
+
+    def _records(self, condition: str, parameters: tuple) -> list[AlignmentRecord]:
+        """Return a list of alignment records for rows in records matching condition, in record order."""
+        rows = self.conn.execute(
+            f"SELECT record, id, meta FROM records WHERE alset = ? AND {condition} ORDER BY record",
+            (self.alset, *parameters),
+        ).fetchall()
+        if not rows:
+            return []
+        selectors: dict[int, dict[str, list[str]]] = {record: {} for record, _, _ in rows}
+        query = (
+            "SELECT record, role, selector FROM record_tokens WHERE alset = ? AND record IN"
+            f" (SELECT record FROM records WHERE alset = ? AND {condition}) ORDER BY rowid"
+        )
+        for record, role, selector in self.conn.execute(query, (self.alset, self.alset, *parameters)):
+            selectors[record].setdefault(role, []).append(selector)
+        return [
+            _record(identifier, json.loads(meta), selectors[record], self.documents)
+            for record, identifier, meta in rows
+        ]
+
+    def verse_records(self, bcvid: str) -> list[AlignmentRecord]:
+        """Return the alignment records for bcvid, in order."""
+        return self._records("source_bcv = ?", (bcvid,))
+
+    def token_records(self, tokenids: Iterable[str], role: str = "source") -> list[AlignmentRecord]:
+        """Return a list of alignment records whose role tokens include any of tokenids, as for Manager."""
+        assert role in self.tokentypeattrs, f"role must be one of {self.tokentypeattrs}"
+        condition = (
+            "record IN (SELECT record FROM record_tokens WHERE alset = ? AND role = ?"
+            " AND selector IN (SELECT value FROM json_each(?)))"
+        )
+        return self._records(condition, (self.alset, role, json.dumps(list(tokenids))))
+
+    def token_alignments(
+        self, term: str, role: str = "source", tokenattr: str = "text", lowercase: bool = False
+    ) -> list[AlignmentRecord]:
+        """Return a list of alignments whose role tokens contain term, as for Manager.
+
+        This is a single indexed query for the records: for example,
+        by lemma or Strong's number (tokenattr='strong').
+        """
+        assert role in self.tokentypeattrs, f"role must be one of {self.tokentypeattrs}"
+        if not term:
+            return []
+        tokens = self.sourceitems if role == "source" else self.targetitems
+        # CROSS JOIN makes SQLite find the tokens first, by index
+        condition = (
+            f"record IN (SELECT rt.record FROM {tokens.table} t CROSS JOIN record_tokens rt"
+            " ON rt.alset = ? AND rt.role = ? AND rt.selector = t.id"
+            f" WHERE t.{tokens.keycolumn} = ? AND {tokens._term_condition(tokenattr, lowercase, prefix='t.')})"
+        )
+        return self._records(condition, (self.alset, role, tokens.key, term.lower() if lowercase else term))
+
+    @property
+    def badrecords(self) -> dict[str, BadRecord]:
+        """Return a dict of the bad records found when the alignment set was added."""
+        if self._badrecords is None:
+            query = "SELECT id, reason, data, record FROM badrecords WHERE alset = ? ORDER BY rowid"
+            self._badrecords = {}
+            for identifier, reason, data, recordjson in self.conn.execute(query, (self.alset,)):
+                recdict = json.loads(recordjson)
+                record = _record(
+                    identifier,
+                    recdict["meta"],
+                    {"source": recdict["source"], "target": recdict["target"]},
+                    self.documents,
+                )
+                self._badrecords[identifier] = BadRecord(
+                    identifier=identifier, record=record, reason=Reason[reason], data=json.loads(data)
+                )
+        return self._badrecords
+
+
+class StoredRecords(Mapping):
+    """Read-only mapping of record identifiers to AlignmentRecords for a StoredManager."""
+
+    def __init__(self, mgr: StoredManager) -> None:
+        """Initialize an instance for mgr."""
+        self.mgr = mgr
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return self.mgr.conn.execute("SELECT count(*) FROM records WHERE alset = ?", (self.mgr.alset,)).fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over record identifiers in order."""
+        query = "SELECT id FROM records WHERE alset = ? ORDER BY record"
+        return (identifier for (identifier,) in self.mgr.conn.execute(query, (self.mgr.alset,)))
+
+    def __getitem__(self, identifier: str) -> AlignmentRecord:
+        """Return the AlignmentRecord for identifier."""
+        records = self.mgr._records("id = ?", (identifier,))
+        if not records:
+            raise KeyError(identifier)
+        return records[0]
+
+
+class AlignmentDatabase(Mapping):
+    """Store alignment sets in a SQLite database.
+
+    self is a mapping of alignment set identifiers -> StoredManager
+    instances.
+    """
+
+    def __init__(self, dbpath: Path) -> None:
+        """Initialize an instance, creating the database at dbpath if necessary."""
+        self.dbpath = dbpath
+        self.conn = sqlite3.connect(dbpath)
+        self.conn.create_function("pylower", 1, str.lower, deterministic=True)
+        # readers aren't blocked while an alignment set is added
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError(f"{dbpath} has schema version {version}, not {SCHEMA_VERSION}")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        return f"<AlignmentDatabase: {self.dbpath}, {len(self)} alignment sets>"
+
+    def __len__(self) -> int:
+        """Return the number of alignment sets."""
+        return self.conn.execute("SELECT count(*) FROM alignmentsets").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over alignment set identifiers in the order they were added."""
+        query = "SELECT identifier FROM alignmentsets ORDER BY alset"
+        return (identifier for (identifier,) in self.conn.execute(query))
+
+    def __getitem__(self, identifier: str) -> StoredManager:
+        """Return a StoredManager for identifier."""
+        row = self.conn.execute("SELECT alset FROM alignmentsets WHERE identifier = ?", (identifier,)).fetchone()
+        if row is None:
+            raise KeyError(identifier)
+        return StoredManager(self.conn, row[0])
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    @staticmethod
+    def _digests(alignmentset: AlignmentSet) -> dict[str, str]:
+        """Return digests of the files for alignmentset."""
+        return {
+            pathattr: file_digest(getattr(alignmentset, pathattr))
+            for pathattr in ("sourcepath", "targetpath", "alignmentpath")
+        }
+
+    def add_alignmentset(self, alignmentset: AlignmentSet, force: bool = False, **kwargs: Any) -> bool:
+        """Add or update the data for alignmentset, and return True if it was (re-)read.
+
+        Unless force = True, nothing is done if the files for
+        alignmentset are unchanged since it was added. kwargs are
+        passed to Manager().
+        """
+        digests = self._digests(alignmentset)
+        row = self.conn.execute(
+            "SELECT digests FROM alignmentsets WHERE identifier = ?", (alignmentset.identifier,)
+        ).fetchone()
+        if row and json.loads(row[0]) == digests and not force:
+            return False
+        sourceitems = kwargs.pop("sourceitems", None)
+        if sourceitems is None and (corpus := self._corpus(digests["sourcepath"])) is not None:
+            # stored already: avoid parsing the source file again
+            columns = TokenTable(self.conn, "sources", "corpus", corpus).columns()
+            sourceitems = SourceReader(alignmentset.sourcepath, columns=columns)
+        mgr = Manager(alignmentset, sourceitems=sourceitems, **kwargs)
+        self.add(mgr, digests=digests)
+        return True
+
+    def _corpus(self, digest: str) -> Optional[int]:
+        """Return the key for the source corpus with digest, or None."""
+        row = self.conn.execute("SELECT corpus FROM corpora WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, mgr: Manager, digests: Optional[dict[str, str]] = None) -> None:
+        """Add or replace the data for mgr.alignmentset from mgr."""
+        alignmentset = mgr.alignmentset
+        digests = digests or self._digests(alignmentset)
+        with self.conn:
+            self._delete(alignmentset.identifier)
+            corpus = self._corpus(digests["sourcepath"])
+            if corpus is None:
+                corpus = self.conn.execute(
+                    "INSERT INTO corpora (sourceid, digest) VALUES (?, ?)",
+                    (alignmentset.sourceid, digests["sourcepath"]),
+                ).lastrowid
+                self._insert_tokens("sources", corpus, SOURCEFIELDS, mgr.sourceitems.values())
+            alsetdict = {
+                "sourceid": alignmentset.sourceid,
+                "targetid": alignmentset.targetid,
+                "targetlanguage": alignmentset.targetlanguage,
+                "alternateid": alignmentset.alternateid,
+            }
+            alset = self.conn.execute(
+                "INSERT INTO alignmentsets (identifier, corpus, alignmentset, meta, digests) VALUES (?, ?, ?, ?, ?)",
+                (
+                    alignmentset.identifier,
+                    corpus,
+                    json.dumps(alsetdict),
+                    json.dumps(mgr.alignmentgroup.meta.asdict(), default=str),
+                    json.dumps(digests),
+                ),
+            ).lastrowid
+            self._insert_tokens("targets", alset, TARGETFIELDS, mgr.targetitems.values())
+            records = [rec for rec in mgr.alignmentrecords.values() if rec.identifier not in mgr.badrecords]
+            self.conn.executemany(
+                "INSERT INTO records VALUES (?, ?, ?, ?, ?)",
+                (
+                    (alset, position, rec.identifier, rec.source_bcv, json.dumps(rec.meta.asdict(), default=str))
+                    for position, rec in enumerate(records)
+                ),
+            )
+            self.conn.executemany(
+                "INSERT INTO record_tokens VALUES (?, ?, ?, ?)",
+                (
+                    (alset, position, role, selector)
+                    for position, rec in enumerate(records)
+                    for role in ("source", "target")
+                    for selector in rec.get_selectors(role)
+                ),
+            )
+            self.conn.executemany(
+                "INSERT INTO badrecords VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        alset,
+                        identifier,
+                        badrec.reason.name,
+                        json.dumps(list(badrec.data)),
+                        json.dumps(badrec.record.asdict(withmaculaprefix=False), default=str),
+                    )
+                    for identifier, badrec in mgr.badrecords.items()
+                ),
+            )
+
+    def _insert_tokens(self, table: str, key: int, fields: tuple[str, ...], tokens: Iterable[Any]) -> None:
+        """Insert rows for tokens into table."""
+        placeholders = ", ".join("?" * (len(fields) + 2))
+        self.conn.executemany(
+            f"INSERT INTO {table} VALUES ({placeholders})",
+            ((key, token.bcv, *(getattr(token, field) for field in fields)) for token in tokens),
+        )
+
+    def delete(self, identifier: str) -> None:
+        """Delete the data for the alignment set identifier, if present.
+
+        Source tokens are kept, even if no other alignment set uses them.
+        """
+        with self.conn:
+            self._delete(identifier)
+
+    def _delete(self, identifier: str) -> None:
+        """Delete the data for the alignment set identifier, within the current transaction."""
+        row = self.conn.execute("SELECT alset FROM alignmentsets WHERE identifier = ?", (identifier,)).fetchone()
+        if row is not None:
+            for table in ("targets", "records", "record_tokens", "badrecords", "alignmentsets"):
+                self.conn.execute(f"DELETE FROM {table} WHERE alset = ?", row)
@@ -0,0 +1,157 @@
+"""Load Managers for many alignment sets at once.
+
+Each source corpus (like SBLGNT or WLCM) is read once and shared by
+every alignment set that uses it. Managers are then built in a pool
+of worker processes.
+
+>>> from bible_alignments.burrito import DATAPATH, AlignmentSet, loader
+>>> alsets = [AlignmentSet(targetlanguage=lang, targetid=targetid, sourceid="SBLGNT", langdatapath=(DATAPATH / lang))
+              for lang, targetid in [("eng", "BSB"), ("eng", "YLT"), ("hin", "IRVHin")]]
+# summaries are small, so cheap to return from the workers
+>>> results = loader.load_managers(alsets, keep=False)
+>>> for result in results:
+...     print(result.alignmentset.identifier, f"{result.seconds:.1f}", result.summary["records"])
+SBLGNT-BSB-manual 21.3 130112
+...
+# or return the Managers themselves
+>>> managers = [result.manager for result in loader.load_managers(alsets)]
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, redirect_stdout
+from dataclasses import dataclass, field
+import io
+import multiprocessing
+from pathlib import Path
+import time
+import traceback
+from typing import Any, Iterable, Optional
+
+from .AlignmentSet import AlignmentSet
+from .manager import Manager
+from .source import SourceReader
+
+# source readers shared with worker processes: see _init_worker()
+_SOURCES: dict[Path, SourceReader] = {}
+
+
+@dataclass
+class LoadResult:
+    """The result of loading a Manager for an AlignmentSet."""
+
+    alignmentset: AlignmentSet
+    # None unless keep=True, or if loading failed
+    manager: Optional[Manager] = None
+    # seconds to build the Manager, not counting reading sources
+    seconds: float = 0.0
+    # seconds to read the (shared) source data
+    sourceseconds: float = 0.0
+    # counts of data items: see summarize()
+    summary: dict[str, int] = field(default_factory=dict)
+    # a traceback if loading failed
+    error: str = ""
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        status = f"error: {self.error.strip().splitlines()[-1]}" if self.error else f"{self.seconds:.2f}s"
+        return f"<LoadResult: {self.alignmentset.identifier}, {status}>"
+
+
+def summarize(mgr: Manager) -> dict[str, int]:
+    """Return a dict of counts for the data in mgr."""
+    return {
+        "sources": len(mgr.sourceitems),
+        "targets": len(mgr.targetitems),
+        "records": len(mgr.alignmentrecords),
+        "badrecords": len(mgr.badrecords),
+        "verses": len(mgr.bcv["records"]),
+    }
+
+
+def read_sources(
+    alignmentsets: Iterable[AlignmentSet], cachedir: Optional[Path] = None
+) -> dict[Path, tuple[SourceReader, float]]:
+    """Read each distinct source file for alignmentsets once.
+
+    Return a dict mapping source paths to a SourceReader and the
+    seconds it took to read.
+    """
+    sources: dict[Path, tuple[SourceReader, float]] = {}
+    for alset in alignmentsets:
+        if alset.sourcepath not in sources:
+            start = time.perf_counter()
+            reader = SourceReader(alset.sourcepath, cachedir=cachedir)
+            sources[alset.sourcepath] = (reader, time.perf_counter() - start)
+    return sources
+
+
+def _init_worker(sources: dict[Path, SourceReader]) -> None:
+    """Make sources available to load_manager() in a worker process."""
+    _SOURCES.clear()
+    _SOURCES.update(sources)
+
+
+def load_manager(alignmentset: AlignmentSet, keep: bool = True, quiet: bool = True, **kwargs: Any) -> LoadResult:
+    """Return a LoadResult for a Manager for alignmentset.
+
+    This uses a shared SourceReader for the source data if one is
+    available. With keep = False (default is True), the Manager
+    itself is not returned. With quiet = True (the default), discard
+    the messages Manager prints. kwargs are passed to Manager().
+    """
+    result = LoadResult(alignmentset=alignmentset)
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()) if quiet else nullcontext():
+            mgr = Manager(alignmentset, sourceitems=_SOURCES.get(alignmentset.sourcepath), **kwargs)
+    except Exception:
+        result.error = traceback.format_exc()
+        return result
+    result.seconds = time.perf_counter() - start
+    result.summary = summarize(mgr)
+    if keep:
+        result.manager = mgr
+    return result
+
+
+def load_managers(
+    alignmentsets: Iterable[AlignmentSet],
+    keep: bool = True,
+    processes: Optional[int] = None,
+    cachedir: Optional[Path] = None,
+    **kwargs: Any,
+) -> list[LoadResult]:
+    """Return a list of LoadResults for alignmentsets, in the same order.
+
+    Source files are read once in this process, and Managers are
+    built in a pool of processes (default is one per CPU). Where
+    available, workers are forked, so they share the source data
+    without copying it.
+
+    With keep = True (the default), each result includes its
+    Manager. These have to be copied back from the workers, source
+    tokens included, so use keep = False to get only the timing and
+    summary counts, which is much faster for many alignment sets.
+
+    A failure for one alignment set is recorded as the error for its
+    result, and doesn't stop the others. cachedir and any kwargs are
+    passed to Manager().
+    """
+    alignmentsets = list(alignmentsets)
+    sources = read_sources(alignmentsets, cachedir=cachedir)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=({sourcepath: reader for sourcepath, (reader, _) in sources.items()},),
+    ) as executor:
+        futures = [
+            executor.submit(load_manager, alset, keep=keep, cachedir=cachedir, **kwargs) for alset in alignmentsets
+        ]
+        results = [future.result() for future in futures]
+    for result in results:
+        result.sourceseconds = sources[result.alignmentset.sourcepath][1]
+    return results
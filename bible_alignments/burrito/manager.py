@@ -15,23 +15,82 @@ are identified by a language (code), target and source IDs, and a path to the da
 >>> mgr["40001024"]
 <VerseData: 40001024>
 
+# for quick lookups of a few verses, build VerseData instances only as needed
+>>> mgr = Manager(alset, lazy=True)
+>>> mgr["40001024"]
+<VerseData: 40001024>
+
+# save the built Manager, and restore it next time if the data is unchanged
+>>> mgr = Manager(alset, snapshotdir=SNAPSHOTDIR)
+
 """
 
-from collections import UserDict
+from collections import OrderedDict, UserDict
+from collections.abc import Mapping
 from dataclasses import dataclass
 from enum import Enum
-from itertools import groupby
 import json
-from typing import Any, Callable, Optional
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import numpy as np
 
 from .AlignmentGroup import Document, Metadata, AlignmentGroup, AlignmentReference, AlignmentRecord
 from .AlignmentSet import AlignmentSet
-from .BadRecord import BadRecord, Reason
-from .VerseData import VerseData
+from .BadRecord import BadRecord, count_reasons, find_badrecords
+from .VerseData import VerseData, alignment_matrices
 from .alignments import AlignmentsReader
-from .source import Source, SourceReader
-from .target import Target, TargetReader
-from .util import groupby_bcv
+from .snapshot import load_snapshot, save_snapshot, snapshot_path
+from .source import Source, SourceReader, sourceregistry
+from .target import Target, TargetReader, TargetStore
+from .util import BCVIndex, groupby_bcv, id_to_bcv
+
+
+class VerseDataCache(Mapping):
+    """Map BCV references to VerseData instances, made on first access.
+
+    At most maxsize instances are kept: the least recently used are
+    discarded, and made again if needed.
+    """
+
+    def __init__(self, makefn: Callable[[str], VerseData], bcvrecords: Mapping, maxsize: int = 1024) -> None:
+        """Initialize an instance.
+
+        makefn(bcvid) returns a VerseData instance, for each bcvid in
+        bcvrecords.
+        """
+        self.makefn: Callable[[str], VerseData] = makefn
+        self.bcvrecords: Mapping = bcvrecords
+        self.maxsize: int = maxsize
+        self._cache: OrderedDict[str, VerseData] = OrderedDict()
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        return f"<VerseDataCache: {len(self._cache)}/{len(self)} cached>"
+
+    def __getitem__(self, bcvid: str) -> VerseData:
+        """Return the VerseData instance for bcvid, making it if necessary."""
+        if bcvid in self._cache:
+            self._cache.move_to_end(bcvid)
+            return self._cache[bcvid]
+        if bcvid not in self.bcvrecords:
+            raise KeyError(bcvid)
+        versedata = self._cache[bcvid] = self.makefn(bcvid)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return versedata
+
+    def __contains__(self, bcvid: object) -> bool:
+        """Return True if bcvid has alignment records."""
+        return bcvid in self.bcvrecords
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over BCV references."""
+        return iter(self.bcvrecords)
+
+    def __len__(self) -> int:
+        """Return the number of BCV references."""
+        return len(self.bcvrecords)
 
 
 # create a Manager class to read data into AlignmentGroup instances
@@ -53,6 +112,24 @@ class Manager(UserDict):
         keeptargetwordpart: bool = False,
         # if True, don't remove bad records
         keepbadrecords: bool = False,
+        # directory for cached source data: see SourceReader
+        cachedir: Optional[Path] = None,
+        # directory for memory-mapped target data: see TargetReader
+        storedir: Optional[Path] = None,
+        # if True, make VerseData instances only when needed
+        lazy: bool = False,
+        # maximum number of VerseData instances kept when lazy
+        cachesize: int = 1024,
+        # source data already read, e.g. shared with other Managers
+        sourceitems: Optional[SourceReader] = None,
+        # if True, share source data through source.sourceregistry
+        sharesources: bool = False,
+        # target data already read
+        targetitems: Optional[TargetReader] = None,
+        # alignment records already read
+        alignmentgroup: Optional[AlignmentGroup] = None,
+        # directory for snapshots of the built Manager: see snapshot.py
+        snapshotdir: Optional[Path] = None,
     ) -> None:
         """Initialize a Manager instance for an AlignmentSet.
 
@@ -60,10 +137,61 @@ class Manager(UserDict):
         representing the part index for a target token
         ID. keeptargetwordpart does not affect source token identifiers.
 
+        With cachedir, source data is read from a columnar cache in
+        that directory when the source file is unchanged.
+
+        With storedir, target data is kept in memory-mapped arrays in
+        that directory, and Target instances are only created as they
+        are used. Targets are grouped by BCV as identifiers, so the
+        VerseData instances hold the only Target instances.
+
+        With lazy = True (default is False), data is only grouped by
+        BCV when first needed, and a VerseData instance is only made
+        when its BCV reference is looked up, keeping at most cachesize
+        of them. This is much faster for looking up a few verses.
+        Alignment records are indexed by their positions in the file
+        (cached in cachedir, if given), and only read and checked for
+        the verse being made: bad records are added to
+        self.badrecords as they're found. So self.bcv["records"] has
+        unchecked records, and a verse with only bad records has a
+        VerseData instance with no alignments. self.alignmentgroup
+        and self.alignmentrecords read and check all the records when
+        first used.
+
+        With sourceitems, use that SourceReader instead of reading
+        alignmentset.sourcepath: this saves time and memory when
+        several Managers share a source corpus.
+
+        With sharesources = True (default is False), get source data
+        from source.sourceregistry, so Managers in this process with
+        the same source file share one (frozen) SourceReader.
+
+        Likewise, with targetitems or alignmentgroup, use those instead
+        of reading alignmentset.targetpath or
+        alignmentset.alignmentpath: for example, data read from a
+        Parquet export (see parquet.py).
+
+        With snapshotdir, the built Manager is saved there, and
+        restored without reading or checking the data again when the
+        source, target, and alignment files are unchanged (see
+        snapshot.py). This can't be used with lazy, storedir,
+        sharesources, or data already read.
+
         """
         super().__init__()
         self.keeptargetwordpart: bool = keeptargetwordpart
         self.keepbadrecords: bool = keepbadrecords
+        self.cachedir: Optional[Path] = cachedir
+        self.storedir: Optional[Path] = storedir
+        self.lazy: bool = lazy
+        self.sharesources: bool = sharesources
+        # token identifier -> record positions, by role: see token_records()
+        self._tokenindexes: dict[str, dict[str, list[int]]] = {}
+        self._tokenindexrecords: Optional[list[AlignmentRecord]] = None
+        # all the records, and the good ones by identifier: see
+        # _check_records()
+        self._alignmentgroup: Optional[AlignmentGroup] = alignmentgroup
+        self._alignmentrecords: Optional[dict[str, AlignmentRecord]] = None
         # # bad records when processing JSON: set in _make_record
         # self.badrecords: Optional[dict[str, BadRecord]] = {}
         # set in _clean_alignmentrecords
@@ -71,124 +199,234 @@ class Manager(UserDict):
         # the configuration of alignment data
         self.alignmentset: AlignmentSet = alignmentset
         print(self.alignmentset.displaystr)
+        self.snapshotpath: Optional[Path] = None
+        if snapshotdir:
+            if lazy or storedir or sharesources or any(
+                items is not None for items in (sourceitems, targetitems, alignmentgroup)
+            ):
+                raise ValueError("snapshotdir can't be used with lazy, storedir, sharesources, or data already read")
+            self.snapshotpath = snapshot_path(
+                snapshotdir, alignmentset, keeptargetwordpart=keeptargetwordpart, keepbadrecords=keepbadrecords
+            )
+            if self.snapshotpath.exists():
+                load_snapshot(self, self.snapshotpath)
+                self._report_badrecords()
+                self.data = self.bcv["versedata"]
+                self.check_integrity()
+                return
         # refactored code: leave bad record checking here, since that
         # also needs source/target TSVs
-        alreader: AlignmentsReader = AlignmentsReader(
-            alignmentset=self.alignmentset, keeptargetwordpart=self.keeptargetwordpart
+        self._alreader: AlignmentsReader = AlignmentsReader(
+            alignmentset=self.alignmentset, keeptargetwordpart=self.keeptargetwordpart, lazy=True
         )
-        self.alignmentgroup: AlignmentGroup = alreader.read_alignments()
+        if self.lazy:
+            # records are checked as each verse is made
+            recordindex: BCVIndex = (
+                self._alreader.record_index(cachedir=self.cachedir)
+                if self._alignmentgroup is None
+                else BCVIndex(self._alignmentgroup.records, bcvfn=self._record_bcv)
+            )
+        elif self._alignmentgroup is None:
+            self._alignmentgroup = self._alreader.alignmentgroup
         # keys are token identifiers from source/manuscript data
-        self.sourceitems: SourceReader = self.read_sources()
-        self.targetitems: TargetReader = self.read_targets()
+        self.sourceitems: SourceReader = sourceitems if sourceitems is not None else self.read_sources()
+        self.targetitems: TargetReader = targetitems if targetitems is not None else self.read_targets()
         # several sets of data, all grouped by BCV
-        self.bcv = {
-            # The source and target token readers with the TSV data
-            "sources": groupby_bcv(list(self.sourceitems.values())),
-            "targets": groupby_bcv(list(self.targetitems.values())),
-            # by source_verse attribute: this should coordinate with source
-            "target_sourceverses": groupby_bcv(list(self.targetitems.values()), bcvfn=lambda t: t.source_verse),
-        }
+        if self.lazy:
+            # store token identifiers grouped by verse, and retrieve tokens as needed
+            self.bcv = {
+                "sources": BCVIndex(self.sourceitems, bcvfn=id_to_bcv, getter=self.sourceitems.__getitem__),
+                "targets": BCVIndex(self.targetitems, bcvfn=id_to_bcv, getter=self.targetitems.__getitem__),
+                "target_sourceverses": BCVIndex(
+                    self.targetitems, bcvfn=self._target_sourceverse, getter=self.targetitems.__getitem__
+                ),
+            }
+        elif isinstance(self.targetitems.data, TargetStore):
+            # each lookup in a TargetStore makes a new Target: group
+            # identifiers, as when lazy, so only VerseData instances
+            # hold Target instances
+            self.bcv = {
+                "sources": groupby_bcv(self.sourceitems.values()),
+                "targets": BCVIndex(self.targetitems, bcvfn=id_to_bcv, getter=self.targetitems.__getitem__),
+                "target_sourceverses": BCVIndex(
+                    self.targetitems, bcvfn=self._target_sourceverse, getter=self.targetitems.__getitem__
+                ),
+            }
+        else:
+            self.bcv = {
+                # The source and target token readers with the TSV data
+                "sources": groupby_bcv(self.sourceitems.values()),
+                "targets": groupby_bcv(self.targetitems.values()),
+                # by source_verse attribute: this should coordinate with source
+                "target_sourceverses": groupby_bcv(self.targetitems.values(), bcvfn=lambda t: t.source_verse),
+            }
+        # group sources/targets by verse: they're not all included in alignments
+        # group alignment records by bcv
+        if self.lazy:
+            self.bcv["records"] = recordindex
+            self.bcv["versedata"] = VerseDataCache(self._make_versedata, self.bcv["records"], maxsize=cachesize)
+        else:
+            self._check_records()
+            self.bcv["records"]: dict[str, list[AlignmentRecord]] = groupby_bcv(
+                self.alignmentrecords.values(), self._record_bcv
+            )
+            # and make VerseData instances
+            self.bcv["versedata"] = {
+                bcvid: self.make_versedata(bcvid, self.bcv["records"]) for bcvid in self.bcv["records"]
+            }
+        self.data = self.bcv["versedata"]
+        # checking groups every verse: call check_integrity() explicitly if lazy
+        if not self.lazy:
+            self.check_integrity()
+        if self.snapshotpath:
+            save_snapshot(self, self.snapshotpath)
+
+    def _target_sourceverse(self, identifier: str) -> str:
+        """Return the source_verse value for a target identifier."""
+        return self.targetitems[identifier].source_verse
+
+    @staticmethod
+    def _record_bcv(arec: AlignmentRecord) -> str:
+        """Return the source BCV for an alignment record."""
+        return arec.source_bcv
+
+    @property
+    def alignmentgroup(self) -> AlignmentGroup:
+        """Return the AlignmentGroup, without bad records unless keepbadrecords.
+
+        When lazy, all the records are read and checked on first use.
+        """
+        if self._alignmentrecords is None:
+            self._check_records()
+        return self._alignmentgroup
+
+    @alignmentgroup.setter
+    def alignmentgroup(self, value: AlignmentGroup) -> None:
+        """Set the AlignmentGroup."""
+        self._alignmentgroup = value
+
+    @property
+    def alignmentrecords(self) -> dict[str, AlignmentRecord]:
+        """Return a dict of alignment records by identifier, without bad records unless keepbadrecords.
+
+        When lazy, all the records are read and checked on first use.
+        """
+        if self._alignmentrecords is None:
+            self._check_records()
+        return self._alignmentrecords
+
+    @alignmentrecords.setter
+    def alignmentrecords(self, value: dict[str, AlignmentRecord]) -> None:
+        """Set the dict of alignment records."""
+        self._alignmentrecords = value
+
+    def _check_records(self) -> None:
+        """Read all the alignment records if necessary, and find bad ones in self.badrecords."""
+        if self._alignmentgroup is None:
+            self._alignmentgroup = self._alreader.alignmentgroup
         # The individual AlignmentRecords for convenience: you'll
         # often want them by BCV though
-        alrecdict: dict[str, AlignmentRecord] = {arec.meta.id: arec for arec in self.alignmentgroup.records}
+        alrecdict: dict[str, AlignmentRecord] = {arec.meta.id: arec for arec in self._alignmentgroup.records}
         # drop badrecords: this means
         # alignmentrecords will be smaller than
         # alignmentgroup.records, but will omit some bad data.
-        self.alignmentrecords = self._clean_alignmentrecords(alrecdict)
+        self._alignmentrecords = self._clean_alignmentrecords(alrecdict)
         if self.badrecords:
             # update alignmentgroup with the right set of records
-            self.alignmentgroup.records = list(self.alignmentrecords.values())
-        # group sources/targets by verse: they're not all included in alignments
-        # group alignment records by bcv
-        self.bcv["records"]: dict[str, list[AlignmentRecord]] = groupby_bcv(
-            list(self.alignmentrecords.values()), lambda r: r.source_bcv
-        )
-        # and make VerseData instances
-        self.bcv["versedata"] = {
-            bcvid: self.make_versedata(bcvid, self.bcv["records"]) for bcvid in self.bcv["records"]
-        }
-        self.data = self.bcv["versedata"]
-        self.check_integrity()
+            self._alignmentgroup.records = list(self._alignmentrecords.values())
+
+    def _make_versedata(self, bcvid: str) -> VerseData:
+        """Return a VerseData instance for bcvid from the records grouped by BCV.
+
+        The records for bcvid are checked here: bad ones are added to
+        self.badrecords, and dropped unless keepbadrecords.
+        """
+        records = self.bcv["records"][bcvid]
+        if badrecords := find_badrecords({rec.identifier: rec for rec in records}, self.sourceitems, self.targetitems):
+            self.badrecords.update(badrecords)
+            if not self.keepbadrecords:
+                records = [rec for rec in records if rec.identifier not in badrecords]
+        return self.make_versedata(bcvid, {bcvid: records})
 
     def _bad_reason(self, arec: AlignmentRecord) -> Optional[BadRecord]:
-        """Return a reason instance if the alignment record is malformed, or ''.
+        """Return a reason instance if the alignment record is malformed, or None.
 
-        Optionally add a tuple of supporting data.
+        Optionally add a tuple of supporting data. To check many
+        records, use BadRecord.find_badrecords(), which is much faster.
         """
-        # internally, we don't use macula prefixes (only on output)
-        arecdict = arec.asdict(withmaculaprefix=False)
-        badrecdict = {"identifier": arec.identifier, "record": arec}
-        # these labels must match what's in BadRecord._reasons
-        if not arecdict["source"]:
-            return BadRecord(**badrecdict, reason=Reason.NOSOURCE)
-        elif "" in arecdict["source"]:
-            return BadRecord(**badrecdict, reason=Reason.EMPTYSOURCE)
-        elif not (arecdict["target"]):
-            return BadRecord(**badrecdict, reason=Reason.NOTARGET)
-        elif "" in arecdict["target"]:
-            return BadRecord(**badrecdict, reason=Reason.EMPTYTARGET)
-        elif any([(tok not in self.sourceitems) for tok in arecdict["source"]]):
-            missing = [tok for tok in arecdict["source"] if tok not in self.sourceitems]
-            return BadRecord(**badrecdict, reason=Reason.MISSINGSOURCE, data=missing)
-        elif any([(tok not in self.targetitems) for tok in arecdict["target"]]):
-            missing = [tok for tok in arecdict["target"] if tok not in self.targetitems]
-            if set(arecdict["target"]).symmetric_difference(set(missing)):
-                return BadRecord(**badrecdict, reason=Reason.MISSINGTARGETSOME, data=missing)
-            else:
-                return BadRecord(**badrecdict, reason=Reason.MISSINGTARGETALL, data=missing)
-        else:
-            return None
+        return find_badrecords({arec.identifier: arec}, self.sourceitems, self.targetitems).get(arec.identifier)
 
     def _clean_alignmentrecords(self, alrecdict: dict[str, AlignmentRecord]) -> dict[str, AlignmentRecord]:
         """Find bad alignment records, return good ones."""
-        self.badrecords: Optional[dict[str, BadRecord]] = {
-            recid: badrec for recid, arec in alrecdict.items() if (badrec := self._bad_reason(arec)) if badrec
-        }
-        if self.badrecords:
-            keepmsg = "Keeping" if self.keepbadrecords else "Dropping"
-            print(f"{keepmsg} {len(self.badrecords)} bad alignment records. Instances in self.badrecords.")
-            for reason in Reason:
-                rcount = len([mal for mal in self.badrecords.values() if mal.reason == reason])
-                if rcount:
-                    print(f"{reason.value}\t{rcount}")
+        # check all the records at once
+        self.badrecords: Optional[dict[str, BadRecord]] = find_badrecords(alrecdict, self.sourceitems, self.targetitems)
+        self._report_badrecords()
         # drop them from alignmentrecords, unless keeping them
         if self.keepbadrecords:
             return alrecdict
         else:
             return {recid: badrec for recid, badrec in alrecdict.items() if recid not in self.badrecords}
 
+    def _report_badrecords(self) -> None:
+        """Print counts of bad records by reason."""
+        if self.badrecords:
+            keepmsg = "Keeping" if self.keepbadrecords else "Dropping"
+            print(f"{keepmsg} {len(self.badrecords)} bad alignment records. Instances in self.badrecords.")
+            for reason, rcount in count_reasons(self.badrecords).items():
+                print(f"{reason.value}\t{rcount}")
+
     def read_sources(self) -> SourceReader:
         """Read source data into SourceReader."""
-        return SourceReader(self.alignmentset.sourcepath)
+        if self.sharesources:
+            return sourceregistry.get(self.alignmentset.sourcepath, cachedir=self.cachedir)
+        return SourceReader(self.alignmentset.sourcepath, cachedir=self.cachedir)
 
     def read_targets(self) -> TargetReader:
         """Read target data into TargetReader."""
         # may need more single-name target files
-        return TargetReader(self.alignmentset.targetpath, keepwordpart=self.keeptargetwordpart)
+        return TargetReader(
+            self.alignmentset.targetpath, keepwordpart=self.keeptargetwordpart, storedir=self.storedir
+        )
 
     def make_versedata(self, bcvid: str, verserecords: dict[str, list[AlignmentRecord]]) -> VerseData:
         """Return a VerseData instance for a BCV reference."""
-        alpairs: list[tuple[list[str], list[str]]] = [
-            (ardict["source"], ardict["target"])
-            for ar in verserecords[bcvid]
-            # internal so omit macula prefix
-            if (ardict := ar.asdict(withmaculaprefix=False))
-        ]
+        # the underlying mappings, without UserDict's extra method calls
+        sourcedata, targetdata = self.sourceitems.data, self.targetitems.data
+        versetargets = self.bcv["targets"].get(bcvid, [])
+        if isinstance(targetdata, TargetStore):
+            # each lookup in a TargetStore makes a new Target: look up
+            # each token once, sharing the instances in versetargets
+            versetargetdata = {trg.id: trg for trg in versetargets}
+            for arec in verserecords[bcvid]:
+                for tok in arec.target_selectors:
+                    if tok not in versetargetdata and tok in targetdata:
+                        versetargetdata[tok] = targetdata[tok]
+            targetdata = versetargetdata
         alinstpairs: list[tuple[list[Source], list[Target]]] = [
             (sourceinst, targetinst)
-            for sources, targets in alpairs
+            # the selector lists themselves, not copies as from asdict()
+            for sources, targets in (ar.selectors for ar in verserecords[bcvid])
             # what does it mean if tok isn't in sourceinst?? SBLGNT-BSB data
             # drop tokens
-            if (sourceinst := [self.sourceitems[tok] for tok in sources if tok in self.sourceitems])
-            if (targetinst := [self.targetitems[tok] for tok in targets if tok in self.targetitems])
+            if (sourceinst := [sourcedata[tok] for tok in sources if tok in sourcedata])
+            if (targetinst := [targetdata[tok] for tok in targets if tok in targetdata])
         ]
         return VerseData(
             bcvid=bcvid,
             alignments=alinstpairs,
             sources=self.bcv["sources"].get(bcvid, []),
-            targets=self.bcv["targets"].get(bcvid, []),
+            targets=versetargets,
         )
 
+    def alignment_matrices(self, reference: str) -> dict[str, np.ndarray]:
+        """Return a dict mapping BCV references to alignment matrices for a book, chapter, or verse.
+
+        reference is a BCV prefix, like '41' for a book or '41004' for
+        a chapter. Matrices are as from VerseData.matrix(), but made in
+        bulk: see alignment_matrices() in VerseData.
+        """
+        return alignment_matrices(self.data[bcvid] for bcvid in self.data if bcvid.startswith(reference))
+
     def display_record(self, alrec: AlignmentRecord) -> None:
         """Print a display for an AlignmentRecord for debugging."""
         print(f"{alrec.meta.id} ------------")
@@ -203,19 +441,50 @@ class Manager(UserDict):
             print(f"{len(self.bcv['records'])} BCV records != {len(self.bcv['versedata'])} VerseData instances.")
         if len(self.bcv["sources"]) < len(self.bcv["records"]):
             print(f"{len(self.bcv['sources'])} BCV sources < {len(self.bcv['records'])} records.")
+        # grouped under their first verse, so tokens from later ones are missing there
+        crossing = [arec.identifier for arec in self.alignmentrecords.values() if len(arec.source_verses) > 1]
+        if crossing:
+            print(f"{len(crossing)} records with sources from more than one verse, like {crossing[0]}.")
+
+    def _token_index(self, role: str) -> dict[str, list[int]]:
+        """Return a dict mapping token identifiers for role to positions in self.alignmentgroup.records.
+
+        The index is built on first use, and again if the records are replaced.
+        """
+        records = self.alignmentgroup.records
+        if self._tokenindexrecords is not records:
+            self._tokenindexes = {}
+            self._tokenindexrecords = records
+        if role not in self._tokenindexes:
+            index: dict[str, list[int]] = {}
+            for position, rec in enumerate(records):
+                for selector in rec.get_selectors(role):
+                    positions = index.setdefault(selector, [])
+                    # a selector could repeat in a record
+                    if not positions or positions[-1] != position:
+                        positions.append(position)
+            self._tokenindexes[role] = index
+        return self._tokenindexes[role]
+
+    def token_records(self, tokenids: Iterable[str], role: str = "source") -> list[AlignmentRecord]:
+        """Return a list of alignment records whose role tokens include any of tokenids.
+
+        Records are in the same order as self.alignmentgroup.records.
+        The first call for each role builds an index from token
+        identifiers to records, so later calls only touch the matching
+        records.
+        """
+        assert role in self.tokentypeattrs, f"role must be one of {self.tokentypeattrs}"
+        index = self._token_index(role)
+        positions = {position for tokenid in tokenids for position in index.get(tokenid, [])}
+        records = self.alignmentgroup.records
+        return [records[position] for position in sorted(positions)]
 
     def token_alignments(
         self, term: str, role: str = "source", tokenattr: str = "text", lowercase: bool = False
-    ) -> list[Source | Target]:
+    ) -> list[AlignmentRecord]:
         """Return a list of alignments whose role tokens contain term."""
         itemreader: SourceReader | TargetReader = self.sourceitems if role == "source" else self.targetitems
-        tokendict: dict[str, Source | Target] = {
-            token.id: token for token in itemreader.term_tokens(term, tokenattr=tokenattr, lowercase=lowercase)
-        }
-        selectorset = set(tokendict)
+        tokens: list[Source | Target] = itemreader.term_tokens(term, tokenattr=tokenattr, lowercase=lowercase)
         # collect alignment records that contain these tokens
-        selectorattr = "source_selectors" if role == "source" else "target_selectors"
-        token_records = [
-            rec for rec in self.alignmentgroup.records if selectorset.intersection(getattr(rec, selectorattr))
-        ]
-        return token_records
+        return self.token_records((token.id for token in tokens), role=role)
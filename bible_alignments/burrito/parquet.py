@@ -0,0 +1,281 @@
+"""Export alignment data as Parquet tables, and read it back.
+
+An export is a directory (named for the alignment set identifier)
+with a Parquet file for each table:
+
+- records: one row per alignment record, with its position
+  ('record'), source BCV, and metadata
+- record_sources, record_targets: one row per record and token, with
+  the record position, identifier, and source BCV, and the token
+  identifier ('selector')
+- sources, targets: one row per token, with the Source or Target
+  attributes
+
+plus meta.json for the alignment set and group metadata.
+
+Rows are in record (or token) order, and written in row groups with
+statistics, so queries with filters on source_bcv (or token id) only
+read the matching parts of each file. The tables can be used directly
+with pyarrow or pandas, or read back into an AlignmentGroup or
+Manager without parsing the JSON or TSV files.
+
+This requires pyarrow, which is an optional dependency.
+
+>>> from bible_alignments.burrito import Manager, parquet
+>>> mgr = Manager(alset)
+>>> exportpath = parquet.write_manager(mgr, OUTPATH)
+>>> export = parquet.ParquetExport(exportpath)
+# records for Mark, reading only those row groups
+>>> export.table("records", filters=parquet.bcv_filter("41")).num_rows
+7134
+# or with pandas
+>>> pd.read_parquet(exportpath / "record_targets.parquet", filters=parquet.bcv_filter("41004"))
+# a Manager for just Mark
+>>> mgr = export.manager(reference="41")
+
+"""
+
+import datetime as dt
+from dataclasses import fields
+import gc
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from .AlignmentGroup import Document, Metadata, AlignmentGroup, AlignmentReference, AlignmentRecord
+from .AlignmentSet import AlignmentSet
+from .AlignmentType import TranslationType
+from .manager import Manager
+from .source import Source, SourceReader
+from .target import Target, TargetReader
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+if TYPE_CHECKING:
+    import pyarrow
+
+# increment when the layout of exports changes
+FORMAT_VERSION = 1
+# smaller row groups mean finer-grained filtering, but more overhead
+ROWGROUPSIZE = 1 << 16
+TABLES = ("records", "record_sources", "record_targets", "sources", "targets")
+# record metadata attributes, as columns of the records table
+METAFIELDS = tuple(fld.name for fld in fields(Metadata) if fld.name != "_fieldnames")
+
+# a filter expression, as for pyarrow.parquet.read_table(filters=...)
+Filters = list[tuple[str, str, Any]]
+
+
+def _require_pyarrow() -> None:
+    """Raise ImportError if pyarrow isn't available."""
+    if pq is None:
+        raise ImportError("Parquet export requires pyarrow: install it with 'pip install pyarrow'")
+
+
+def _metavalue(value: Any) -> str:
+    """Return a metadata value as a string."""
+    if value is None:
+        return ""
+    elif isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    else:
+        return str(value)
+
+
+def bcv_filter(reference: str, column: str = "source_bcv") -> Filters:
+    """Return a filter for rows where column is within reference.
+
+    reference is a book (BB), chapter (BBCCC), or verse (BBCCCVVV)
+    reference. This works for the source_bcv column, and also for
+    token identifiers (column='id' for the sources and targets
+    tables, or 'selector'), since they start with a BCV reference.
+
+    Values are compared as strings, so the upper bound is reference
+    followed by the largest character, rather than the next
+    reference: that would be '100' for '99'.
+    """
+    if not reference.isdigit() or len(reference) not in (2, 5, 8):
+        raise ValueError(f"Invalid reference: {reference!r}")
+    return [(column, ">=", reference), (column, "<", reference + "\uffff")]
+
+
+def write_alignments(
+    outdir: Path,
+    alignmentset: AlignmentSet,
+    alignmentgroup: AlignmentGroup,
+    sourceitems: Iterable[Source],
+    targetitems: Iterable[Target],
+) -> Path:
+    """Write Parquet tables for alignment data in a directory under outdir, and return its path.
+
+    The directory is named for alignmentset.identifier. sourceitems
+    and targetitems are the tokens, like SourceReader.values().
+    """
+    _require_pyarrow()
+    exportpath = outdir / alignmentset.identifier
+    exportpath.mkdir(parents=True, exist_ok=True)
+    records = alignmentgroup.records
+    sourcebcvs = [rec.source_bcv for rec in records]
+    recordcolumns: dict[str, list[Any]] = {"record": list(range(len(records))), "source_bcv": sourcebcvs}
+    recordcolumns.update({name: [_metavalue(getattr(rec.meta, name)) for rec in records] for name in METAFIELDS})
+    tables = {"records": recordcolumns}
+    for role in ("source", "target"):
+        edges: dict[str, list[Any]] = {"record": [], "id": [], "source_bcv": [], "selector": []}
+        for position, (rec, bcv) in enumerate(zip(records, sourcebcvs)):
+            for selector in rec.get_selectors(role):
+                edges["record"].append(position)
+                edges["id"].append(rec.identifier)
+                edges["source_bcv"].append(bcv)
+                edges["selector"].append(selector)
+        tables[f"record_{role}s"] = edges
+    sourcetokens = list(sourceitems)
+    tables["sources"] = {attr: [getattr(token, attr) for token in sourcetokens] for attr in Source._input_fields}
+    targettokens = list(targetitems)
+    tables["targets"] = {
+        attr: [getattr(token, attr) for token in targettokens] for attr in TargetReader.inmap.values()
+    }
+    schemas = {
+        "records": {"record": pa.int32()},
+        "record_sources": {"record": pa.int32()},
+        "record_targets": {"record": pa.int32()},
+        "sources": {},
+        "targets": {field: pa.bool_() for field in Target._boolean_fields},
+    }
+    for name, columns in tables.items():
+        schema = pa.schema([(column, schemas[name].get(column, pa.string())) for column in columns])
+        table = pa.table(columns, schema=schema)
+        pq.write_table(table, exportpath / f"{name}.parquet", row_group_size=ROWGROUPSIZE)
+    meta = {
+        "format": FORMAT_VERSION,
+        "alignmentset": {
+            "sourceid": alignmentset.sourceid,
+            "targetid": alignmentset.targetid,
+            "targetlanguage": alignmentset.targetlanguage,
+            "alternateid": alignmentset.alternateid,
+        },
+        "documents": [doc.asdict() for doc in alignmentgroup.documents],
+        "roles": list(alignmentgroup.roles),
+        "meta": {name: _metavalue(value) for name, value in alignmentgroup.meta.asdict().items()},
+        "type": alignmentgroup._type,
+    }
+    (exportpath / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    return exportpath
+
+
+def write_manager(mgr: Manager, outdir: Path) -> Path:
+    """Write Parquet tables for the data in mgr in a directory under outdir, and return its path."""
+    return write_alignments(
+        outdir,
+        alignmentset=mgr.alignmentset,
+        alignmentgroup=mgr.alignmentgroup,
+        sourceitems=mgr.sourceitems.values(),
+        targetitems=mgr.targetitems.values(),
+    )
+
+
+class ParquetExport:
+    """Read alignment data from a directory written by write_alignments().
+
+    Methods take filters (see bcv_filter()) to read only some of the
+    data.
+    """
+
+    def __init__(self, exportpath: Path) -> None:
+        """Initialize an instance for the export directory at exportpath."""
+        _require_pyarrow()
+        self.exportpath = exportpath
+        self.meta: dict[str, Any] = json.loads((exportpath / "meta.json").read_text(encoding="utf-8"))
+        if self.meta["format"] != FORMAT_VERSION:
+            raise ValueError(f"{exportpath} has format {self.meta['format']}, not {FORMAT_VERSION}")
+        self.alignmentset = AlignmentSet(**self.meta["alignmentset"])
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        return f"<ParquetExport: {self.alignmentset.identifier}>"
+
+    def table(
+        self, name: str, filters: Optional[Filters] = None, columns: Optional[list[str]] = None
+    ) -> "pyarrow.Table":
+        """Return the table for name, with any filters and columns."""
+        assert name in TABLES, f"name must be one of {TABLES}"
+        return pq.read_table(self.exportpath / f"{name}.parquet", filters=filters, columns=columns)
+
+    def read_sources(self, filters: Optional[Filters] = None) -> SourceReader:
+        """Return a SourceReader for the source tokens."""
+        return SourceReader(self.alignmentset.sourcepath, columns=self.table("sources", filters=filters).to_pydict())
+
+    def read_targets(self, filters: Optional[Filters] = None) -> TargetReader:
+        """Return a TargetReader for the target tokens."""
+        return TargetReader(self.alignmentset.targetpath, columns=self.table("targets", filters=filters).to_pydict())
+
+    def read_alignmentgroup(self, filters: Optional[Filters] = None) -> AlignmentGroup:
+        """Return an AlignmentGroup for the alignment records.
+
+        Raise ValueError if no records match filters: an
+        AlignmentGroup needs at least one.
+        """
+        sourcedoc, targetdoc = (Document(**docdict) for docdict in self.meta["documents"])
+        selectors: dict[str, dict[int, list[str]]] = {}
+        for role in ("source", "target"):
+            edges = self.table(f"record_{role}s", filters=filters, columns=["record", "selector"]).to_pydict()
+            roleselectors = selectors[role] = {}
+            for position, selector in zip(edges["record"], edges["selector"]):
+                roleselectors.setdefault(position, []).append(selector)
+        recordcolumns = self.table("records", filters=filters, columns=["record", *METAFIELDS]).to_pydict()
+        if not recordcolumns["record"]:
+            raise ValueError(f"No alignment records match {filters}")
+        altype = TranslationType()
+        records = []
+        # as in BaseToken._fromcolumns(): records don't form reference
+        # cycles, so pause garbage collection while making many of them
+        gcenabled = gc.isenabled()
+        gc.disable()
+        try:
+            for position, *metavalues in zip(*recordcolumns.values()):
+                metadict = dict(zip(METAFIELDS, metavalues))
+                # as when read from JSON
+                metadict["created"] = metadict["created"] or None
+                references = {
+                    "source": AlignmentReference(document=sourcedoc, selectors=selectors["source"].get(position, [])),
+                    "target": AlignmentReference(document=targetdoc, selectors=selectors["target"].get(position, [])),
+                }
+                records.append(AlignmentRecord(meta=Metadata(**metadict), references=references, type=altype))
+        finally:
+            if gcenabled:
+                gc.enable()
+        return AlignmentGroup(
+            documents=(sourcedoc, targetdoc),
+            meta=Metadata(**self.meta["meta"]),
+            records=records,
+            roles=tuple(self.meta["roles"]),
+        )
+
+    def manager(self, reference: str = "", **kwargs: Any) -> Manager:
+        """Return a Manager for the data.
+
+        With reference (a book, chapter, or verse), only data for
+        that reference is read. Target tokens are selected by their
+        identifiers, so with versification differences, some target
+        tokens for records near the boundaries may be missing.
+
+        Raise KeyError if there are no alignment records for
+        reference.
+
+        kwargs are passed to Manager().
+        """
+        recordfilters = bcv_filter(reference) if reference else None
+        try:
+            alignmentgroup = self.read_alignmentgroup(filters=recordfilters)
+        except ValueError:
+            raise KeyError(f"No alignment records for {reference or self.alignmentset.identifier}") from None
+        return Manager(
+            self.alignmentset,
+            sourceitems=self.read_sources(filters=bcv_filter(reference, column="id") if reference else None),
+            targetitems=self.read_targets(filters=bcv_filter(reference, column="id") if reference else None),
+            alignmentgroup=alignmentgroup,
+            **kwargs,
+        )
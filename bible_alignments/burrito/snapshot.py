@@ -0,0 +1,311 @@
+"""Save a fully built Manager, and restore it without rebuilding.
+
+Building a Manager reads the source, target, and alignment files,
+checks every record for problems, and groups everything by BCV. A
+snapshot stores the result: tokens, records, bad records, the BCV
+groupings, and the alignments for each VerseData instance. Restoring
+it skips all the parsing and checking.
+
+A snapshot is a single .npz archive (written and read without
+pickle). All strings are interned in one string table, and
+everything else is integer arrays: token and record columns are
+indexes into the string table, and groupings are positions of
+tokens or records, with offsets for each group (see _flatten()).
+
+Snapshots are named for a digest of the content of the three input
+files and the Manager options that change its data, so a snapshot is
+only used when its inputs are unchanged. Use Manager(snapshotdir=...)
+rather than calling these functions directly.
+
+>>> from bible_alignments.burrito import Manager
+# builds the Manager and saves a snapshot
+>>> mgr = Manager(alset, snapshotdir=SNAPSHOTDIR)
+# much faster: restored from the snapshot
+>>> mgr = Manager(alset, snapshotdir=SNAPSHOTDIR)
+
+"""
+
+from dataclasses import fields
+import gc
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+import numpy as np
+
+from .AlignmentGroup import Document, Metadata, AlignmentGroup, AlignmentReference, AlignmentRecord
+from .AlignmentSet import AlignmentSet
+from .AlignmentType import TranslationType
+from .BadRecord import BadRecord, Reason
+from .VerseData import VerseData
+from .columnar import NORMALIZATION_VERSION, StringTable, _remove_stale, file_digest, path_digest
+from .source import Source, SourceReader
+from .target import Target, TargetReader
+
+if TYPE_CHECKING:
+    from .manager import Manager
+
+# increment when the layout of snapshots changes
+FORMAT_VERSION = 1
+# record metadata attributes, stored as columns
+METAFIELDS = tuple(fld.name for fld in fields(Metadata) if fld.name != "_fieldnames")
+# the BCV groupings stored, from Manager.bcvkeys
+BCVGROUPS = {"sources": "sourceitems", "targets": "targetitems", "target_sourceverses": "targetitems"}
+REASONS = list(Reason)
+
+
+def snapshot_path(snapshotdir: Path, alignmentset: AlignmentSet, **options: Any) -> Path:
+    """Return the path for a snapshot of a Manager for alignmentset in snapshotdir.
+
+    The name includes a digest of the locations of the source,
+    target, and alignment files, so alignment sets with the same
+    identifier under different data roots don't replace each other's
+    snapshots, and a digest of options: the Manager options that
+    change its data, so Managers with different options keep separate
+    snapshots. Last are the format version, with
+    columnar.NORMALIZATION_VERSION since snapshots hold normalized
+    tokens, and a digest of the content of the files: only snapshots
+    that differ in these are removed as stale.
+    """
+    datapaths = (alignmentset.sourcepath, alignmentset.targetpath, alignmentset.alignmentpath)
+    digest = hashlib.sha256()
+    for datapath in datapaths:
+        digest.update(file_digest(datapath).encode("ascii"))
+    optionsdigest = hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    basename = f"{alignmentset.identifier}-{path_digest(*datapaths)}-{optionsdigest}-manager"
+    return snapshotdir / f"{basename}-v{FORMAT_VERSION}.{NORMALIZATION_VERSION}-{digest.hexdigest()[:16]}.npz"
+
+
+def _metavalue(value: Any) -> str:
+    """Return a metadata value as a string."""
+    return "" if value is None else str(value)
+
+
+def _offsets(lengths: Sequence[int]) -> np.ndarray:
+    """Return offsets for consecutive groups with lengths."""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _flatten(groups: Sequence[Sequence[int]]) -> tuple[np.ndarray, np.ndarray]:
+    """Return flat values and offsets for groups of integers.
+
+    Group i is values[offsets[i]:offsets[i + 1]].
+    """
+    offsets = _offsets([len(group) for group in groups])
+    values = np.fromiter((value for group in groups for value in group), dtype=np.int32, count=offsets[-1])
+    return values, offsets
+
+
+def _unflatten(values: np.ndarray, offsets: np.ndarray, items: Sequence[Any]) -> list[list[Any]]:
+    """Return groups of items, for positions from _flatten()."""
+    grouped = [items[position] for position in values.tolist()]
+    bounds = offsets.tolist()
+    return [grouped[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def save_snapshot(mgr: "Manager", path: Path) -> None:
+    """Write a snapshot of mgr to path.
+
+    The archive is written to a temporary file and then moved into
+    place, and snapshots for older inputs are removed.
+    """
+    strtable = StringTable()
+    arrays: dict[str, np.ndarray] = {}
+    # tokens, by attribute
+    sourcetokens = list(mgr.sourceitems.values())
+    for attr in Source._input_fields:
+        arrays[f"source_{attr}"] = strtable.indexes(getattr(token, attr) for token in sourcetokens)
+    targettokens = list(mgr.targetitems.values())
+    for attr in TargetReader.inmap.values():
+        values = [getattr(token, attr) for token in targettokens]
+        if attr in Target._boolean_fields:
+            arrays[f"target_{attr}"] = np.array(values, dtype=bool)
+        else:
+            arrays[f"target_{attr}"] = strtable.indexes(values)
+    # records in the group, then any bad records that were dropped
+    records = list(mgr.alignmentgroup.records)
+    positions = {id(rec): position for position, rec in enumerate(records)}
+    for badrec in mgr.badrecords.values():
+        if id(badrec.record) not in positions:
+            positions[id(badrec.record)] = len(records)
+            records.append(badrec.record)
+    for name in METAFIELDS:
+        arrays[f"record_{name}"] = strtable.indexes(_metavalue(getattr(rec.meta, name)) for rec in records)
+    for role in ("source", "target"):
+        selectors = [strtable.indexes(rec.get_selectors(role)) for rec in records]
+        arrays[f"record_{role}"], arrays[f"record_{role}_offsets"] = _flatten(selectors)
+    arrays["alignmentrecords"] = np.array([positions[id(rec)] for rec in mgr.alignmentrecords.values()], dtype=np.int32)
+    badrecords = list(mgr.badrecords.values())
+    arrays["bad_record"] = np.array([positions[id(badrec.record)] for badrec in badrecords], dtype=np.int32)
+    arrays["bad_reason"] = np.array([REASONS.index(badrec.reason) for badrec in badrecords], dtype=np.int8)
+    arrays["bad_data"], arrays["bad_data_offsets"] = _flatten([strtable.indexes(badrec.data) for badrec in badrecords])
+    # BCV groupings, as positions of tokens or records
+    tokenpositions = {
+        "sourceitems": {id(token): position for position, token in enumerate(sourcetokens)},
+        "targetitems": {id(token): position for position, token in enumerate(targettokens)},
+    }
+    for key, itemsattr in BCVGROUPS.items():
+        grouping = mgr.bcv[key]
+        arrays[f"bcv_{key}_keys"] = strtable.indexes(grouping)
+        itempositions = tokenpositions[itemsattr]
+        arrays[f"bcv_{key}"], arrays[f"bcv_{key}_offsets"] = _flatten(
+            [[itempositions[id(token)] for token in group] for group in grouping.values()]
+        )
+    arrays["bcv_records_keys"] = strtable.indexes(mgr.bcv["records"])
+    arrays["bcv_records"], arrays["bcv_records_offsets"] = _flatten(
+        [[positions[id(rec)] for rec in group] for group in mgr.bcv["records"].values()]
+    )
+    # the (source tokens, target tokens) pairs for each VerseData instance
+    pairs = [pair for versedata in mgr.bcv["versedata"].values() for pair in versedata.alignments]
+    arrays["versedata_keys"] = strtable.indexes(mgr.bcv["versedata"])
+    arrays["versedata_offsets"] = _offsets([len(versedata.alignments) for versedata in mgr.bcv["versedata"].values()])
+    for index, role in enumerate(("sourceitems", "targetitems")):
+        itempositions = tokenpositions[role]
+        arrays[f"versedata_{role}"], arrays[f"versedata_{role}_offsets"] = _flatten(
+            [[itempositions[id(token)] for token in pair[index]] for pair in pairs]
+        )
+    arrays["strings"], arrays["offsets"] = strtable.tobuffers()
+    group = mgr.alignmentgroup
+    meta = {
+        "version": FORMAT_VERSION,
+        "documents": [{"docid": doc.docid, "scheme": doc.scheme} for doc in group.documents],
+        "roles": list(group.roles),
+        "meta": json.loads(json.dumps(group.meta.asdict(), default=str)),
+        "records": len(group.records),
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmppath = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmppath.open("wb") as f:
+        np.savez(f, **arrays)
+    tmppath.replace(path)
+    _remove_stale(path)
+
+
+def _make_records(
+    strings: np.ndarray, archive: Any, documents: tuple[Document, Document], roles: tuple[str, str]
+) -> list[AlignmentRecord]:
+    """Return the records in a snapshot.
+
+    Like BaseToken._fromcolumns(), this bypasses __post_init__(),
+    since the values were checked when the snapshot was written.
+    """
+    metacolumns = [strings[archive[f"record_{name}"]].tolist() for name in METAFIELDS]
+    stringlist = strings.tolist()
+    selectors = {
+        role: _unflatten(archive[f"record_{role}"], archive[f"record_{role}_offsets"], stringlist)
+        for role in ("source", "target")
+    }
+    fieldnames = Metadata()._fieldnames
+    altype = TranslationType()
+    records = []
+    for metavalues, sourcesels, targetsels in zip(zip(*metacolumns), selectors["source"], selectors["target"]):
+        meta = Metadata.__new__(Metadata)
+        meta.__dict__.update(zip(METAFIELDS, metavalues))
+        # as when read from JSON
+        meta.created = meta.created or None
+        meta._fieldnames = fieldnames
+        references = {}
+        for role, document, roleselectors in zip(roles, documents, (sourcesels, targetsels)):
+            reference = references[role] = AlignmentReference.__new__(AlignmentReference)
+            reference.document = document
+            reference.selectors = roleselectors
+        record = AlignmentRecord.__new__(AlignmentRecord)
+        record.meta = meta
+        record.references = references
+        record.type = altype
+        record._set_source_bcv()
+        records.append(record)
+    return records
+
+
+def load_snapshot(mgr: "Manager", path: Path) -> None:
+    """Restore the data for mgr from the snapshot at path.
+
+    This sets the attributes that Manager.__init__() would otherwise
+    compute. Raise ValueError if path was written with a different
+    format version.
+
+    As in BaseToken._fromcolumns(), garbage collection is paused
+    meanwhile: otherwise making hundreds of thousands of objects
+    triggers repeated, useless collections.
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        meta: dict[str, Any] = json.loads(archive["meta"].tobytes().decode("utf-8"))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {meta.get('version')} in {path}")
+        gcenabled = gc.isenabled()
+        gc.disable()
+        try:
+            _restore(mgr, archive, meta)
+        finally:
+            if gcenabled:
+                gc.enable()
+
+
+def _restore(mgr: "Manager", archive: Any, meta: dict[str, Any]) -> None:
+    """Set the attributes of mgr from a snapshot archive and its metadata."""
+    strings = np.array(StringTable.frombuffers(archive["strings"], archive["offsets"]).strings, dtype=object)
+    alset = mgr.alignmentset
+    mgr.sourceitems = SourceReader(
+        alset.sourcepath,
+        columns={attr: strings[archive[f"source_{attr}"]].tolist() for attr in Source._input_fields},
+    )
+    targetcolumns = {}
+    for attr in TargetReader.inmap.values():
+        column = archive[f"target_{attr}"]
+        targetcolumns[attr] = (column if attr in Target._boolean_fields else strings[column]).tolist()
+    mgr.targetitems = TargetReader(alset.targetpath, keepwordpart=mgr.keeptargetwordpart, columns=targetcolumns)
+    documents = tuple(Document(**docdict) for docdict in meta["documents"])
+    roles = tuple(meta["roles"])
+    records = _make_records(strings, archive, documents, roles)
+    mgr.alignmentgroup = AlignmentGroup(
+        documents=documents,
+        meta=Metadata(**meta["meta"]),
+        records=records[: meta["records"]],
+        roles=roles,
+    )
+    mgr.alignmentrecords = {
+        records[position].identifier: records[position] for position in archive["alignmentrecords"].tolist()
+    }
+    baddata = _unflatten(archive["bad_data"], archive["bad_data_offsets"], strings)
+    mgr.badrecords = {}
+    for position, reasonindex, data in zip(archive["bad_record"].tolist(), archive["bad_reason"].tolist(), baddata):
+        record = records[position]
+        mgr.badrecords[record.identifier] = BadRecord(
+            identifier=record.identifier, record=record, reason=REASONS[reasonindex], data=data or ()
+        )
+    tokens = {"sourceitems": list(mgr.sourceitems.values()), "targetitems": list(mgr.targetitems.values())}
+    mgr.bcv = {}
+    for key, itemsattr in BCVGROUPS.items():
+        mgr.bcv[key] = dict(
+            zip(
+                strings[archive[f"bcv_{key}_keys"]].tolist(),
+                _unflatten(archive[f"bcv_{key}"], archive[f"bcv_{key}_offsets"], tokens[itemsattr]),
+            )
+        )
+    mgr.bcv["records"] = dict(
+        zip(
+            strings[archive["bcv_records_keys"]].tolist(),
+            _unflatten(archive["bcv_records"], archive["bcv_records_offsets"], records),
+        )
+    )
+    sourcepairs, targetpairs = (
+        _unflatten(archive[f"versedata_{role}"], archive[f"versedata_{role}_offsets"], tokens[role])
+        for role in ("sourceitems", "targetitems")
+    )
+    pairs = list(zip(sourcepairs, targetpairs))
+    bounds = archive["versedata_offsets"].tolist()
+    mgr.bcv["versedata"] = {
+        bcvid: VerseData(
+            bcvid=bcvid,
+            alignments=pairs[start:end],
+            sources=mgr.bcv["sources"].get(bcvid, []),
+            targets=mgr.bcv["targets"].get(bcvid, []),
+        )
+        for bcvid, start, end in zip(strings[archive["versedata_keys"]].tolist(), bounds, bounds[1:])
+    }
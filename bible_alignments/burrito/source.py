@@ -37,13 +37,15 @@ n41004003001: Ἀκούετε		 (Listen, ἀκούω, verb)
 """
 
 from collections import UserDict
-from dataclasses import dataclass
+from dataclasses import MISSING, dataclass, fields
 from pathlib import Path
 import re
-from typing import Any, Iterable
+from typing import Any, Callable, ClassVar, Iterable, Optional
 import unicodedata
 from warnings import warn
 
+import numpy as np
+import pandas as pd
 from unicodecsv import DictReader, DictWriter
 
 from biblelib.word import bcvwpid
@@ -51,6 +53,8 @@ from biblelib.word import bcvwpid
 # should eventually come from Clearlib
 from bible_alignments import normalize_strongs
 from .BaseToken import BaseToken
+from .columnar import cache_path, load_columns, save_columns
+from .util import index_terms
 
 PREFIXRE = re.compile(r"^[no]")
 
@@ -82,7 +86,7 @@ def macula_unprefixer(bcvwp: str) -> str:
 
 # these attribute names match the source data for simplicity
 # TODO: make attributes optional
-@dataclass(order=True, repr=False)
+@dataclass(order=True, repr=False, slots=True)
 class Source(BaseToken):
     """Manage data for a source/manuscript token.
 
@@ -104,7 +108,7 @@ class Source(BaseToken):
     pos: str = ""
     # coded morphological information: need to document the format
     morph: str = ""
-    _output_fields: tuple = (
+    _output_fields: ClassVar[tuple] = (
         ("id", "id"),
         ("altId", "altId"),
         ("text", "text"),
@@ -115,7 +119,8 @@ class Source(BaseToken):
         ("pos", "pos"),
         ("morph", "morph"),
     )
-    _input_fields: tuple = tuple(dict(_output_fields).keys())
+    _input_fields: ClassVar[tuple] = tuple(dict(_output_fields).keys())
+    _categorical_fields: ClassVar[tuple[str, ...]] = ("strong", "gloss", "gloss2", "lemma", "pos", "morph")
     # # TODO: enumerate and validate part of speech values
     # # TODO: standardize morph representation
     # dataclass rules means __hash__ isn't inherited otherwise
@@ -145,7 +150,7 @@ class Source(BaseToken):
                 self.id = self.id[:11]
         # normalize Strongs: skip 'H' in Macula Hebrew data
         if self.strong and self.strong != "H":
-            if re.match(r"[AGH]", self.strong):
+            if self.strong[0] in "AGH":
                 prefix = self.strong[0]
             else:
                 if is_nt:
@@ -249,6 +254,124 @@ class Source(BaseToken):
         return outdict
 
 
+def _map_unique(values: list[str], fn: Callable[[str], Any]) -> list[Any]:
+    """Return fn(value) for values, calling fn only once for each distinct value."""
+    mapping = {value: fn(value) for value in dict.fromkeys(values)}
+    return [mapping[value] for value in values]
+
+
+def _normalize_strong(strong: str) -> tuple[str, bool]:
+    """Return a normalized Strong's value, and True if normalization failed.
+
+    This matches Source.__post_init__().
+    """
+    if not strong or strong == "H":
+        return strong, False
+    if strong[0] in "AGH":
+        prefix = strong[0]
+    else:
+        prefix = "G"
+        strong = prefix + strong
+    try:
+        return normalize_strongs(strong, prefix=prefix), False
+    except ValueError:
+        return strong, True
+
+
+# changing normalization changes cached data: increment
+# columnar.NORMALIZATION_VERSION
+_sourceidre = re.compile(r"([no]?)(\d\d)(\d{9,10})")
+
+
+def _normalize_source_id(identifier: str) -> tuple[str, bool]:
+    """Return a normalized source identifier, and True if it's from the NT.
+
+    This matches Source.__post_init__().
+    """
+    match = _sourceidre.fullmatch(identifier)
+    book = match.group(2) if match else ""
+    canon = "o" if book < "40" else ("n" if book < "67" else "x")
+    if not match or match.group(1) not in ("", canon):
+        # let BibleLib raise the appropriate error
+        bcvwpid.BCVWPID(identifier)
+    bare = identifier[len(match.group(1)) :]
+    if canon == "n":
+        return bare[:11], True
+    return (bare if len(bare) == 12 else bare + "1"), False
+
+
+def _normalize_source_ids(identifiers: list[str]) -> tuple[list[str], list[bool]]:
+    """Return lists of normalized source identifiers, and True for those from the NT.
+
+    This is a vectorized version of _normalize_source_id().
+    """
+    try:
+        # one character more than the longest valid identifier
+        idarray = np.array(identifiers, dtype="S14")
+    except UnicodeEncodeError:
+        normids = [_normalize_source_id(identifier) for identifier in identifiers]
+        return [identifier for identifier, _ in normids], [nt for _, nt in normids]
+    chars = idarray.view(np.uint8).reshape(len(idarray), 14)
+    prefixes = chars[:, 0]
+    prefixed = (prefixes == ord("n")) | (prefixes == ord("o"))
+    digits = np.where(prefixed[:, None], chars[:, 1:13], chars[:, :12])
+    lengths = np.count_nonzero(chars, axis=1) - prefixed
+    isdigit = (digits >= ord("0")) & (digits <= ord("9"))
+    books = (digits[:, 0].astype(np.int16) - ord("0")) * 10 + (digits[:, 1].astype(np.int16) - ord("0"))
+    is_nt = (books >= 40) & (books < 67)
+    valid = (lengths == 12) & isdigit.all(axis=1)
+    valid |= (lengths == 11) & isdigit[:, :11].all(axis=1)
+    valid &= np.where(prefixes == ord("n"), is_nt, True) & np.where(prefixes == ord("o"), books < 40, True)
+    if not valid.all():
+        # raise the appropriate error
+        _normalize_source_id(identifiers[int(np.argmin(valid))])
+    normalized = digits.copy()
+    # add a part ID if missing, then drop it for NT tokens
+    normalized[lengths == 11, 11] = ord("1")
+    normalized[is_nt, 11] = 0
+    return normalized.view("S12").ravel().astype(str).tolist(), is_nt.tolist()
+
+
+def read_source_columns(tsvpath: Path, idheader: str = "id") -> dict[str, list[str]]:
+    """Return a dict of normalized Source attribute values from a TSV file, by column.
+
+    This reads the file with pandas and normalizes whole columns at
+    once, giving the same values as Source.__post_init__() would, and
+    each distinct value is only normalized once. Keys are the
+    attribute names in Source._input_fields: missing columns get the
+    default values.
+
+    Use this directly to get source data without making Source
+    instances, or use SourceReader(bulk=True).
+    """
+    frame = pd.read_csv(tsvpath, sep="\t", dtype=str, keep_default_na=False, na_filter=False, encoding="utf-8")
+    assert idheader in frame.columns, f"Missing ID header '{idheader}'"
+    if idheader != "id":
+        frame = frame.rename(columns={idheader: "id"})
+    inmap = {v: k for k, v in Source._output_fields}
+    defaults = {fld.name: fld.default for fld in fields(Source) if fld.default is not MISSING}
+    for header, attr in inmap.items():
+        if header not in frame.columns and attr not in defaults:
+            raise ValueError(f"Missing column '{header}' in {tsvpath}")
+    columns: dict[str, list[str]] = {
+        attr: (frame[header].tolist() if header in frame.columns else [defaults[attr]] * len(frame))
+        for header, attr in inmap.items()
+    }
+    # identifiers: validate, drop any prefix, and include a part ID
+    # for OT but not NT tokens
+    columns["id"], is_nt = _normalize_source_ids(columns["id"])
+    # ensure Greek is normalized for NT books
+    for attr in ("altId", "text", "lemma"):
+        normalized = _map_unique(columns[attr], lambda string: unicodedata.normalize("NFKC", string))
+        columns[attr] = [norm if nt else value for value, norm, nt in zip(columns[attr], normalized, is_nt)]
+    strongs = _map_unique(columns["strong"], _normalize_strong)
+    columns["strong"] = [strong for strong, _ in strongs]
+    for identifier, (strong, failed) in zip(columns["id"], strongs):
+        if failed:
+            warn(f"Failed to normalize Strong's '{strong}' in {identifier}")
+    return columns
+
+
 class SourceReader(UserDict):
     """Read Source TSV data into a dict, with identifiers as keys.
 
@@ -258,14 +381,65 @@ class SourceReader(UserDict):
     - Normalize Strong's numbers
 
     Verse-level indices in altId are also revised: some data had errors.
+
+    With cachedir, the normalized token data is also kept in a
+    columnar cache file in that directory, keyed by a hash of the TSV
+    content. Later reads of an unchanged file load the cache instead
+    of parsing and normalizing the TSV.
+
+    After freeze(), tokens can no longer be added or removed: this is
+    used for readers shared through a SourceRegistry.
+
+    With intern = True, values of categorical fields like pos and
+    lemma are interned, so tokens share one copy of each value. This
+    reduces memory substantially for large corpora.
+
+    With bulk = True, the TSV is read and normalized by column (see
+    read_source_columns()), which is much faster for large files.
+
+    With columns, tokens are made from that dict of normalized values
+    by column, in the same form as read_source_columns() returns, and
+    tsvpath is not read: use this for source data from another
+    format, like a Parquet export (see parquet.py).
     """
 
     inmap = {v: k for k, v in Source._output_fields}
 
-    def __init__(self, tsvpath: Path, idheader: str = "id") -> None:
+    def __init__(
+        self,
+        tsvpath: Path,
+        idheader: str = "id",
+        cachedir: Optional[Path] = None,
+        intern: bool = False,
+        bulk: bool = False,
+        columns: Optional[dict[str, list[Any]]] = None,
+    ) -> None:
         """Initialize a Reader instance."""
         super().__init__()
+        # (tokenattr, lowercase) -> value -> tokens: see term_tokens()
+        self._termindexes: dict[tuple[str, bool], dict[str, list[Source]]] = {}
+        self.frozen: bool = False
         self.tsvpath = tsvpath
+        self.cachepath: Optional[Path] = (
+            cache_path(cachedir, self.tsvpath, kind="source") if cachedir and columns is None else None
+        )
+        if columns is not None:
+            self.data = dict(zip(columns["id"], Source._fromcolumns(columns)))
+        elif self.cachepath and self.cachepath.exists():
+            self._read_cache()
+        else:
+            if bulk:
+                self._read_bulk(idheader=idheader)
+            else:
+                self._read_tsv(idheader=idheader)
+            if self.cachepath:
+                self._write_cache()
+        if intern:
+            for token in self.data.values():
+                token.intern()
+
+    def _read_tsv(self, idheader: str = "id") -> None:
+        """Read and normalize the TSV data."""
         with self.tsvpath.open("rb") as f:
             reader = DictReader(f, delimiter="\t")
             for row in reader:
@@ -283,6 +457,28 @@ class SourceReader(UserDict):
                 # drop prefixes, store under the token ID (not the Macula ID)
                 self.data[srctoken.tokenid] = srctoken
 
+    def _read_bulk(self, idheader: str = "id") -> None:
+        """Read and normalize the TSV data by column."""
+        columns = read_source_columns(self.tsvpath, idheader=idheader)
+        if len(set(columns["id"])) < len(columns["id"]):
+            seen: set[str] = set()
+            for identifier in columns["id"]:
+                if identifier in seen:
+                    warn(f"{identifier} is duplicated in {self.tsvpath}")
+                seen.add(identifier)
+        self.data = dict(zip(columns["id"], Source._fromcolumns(columns)))
+
+    def _write_cache(self) -> None:
+        """Write normalized token data to self.cachepath."""
+        columns = {attr: [getattr(token, attr) for token in self.values()] for attr in Source._input_fields}
+        save_columns(self.cachepath, columns, meta={"tsvpath": str(self.tsvpath)})
+
+    def _read_cache(self) -> None:
+        """Read normalized token data from self.cachepath."""
+        columns, _ = load_columns(self.cachepath)
+        # cached identifiers are already normalized token IDs
+        self.data = dict(zip(columns["id"], Source._fromcolumns(columns)))
+
     def vocabulary(self, tokenattr: str = "text", lower: bool = False) -> list[str]:
         """Return the sorted set of attribute values for tokens.
 
@@ -312,21 +508,40 @@ class SourceReader(UserDict):
                 srcdict["id"] = bcvwpid.BCVWPID(srcdict["id"]).get_id(prefix=True, part_index=False)
                 writer.writerow(srcdict)
 
+    def __setitem__(self, key: str, item: Source) -> None:
+        """Set an item, discarding any term indexes."""
+        if self.frozen:
+            raise TypeError(f"{self.tsvpath} is frozen: tokens can't be changed")
+        self._termindexes.clear()
+        super().__setitem__(key, item)
+
+    def __delitem__(self, key: str) -> None:
+        """Delete an item, discarding any term indexes."""
+        if self.frozen:
+            raise TypeError(f"{self.tsvpath} is frozen: tokens can't be changed")
+        self._termindexes.clear()
+        super().__delitem__(key)
+
+    def freeze(self) -> None:
+        """Prevent adding or removing tokens."""
+        self.frozen = True
+
     def term_tokens(self, term: str, tokenattr: str = "text", lowercase: bool = False) -> list[Source]:
         """Return a list of tokens containing term.
 
         The attribute used is 'text' by default: 'lemma' is another useful value.
 
         With lowercase = True (default is False), lower-case term and token values.
+
+        The first lookup for each combination of tokenattr and
+        lowercase builds an index of tokens by value, so later lookups
+        only touch the matching tokens. The index is discarded if
+        tokens are added or removed.
         """
-        casedterm = term.lower() if lowercase else term
-        return [
-            token
-            for token in self.values()
-            if (tokattr := getattr(token, tokenattr))
-            if (casedtokenattr := tokattr.lower() if lowercase else tokattr)
-            if casedtokenattr == casedterm
-        ]
+        indexkey = (tokenattr, lowercase)
+        if indexkey not in self._termindexes:
+            self._termindexes[indexkey] = index_terms(self.values(), tokenattr=tokenattr, lowercase=lowercase)
+        return list(self._termindexes[indexkey].get(term.lower() if lowercase else term, []))
 
     def _count_by_type(self, items: Iterable) -> int:
         """Return a count of unique items."""
@@ -349,3 +564,72 @@ class SourceReader(UserDict):
                     posinstances = [getattr(tok, toktype) for tok in self.values() if tok._is_pos(pos)]
                     poscounts = {"instance": len(posinstances), "type": len(set(posinstances))}
                     print(f"{posstr}\t{poscounts[counttype]}")
+
+
+class SourceRegistry:
+    """Share one SourceReader for each source file across a process.
+
+    Readers are frozen and kept until evicted. A reader is replaced if
+    its file has changed (by modification time or size) since it was
+    read.
+
+    >>> from bible_alignments.burrito.source import sourceregistry
+    >>> src = sourceregistry.get(SOURCES / "SBLGNT.tsv")
+    >>> src is sourceregistry.get(SOURCES / "SBLGNT.tsv")
+    True
+    >>> sourceregistry.evict(SOURCES / "SBLGNT.tsv")
+    """
+
+    def __init__(self) -> None:
+        """Initialize an instance."""
+        # resolved path -> ((mtime, size), reader)
+        self._readers: dict[Path, tuple[tuple[int, int], SourceReader]] = {}
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        return f"<SourceRegistry: {len(self)} readers>"
+
+    def __len__(self) -> int:
+        """Return the number of registered readers."""
+        return len(self._readers)
+
+    def __contains__(self, tsvpath: object) -> bool:
+        """Return True if a reader is registered for tsvpath."""
+        return isinstance(tsvpath, Path) and tsvpath.resolve() in self._readers
+
+    @staticmethod
+    def _stamp(tsvpath: Path) -> tuple[int, int]:
+        """Return the modification time and size of tsvpath."""
+        stat = tsvpath.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, tsvpath: Path, cachedir: Optional[Path] = None) -> SourceReader:
+        """Return the shared SourceReader for tsvpath, reading it if necessary.
+
+        cachedir is passed to SourceReader when reading.
+        """
+        key = tsvpath.resolve()
+        stamp = self._stamp(key)
+        if key in self._readers:
+            oldstamp, reader = self._readers[key]
+            if oldstamp == stamp:
+                return reader
+        reader = SourceReader(tsvpath, cachedir=cachedir)
+        reader.freeze()
+        self._readers[key] = (stamp, reader)
+        return reader
+
+    def evict(self, tsvpath: Optional[Path] = None) -> None:
+        """Drop the reader for tsvpath, or all readers if tsvpath is None.
+
+        Managers using an evicted reader keep it: it's only freed
+        once they're gone.
+        """
+        if tsvpath is None:
+            self._readers.clear()
+        else:
+            self._readers.pop(tsvpath.resolve(), None)
+
+
+# the registry for this process
+sourceregistry = SourceRegistry()
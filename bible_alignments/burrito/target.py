@@ -21,23 +21,31 @@
 """
 
 from collections import UserDict
-from dataclasses import dataclass
+from collections.abc import Mapping
+from dataclasses import MISSING, dataclass, fields
 from pathlib import Path
 import re
-from typing import Any, Callable, Optional
+from typing import Any, Callable, ClassVar, Iterable, Iterator, Optional
 from warnings import warn
 
+import numpy as np
+import pandas as pd
 from unicodecsv import DictReader, DictWriter
 
 from biblelib.word import bcvwpid
 
-from .BaseToken import BaseToken, asbool
-from .util import groupby_bcv
+from .BaseToken import BaseToken, asbool, bcv_from_id
+from .columnar import StringTable, cache_path, load_arrays, save_arrays
+from .util import groupby_bcv, index_terms
 
 # these attribute names match the source data for simplicity
 
+# string values for boolean fields that mean True. Changing this
+# changes cached data: increment columnar.NORMALIZATION_VERSION
+TRUTHYRE = re.compile("(?i)(y|true)$")
 
-@dataclass(order=True, repr=False)
+
+@dataclass(order=True, repr=False, slots=True)
 class Target(BaseToken):
     """Manage data for a target token."""
 
@@ -57,8 +65,9 @@ class Target(BaseToken):
     isPrimary: bool = False
     # optional. id of the associated mss token, used in BSB to more easily generate alignment data
     msId: str = ""
-    _boolean_fields: tuple = ("skip_space_after", "exclude", "isPunc", "isPrimary")
-    _input_fields: tuple = (
+    _boolean_fields: ClassVar[tuple] = ("skip_space_after", "exclude", "isPunc", "isPrimary")
+    _categorical_fields: ClassVar[tuple[str, ...]] = ("source_verse", "transType")
+    _input_fields: ClassVar[tuple] = (
         ("id", "id"),
         ("altId", "altId"),
         ("text", "text"),
@@ -72,7 +81,7 @@ class Target(BaseToken):
         # ("msId", "msId"),
     )
     # just the minimal standard set: override elsewhere if you want more
-    _output_fields: tuple = (
+    _output_fields: ClassVar[tuple] = (
         "id",
         "text",
         "source_verse",
@@ -88,12 +97,11 @@ class Target(BaseToken):
         if not self.source_verse:
             self.source_verse = self.bcv
             # self.source_verse = bcvwpid.to_bcv(self.id)
-        truthyre = re.compile("(?i)(y|true)$")
         # booleanize if a string
         for field in self._boolean_fields:
             fieldval = getattr(self, field)
             if isinstance(fieldval, str):
-                setattr(self, field, bool(truthyre.match(fieldval)))
+                setattr(self, field, bool(TRUTHYRE.match(fieldval)))
 
     @staticmethod
     def fromjsondict(jdict: dict[str, Any]) -> "Target":
@@ -154,6 +162,181 @@ class Target(BaseToken):
         return outdict
 
 
+def read_target_columns(tsvpath: Path, idheader: str = "id", keepwordpart: bool = False) -> dict[str, list[Any]]:
+    """Return a dict of Target attribute values from a TSV file, by column.
+
+    This reads the file with pandas and processes whole columns at
+    once, giving the same values as reading by row with
+    Target.__post_init__(): word parts are trimmed from identifiers
+    unless keepwordpart, boolean fields are parsed, and missing
+    source_verse values are filled from identifiers. Keys are the
+    attribute names in Target._input_fields: missing columns get the
+    default values. Rows are in file order, including any duplicates.
+
+    Use this directly to get target data without making Target
+    instances, or use TargetReader(bulk=True).
+    """
+    frame = pd.read_csv(tsvpath, sep="\t", dtype=str, keep_default_na=False, na_filter=False, encoding="utf-8")
+    assert idheader in frame.columns, f"Missing ID header '{idheader}'"
+    if idheader != "id":
+        frame = frame.rename(columns={idheader: "id"})
+    defaults = {fld.name: fld.default for fld in fields(Target) if fld.default is not MISSING}
+    for header, attr in Target._input_fields:
+        if header not in frame.columns and attr not in defaults:
+            raise ValueError(f"Missing column '{header}' in {tsvpath}")
+    columns: dict[str, list[Any]] = {
+        attr: (frame[header].tolist() if header in frame.columns else [defaults[attr]] * len(frame))
+        for header, attr in Target._input_fields
+    }
+    if not keepwordpart:
+        # hacky, as when reading by row
+        columns["id"] = [identifier[:11] if len(identifier) == 12 else identifier for identifier in columns["id"]]
+    columns["source_verse"] = [
+        sourceverse or bcv_from_id(identifier)
+        for identifier, sourceverse in zip(columns["id"], columns["source_verse"])
+    ]
+    for field in Target._boolean_fields:
+        if field in frame.columns:
+            truthy = {value: bool(TRUTHYRE.match(value)) for value in dict.fromkeys(columns[field])}
+            columns[field] = [truthy[value] for value in columns[field]]
+    return columns
+
+
+class TargetStore(Mapping):
+    """Read-only mapping of identifiers to Target instances, backed by packed arrays.
+
+    Identifiers, string attributes (as indexes into a string table),
+    and boolean flags are stored in arrays that are memory-mapped from
+    a store directory, so they take little memory until used. Target
+    instances are only created when an item is retrieved: each
+    retrieval returns a new (but equal) instance, so changes to a
+    retrieved instance are not kept.
+
+    Use TargetReader(storedir=...) rather than creating these directly.
+    """
+
+    _string_fields: tuple = ("altId", "text", "source_verse", "transType")
+    _flag_bits: dict[str, int] = {field: 1 << bit for bit, field in enumerate(Target._boolean_fields)}
+
+    def __init__(self, storepath: Path) -> None:
+        """Initialize an instance from the store directory at storepath."""
+        self.storepath = storepath
+        arrays, _ = load_arrays(storepath)
+        # identifiers in row order, and the permutation that sorts them
+        self._ids: np.ndarray = arrays["ids"]
+        self._order: np.ndarray = arrays["order"]
+        self._flags: np.ndarray = arrays["flags"]
+        self._columns: dict[str, np.ndarray] = {field: arrays[f"col_{field}"] for field in self._string_fields}
+        self._strings: np.ndarray = arrays["strings"]
+        self._offsets: np.ndarray = arrays["offsets"]
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        return f"<TargetStore: {self.storepath.name}, {len(self)} tokens>"
+
+    def __reduce__(self) -> tuple:
+        """Pickle by reference to the store directory, not the data."""
+        return (TargetStore, (self.storepath,))
+
+    def __len__(self) -> int:
+        """Return the number of tokens."""
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over identifiers in their original order."""
+        return (identifier.decode("ascii") for identifier in self._ids.tolist())
+
+    def __contains__(self, identifier: object) -> bool:
+        """Return True if identifier is in the store."""
+        return self._row(identifier) is not None
+
+    def __getitem__(self, identifier: str) -> Target:
+        """Return a new Target instance for identifier."""
+        row = self._row(identifier)
+        if row is None:
+            raise KeyError(identifier)
+        return self._target(identifier, row)
+
+    def _row(self, identifier: object) -> Optional[int]:
+        """Return the row for identifier, or None if not present."""
+        if not isinstance(identifier, str) or not identifier.isascii() or len(identifier) > self._ids.itemsize:
+            return None
+        key = identifier.encode("ascii")
+        position = int(np.searchsorted(self._ids, key, sorter=self._order))
+        if position < len(self._order) and self._ids[row := int(self._order[position])] == key:
+            return row
+        return None
+
+    def _string(self, index: int) -> str:
+        """Return string index from the string table."""
+        return self._strings[self._offsets[index] : self._offsets[index + 1]].tobytes().decode("utf-8")
+
+    def _target(self, identifier: str, row: int) -> Target:
+        """Return a Target instance for identifier at row."""
+        flags = int(self._flags[row])
+        return Target._fromnormalized(
+            id=identifier,
+            **{field: self._string(column[row]) for field, column in self._columns.items()},
+            **{field: bool(flags & bit) for field, bit in self._flag_bits.items()},
+        )
+
+    def term_rows(self, field: str, lowercase: bool = False) -> dict[str, np.ndarray]:
+        """Return a dict mapping values of a string field to arrays of the rows with that value, in order.
+
+        Rows with an empty value are omitted. With lowercase = True
+        (default is False), keys are lower-cased values. Only the
+        column and the string table are read: no Target instances are
+        made.
+        """
+        column = np.asarray(self._columns[field])
+        order = np.argsort(column, kind="stable")
+        stringindexes, starts = np.unique(column[order], return_index=True)
+        index: dict[str, np.ndarray] = {}
+        for stringindex, rows in zip(stringindexes.tolist(), np.split(order, starts[1:])):
+            if value := self._string(stringindex):
+                key = value.lower() if lowercase else value
+                index[key] = np.sort(np.concatenate([index[key], rows])) if key in index else rows
+        return index
+
+    def targets(self, rows: np.ndarray) -> list[Target]:
+        """Return new Target instances for rows."""
+        return [self._target(self._ids[row].decode("ascii"), row) for row in rows.tolist()]
+
+    def empty_ids(self) -> list[str]:
+        """Return the identifiers of tokens whose text is empty."""
+        lengths = np.diff(self._offsets)
+        rows = np.flatnonzero(lengths[self._columns["text"]] == 0)
+        return [identifier.decode("ascii") for identifier in self._ids[rows].tolist()]
+
+    @classmethod
+    def write(cls, storepath: Path, targets: Iterable[tuple[str, Target]], meta: Optional[dict[str, Any]] = None) -> None:
+        """Write a store directory at storepath for (identifier, Target) pairs.
+
+        As with a dict, a later duplicate identifier replaces the
+        earlier value but keeps its position.
+        """
+        rows: dict[str, tuple] = {
+            identifier: (
+                tuple(getattr(target, field) for field in cls._string_fields),
+                sum(bit for field, bit in cls._flag_bits.items() if getattr(target, field)),
+            )
+            for identifier, target in targets
+        }
+        ids = np.array(list(rows), dtype="S") if rows else np.array([], dtype="S12")
+        strtable = StringTable()
+        arrays = {
+            "ids": ids,
+            "order": np.argsort(ids, kind="stable").astype(np.int32),
+            "flags": np.fromiter((flags for _, flags in rows.values()), dtype=np.uint8, count=len(rows)),
+            **{
+                f"col_{field}": strtable.indexes(strings[index] for strings, _ in rows.values())
+                for index, field in enumerate(cls._string_fields)
+            },
+        }
+        arrays["strings"], arrays["offsets"] = strtable.tobuffers()
+        save_arrays(storepath, arrays, meta=meta)
+
+
 class TargetReader(UserDict):
     """Read Target TSV data into a dict, with identifiers as keys.
 
@@ -163,11 +346,38 @@ class TargetReader(UserDict):
     - Normalize Strong's numbers
 
     Verse-level indices in altId are also revised: some data had errors.
+
+    With storedir, token data is kept in a TargetStore: a directory of
+    packed, memory-mapped arrays in storedir, keyed by a hash of the
+    TSV content and reused while the file is unchanged. Target
+    instances are then created only as they are retrieved, which uses
+    far less memory for large corpora, but the data is read-only.
+
+    Otherwise, with intern = True, values of categorical fields like
+    source_verse are interned, so tokens share one copy of each value.
+
+    With bulk = True, the TSV is read and normalized by column (see
+    read_target_columns()), which is much faster for large files.
+
+    With columns, tokens are made from that dict of values by column,
+    in the same form as read_target_columns() returns, and tsvpath is
+    not read: use this for target data from another format, like a
+    Parquet export (see parquet.py).
     """
 
     inmap = {v: k for k, v in Target._input_fields}
 
-    def __init__(self, tsvpath: Path, idheader: str = "id", keepwordpart: bool = False, strict: bool = False) -> None:
+    def __init__(
+        self,
+        tsvpath: Path,
+        idheader: str = "id",
+        keepwordpart: bool = False,
+        strict: bool = False,
+        storedir: Optional[Path] = None,
+        intern: bool = False,
+        bulk: bool = False,
+        columns: Optional[dict[str, list[Any]]] = None,
+    ) -> None:
         """Initialize a Reader instance.
 
         With keepwordpart (default is False), keep the part/subword
@@ -176,13 +386,64 @@ class TargetReader(UserDict):
 
         """
         super().__init__()
+        # (tokenattr, lowercase) -> value -> tokens, or rows in a
+        # TargetStore: see term_tokens()
+        self._termindexes: dict[tuple[str, bool], dict[str, Any]] = {}
         self.tsvpath = tsvpath
         assert (
-            self.tsvpath.exists()
+            columns is not None or self.tsvpath.exists()
         ), f"No such path as {tsvpath}:\npattern is targets/<targetid>/<canon>_<targetid>.tsv"
+        if columns is not None and storedir:
+            raise ValueError("storedir can't be used with columns")
         # assumes conventoins
         self.identifier = self.tsvpath.stem
         self.badtokens = {}
+        self.storepath: Optional[Path] = None
+        read = self._read_bulk if bulk else self._read_tsv
+        if storedir:
+            kind = "target-wordpart" if keepwordpart else "target"
+            self.storepath = cache_path(storedir, self.tsvpath, kind=kind, suffix="")
+            if not self.storepath.exists():
+                TargetStore.write(
+                    self.storepath,
+                    read(idheader=idheader, keepwordpart=keepwordpart),
+                    meta={"tsvpath": str(self.tsvpath)},
+                )
+            self.data = TargetStore(self.storepath)
+            emptyids = self.data.empty_ids()
+        elif bulk or columns is not None:
+            if columns is None:
+                columns = read_target_columns(self.tsvpath, idheader=idheader, keepwordpart=keepwordpart)
+                self._warn_duplicates(columns["id"])
+            tokens = Target._fromcolumns(columns)
+            if intern:
+                for target in tokens:
+                    target.intern()
+            self.data = dict(zip(columns["id"], tokens))
+            # the last of any duplicates is kept, as when reading by row
+            empty = np.flatnonzero(np.array(columns["text"], dtype=object) == "")
+            emptyids = [
+                identifier
+                for identifier in dict.fromkeys(columns["id"][index] for index in empty)
+                if self.data[identifier].isempty
+            ]
+        else:
+            for identifier, target in self._read_tsv(idheader=idheader, keepwordpart=keepwordpart):
+                if intern:
+                    target.intern()
+                self.data[identifier] = target
+            emptyids = [identifier for identifier, target in self.data.items() if target.isempty]
+        # check for empty tokens
+        for identifier in emptyids:
+            if strict:
+                warn(f"Empty text for target token {identifier}")
+            self.badtokens[identifier] = self.data[identifier]
+        if self.badtokens:
+            print(f"{self.identifier} has {len(self.badtokens)} target tokens with empty text: see self.badtokens.")
+
+    def _read_tsv(self, idheader: str = "id", keepwordpart: bool = False) -> Iterator[tuple[str, Target]]:
+        """Read the TSV data, yielding pairs of identifiers and Target instances."""
+        seen: set[str] = set()
         with self.tsvpath.open("rb") as f:
             reader = DictReader(f, delimiter="\t")
             for row in reader:
@@ -201,16 +462,25 @@ class TargetReader(UserDict):
                 if len(identifier) == 12 and not keepwordpart:
                     identifier = idrow["id"] = idrow["id"][0:11]
                 deserialized = {self.inmap[k]: v for k, v in idrow.items() if k in self.inmap}
-                if identifier in self:
+                if identifier in seen:
                     warn(f"{identifier} is duplicated in {self.tsvpath}")
-                self.data[identifier] = Target(**deserialized)
-                # check for empty tokens
-                if self.data[identifier].isempty:
-                    if strict:
-                        warn(f"Empty text for target token {identifier}")
-                    self.badtokens[identifier] = self.data[identifier]
-        if self.badtokens:
-            print(f"{self.identifier} has {len(self.badtokens)} target tokens with empty text: see self.badtokens.")
+                seen.add(identifier)
+                yield identifier, Target(**deserialized)
+
+    def _read_bulk(self, idheader: str = "id", keepwordpart: bool = False) -> Iterator[tuple[str, Target]]:
+        """Read the TSV data by column, yielding pairs of identifiers and Target instances."""
+        columns = read_target_columns(self.tsvpath, idheader=idheader, keepwordpart=keepwordpart)
+        self._warn_duplicates(columns["id"])
+        yield from zip(columns["id"], Target._fromcolumns(columns))
+
+    def _warn_duplicates(self, identifiers: list[str]) -> None:
+        """Warn about any duplicated identifiers."""
+        if len(set(identifiers)) < len(identifiers):
+            seen: set[str] = set()
+            for identifier in identifiers:
+                if identifier in seen:
+                    warn(f"{identifier} is duplicated in {self.tsvpath}")
+                seen.add(identifier)
 
     def write_tsv(
         self,
@@ -255,24 +525,45 @@ class TargetReader(UserDict):
                 writer.writerow(trgdict)
 
     def write_vref(self, outpath: Path) -> None:
-        """Write a list of verse references for the target tokens."""
+        """Write a list of verse references for the target tokens, once each, in order of first occurrence."""
         with outpath.open("w") as f:
-            self.bcv = groupby_bcv(list(self.values()), bcvfn=lambda t: t.bcv)
+            self.bcv = groupby_bcv(self.values(), bcvfn=lambda t: t.bcv)
             for bcv in self.bcv:
                 f.write(f"{bcv}\n")
 
+    def __setitem__(self, key: str, item: Target) -> None:
+        """Set an item, discarding any term indexes."""
+        self._termindexes.clear()
+        super().__setitem__(key, item)
+
+    def __delitem__(self, key: str) -> None:
+        """Delete an item, discarding any term indexes."""
+        self._termindexes.clear()
+        super().__delitem__(key)
+
     def term_tokens(self, term: str, tokenattr: str = "text", lowercase: bool = False) -> list[Target]:
         """Return a list of tokens matching term.
 
         The attribute used is 'text' by default.
 
         With lowercase = True (default is False), lower-case term and token values.
+
+        The first lookup for each combination of tokenattr and
+        lowercase builds an index of tokens by value, so later lookups
+        only touch the matching tokens. The index is discarded if
+        tokens are added or removed.
+
+        With a TargetStore, the index for a string attribute maps
+        values to rows in the store, built from its columns, and
+        Target instances are only made for the matching rows.
         """
-        casedterm = term.lower() if lowercase else term
-        return [
-            token
-            for token in self.values()
-            if (tokattr := getattr(token, tokenattr))
-            if (casedtokenattr := tokattr.lower() if lowercase else tokattr)
-            if casedtokenattr == casedterm
-        ]
+        indexkey = (tokenattr, lowercase)
+        key = term.lower() if lowercase else term
+        if isinstance(self.data, TargetStore) and tokenattr in TargetStore._string_fields:
+            if indexkey not in self._termindexes:
+                self._termindexes[indexkey] = self.data.term_rows(tokenattr, lowercase=lowercase)
+            rows = self._termindexes[indexkey].get(key)
+            return self.data.targets(rows) if rows is not None else []
+        if indexkey not in self._termindexes:
+            self._termindexes[indexkey] = index_terms(self.values(), tokenattr=tokenattr, lowercase=lowercase)
+        return list(self._termindexes[indexkey].get(key, []))
@@ -0,0 +1,171 @@
+"""Encode token identifiers as integers.
+
+Token identifiers like 'n41004003001' or '410040030011' are strings
+in BBCCCVVVWWW(P) format, with an optional canon prefix ('n' or
+'o'). Encoded as 64-bit integers, they sort in the same order, and
+large sets of them can be sorted, searched and compared with NumPy,
+which is much faster than with lists of strings.
+
+The fields are packed from most to least significant: book, chapter,
+verse, word, part, whether there is a part, and canon prefix. So
+integer order is canonical order, and the prefix doesn't affect
+order.
+
+>>> from bible_alignments.burrito import tokenids
+>>> tokenids.encode("n41004003001")
+5635534356609
+>>> tokenids.decode(5635534356609)
+'n41004003001'
+>>> sr = SourceReader(SOURCES / "SBLGNT.tsv")
+>>> ids = np.sort(tokenids.encode_many(sr))
+# all the tokens in MRK 4:3
+>>> tokenids.decode_many(tokenids.select(ids, "41004003"))
+['41004003001', '41004003002', ...]
+
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+# the bit offset and width of each field, least significant first
+CANON_SHIFT, CANON_BITS = 0, 2
+HASPART_SHIFT, HASPART_BITS = 2, 1
+PART_SHIFT, PART_BITS = 3, 4
+WORD_SHIFT, WORD_BITS = 7, 10
+VERSE_SHIFT, VERSE_BITS = 17, 10
+CHAPTER_SHIFT, CHAPTER_BITS = 27, 10
+BOOK_SHIFT, BOOK_BITS = 37, 7
+
+CANONS = ("", "n", "o")
+CANON_MASK = (1 << CANON_BITS) - 1
+# (shift, bits, digits) for the fields in identifier order
+_FIELDS = (
+    (BOOK_SHIFT, BOOK_BITS, 2),
+    (CHAPTER_SHIFT, CHAPTER_BITS, 3),
+    (VERSE_SHIFT, VERSE_BITS, 3),
+    (WORD_SHIFT, WORD_BITS, 3),
+)
+# the number of characters in a reference of each kind: see reference_range()
+_REFERENCE_SHIFTS = {2: BOOK_SHIFT, 5: CHAPTER_SHIFT, 8: VERSE_SHIFT, 11: WORD_SHIFT}
+
+
+def encode(identifier: str) -> int:
+    """Return the integer encoding of a token identifier.
+
+    Raise ValueError if identifier isn't in BBCCCVVVWWW(P) format,
+    with an optional canon prefix.
+    """
+    canon = 0
+    if identifier[:1] in ("n", "o"):
+        canon = CANONS.index(identifier[0])
+        identifier = identifier[1:]
+    if len(identifier) not in (11, 12) or not identifier.isdigit() or not identifier.isascii():
+        raise ValueError(f"Invalid token identifier: {identifier!r}")
+    value = canon
+    position = 0
+    for shift, _, width in _FIELDS:
+        value |= int(identifier[position : position + width]) << shift
+        position += width
+    if len(identifier) == 12:
+        value |= (int(identifier[11]) << PART_SHIFT) | (1 << HASPART_SHIFT)
+    return value
+
+
+def decode(value: int) -> str:
+    """Return the token identifier for an integer encoding."""
+    return decode_many(np.array([value], dtype=np.int64))[0]
+
+
+def encode_many(identifiers: Iterable[str]) -> np.ndarray:
+    """Return an array of integer encodings for identifiers.
+
+    This is vectorized, so much faster than calling encode() for each
+    identifier. Raise ValueError if any identifier is invalid.
+    """
+    # one character more than the longest valid identifier, so longer ones are detected
+    idarray = np.array(list(identifiers), dtype="S14")
+    if not len(idarray):
+        return np.zeros(0, dtype=np.int64)
+    chars = idarray.view(np.uint8).reshape(len(idarray), 14)
+    prefixed = (chars[:, 0] == ord("n")) | (chars[:, 0] == ord("o"))
+    digits = np.where(prefixed[:, None], chars[:, 1:13], chars[:, :12]).astype(np.int64) - ord("0")
+    lengths = np.count_nonzero(chars, axis=1) - prefixed
+    haspart = lengths == 12
+    # unused trailing characters are zero bytes
+    digits[~haspart, 11] = 0
+    valid = ((lengths == 11) | haspart) & np.all((digits >= 0) & (digits <= 9), axis=1)
+    if not valid.all():
+        bad = idarray[np.argmin(valid)].decode("utf-8", errors="replace")
+        raise ValueError(f"Invalid token identifier: {bad!r}")
+    canons = np.where(chars[:, 0] == ord("n"), 1, np.where(chars[:, 0] == ord("o"), 2, 0))
+    values = canons.astype(np.int64) | (haspart.astype(np.int64) << HASPART_SHIFT) | (digits[:, 11] << PART_SHIFT)
+    position = 0
+    for shift, _, width in _FIELDS:
+        field = np.zeros(len(idarray), dtype=np.int64)
+        for offset in range(width):
+            field = field * 10 + digits[:, position + offset]
+        values |= field << shift
+        position += width
+    return values
+
+
+def _field(values: np.ndarray, shift: int, bits: int) -> np.ndarray:
+    """Return the field at shift with bits from values."""
+    return (values >> shift) & ((1 << bits) - 1)
+
+
+def decode_many(values: Iterable[int]) -> list[str]:
+    """Return a list of token identifiers for integer encodings."""
+    values = np.asarray(values, dtype=np.int64)
+    columns = [_field(values, shift, bits).tolist() for shift, bits, _ in _FIELDS]
+    canons = _field(values, CANON_SHIFT, CANON_BITS).tolist()
+    parts = _field(values, PART_SHIFT, PART_BITS).tolist()
+    hasparts = _field(values, HASPART_SHIFT, HASPART_BITS).tolist()
+    return [
+        f"{CANONS[canon]}{book:02d}{chapter:03d}{verse:03d}{word:03d}{part if haspart else ''}"
+        for book, chapter, verse, word, canon, part, haspart in zip(*columns, canons, parts, hasparts)
+    ]
+
+
+def strip_canon(values: np.ndarray) -> np.ndarray:
+    """Return values without canon prefixes.
+
+    Use this before comparing prefixed and unprefixed identifiers.
+    """
+    return np.asarray(values, dtype=np.int64) & ~CANON_MASK
+
+
+def bcv_ints(values: np.ndarray) -> np.ndarray:
+    """Return integer BCV references (like 41004003) for values."""
+    values = np.asarray(values, dtype=np.int64)
+    return (
+        _field(values, BOOK_SHIFT, BOOK_BITS) * 1_000_000
+        + _field(values, CHAPTER_SHIFT, CHAPTER_BITS) * 1000
+        + _field(values, VERSE_SHIFT, VERSE_BITS)
+    )
+
+
+def reference_range(reference: str) -> tuple[int, int]:
+    """Return a (start, end) range of encodings for tokens within reference.
+
+    reference is a book (BB), chapter (BBCCC), verse (BBCCCVVV) or
+    word (BBCCCVVVWWW) reference. A value is within reference if
+    start <= value < end.
+    """
+    if len(reference) not in _REFERENCE_SHIFTS or not reference.isdigit():
+        raise ValueError(f"Invalid reference: {reference!r}")
+    shift = _REFERENCE_SHIFTS[len(reference)]
+    start = encode(reference.ljust(11, "0"))
+    return (start, start + (1 << shift))
+
+
+def select(values: np.ndarray, reference: str) -> np.ndarray:
+    """Return the sorted values within reference.
+
+    values must be sorted: this uses binary search, so is fast even
+    for whole corpora.
+    """
+    start, end = reference_range(reference)
+    lower, upper = np.searchsorted(values, [start, end])
+    return values[lower:upper]
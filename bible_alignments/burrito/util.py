@@ -3,18 +3,155 @@
 
 >>> from bible_alignments.burrito import util
 
-# group target tokens by verse
+# group target tokens by verse: they needn't be sorted
 >>> from bible_alignments.burrito import DATAPATH, target
 >>> tr = target.TargetReader(DATAPATH / "targets/swh/nt_ONEN.tsv", idheader="id")
 vd = util.groupby_bcv(tr.values())
+
+# or as one list, with (start, end) offsets for each verse
+>>> values, offsets = util.bcv_offsets(tr.values(), sort=True)
+
+# or group lazily, storing identifiers and retrieving tokens as needed
+>>> bcvindex = util.BCVIndex(tr, bcvfn=util.id_to_bcv, getter=tr.__getitem__)
+>>> bcvindex["41004003"]
 """
 
-from itertools import groupby
-from typing import Any, Callable
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from .BaseToken import BaseToken, bcv_from_id
+
+
+def groupby_bcv(values: Iterable[Any], bcvfn: Callable = BaseToken.to_bcv) -> dict[str, list[Any]]:
+    """Group tokens into a dict by their BCV values, in a single pass.
+
+    Unlike itertools.groupby(), values need not be sorted by BCV: each
+    BCV gets a single list, with its values in their original
+    order. Keys are in order of first occurrence.
+    """
+    groups: defaultdict[str, list[Any]] = defaultdict(list)
+    for value in values:
+        groups[bcvfn(value)].append(value)
+    return dict(groups)
+
+
+def bcv_offsets(
+    values: Iterable[Any], bcvfn: Callable = BaseToken.to_bcv, sort: bool = False
+) -> tuple[list[Any], dict[str, tuple[int, int]]]:
+    """Group values by their BCV values, as a flat list and offsets into it.
+
+    Returns the values, reordered so each BCV's values are contiguous,
+    and a dict mapping BCV references to (start, end) offsets into
+    them. This holds one list rather than one per BCV. With sort=True
+    (default is False), BCV references are in canonical order rather
+    than order of first occurrence.
+    """
+    groups = groupby_bcv(values, bcvfn)
+    flat: list[Any] = []
+    offsets: dict[str, tuple[int, int]] = {}
+    for bcv in sorted(groups) if sort else groups:
+        start = len(flat)
+        flat.extend(groups[bcv])
+        offsets[bcv] = (start, len(flat))
+    return flat, offsets
+
+
+def id_to_bcv(identifier: str) -> str:
+    """Return the BCV reference for a token identifier."""
+    return bcv_from_id(identifier)
+
+
+class BCVIndex(Mapping):
+    """Map BCV references to lists of values, stored as offsets into one flat list.
+
+    Values are grouped by bcvfn in a single pass, so they need not be
+    sorted by BCV. Grouping is deferred until the index is first used.
+
+    With getter, the stored values are keys (like token identifiers),
+    and getter(key) is returned for each one on lookup: this avoids
+    holding the values themselves, e.g. for a TargetStore. With
+    groupgetter instead, groupgetter(keys) is called once with the
+    list of keys for a BCV, and returns the list of values: use this
+    when retrieving values together is cheaper.
+    """
+
+    def __init__(
+        self,
+        values: Iterable[Any],
+        bcvfn: Callable = BaseToken.to_bcv,
+        getter: Optional[Callable] = None,
+        groupgetter: Optional[Callable] = None,
+    ) -> None:
+        """Initialize an instance."""
+        self._source: Optional[Iterable[Any]] = values
+        self.bcvfn: Callable = bcvfn
+        self.getter: Optional[Callable] = getter
+        self.groupgetter: Optional[Callable] = groupgetter
+        self._values: list[Any] = []
+        self._offsets: dict[str, tuple[int, int]] = {}
+
+    @classmethod
+    def fromoffsets(
+        cls,
+        values: list[Any],
+        offsets: dict[str, tuple[int, int]],
+        getter: Optional[Callable] = None,
+        groupgetter: Optional[Callable] = None,
+    ) -> "BCVIndex":
+        """Return an instance for values already grouped by BCV, with their offsets, as from bcv_offsets()."""
+        bcvindex = cls((), getter=getter, groupgetter=groupgetter)
+        bcvindex._source = None
+        bcvindex._values, bcvindex._offsets = values, offsets
+        return bcvindex
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        return f"<BCVIndex: {len(self)} BCV references>"
+
+    def _build(self) -> None:
+        """Group the values, if not already done."""
+        if self._source is None:
+            return
+        self._values, self._offsets = bcv_offsets(self._source, self.bcvfn)
+        self._source = None
+
+    @property
+    def offsets(self) -> dict[str, tuple[int, int]]:
+        """Return a dict mapping BCV references to (start, end) offsets into the values."""
+        self._build()
+        return self._offsets
+
+    def __getitem__(self, bcv: str) -> list[Any]:
+        """Return the list of values for bcv."""
+        start, end = self.offsets[bcv]
+        if self.groupgetter:
+            return self.groupgetter(self._values[start:end])
+        if self.getter:
+            return [self.getter(key) for key in self._values[start:end]]
+        return self._values[start:end]
+
+    def __contains__(self, bcv: object) -> bool:
+        """Return True if bcv has values."""
+        return bcv in self.offsets
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over BCV references, in order of first occurrence."""
+        return iter(self.offsets)
+
+    def __len__(self) -> int:
+        """Return the number of BCV references."""
+        return len(self.offsets)
 
-from .BaseToken import BaseToken
 
+def index_terms(values: Iterable[Any], tokenattr: str = "text", lowercase: bool = False) -> dict[str, list[Any]]:
+    """Return a dict mapping values of tokenattr to lists of tokens, in order.
 
-def groupby_bcv(values: list[Any], bcvfn: Callable = BaseToken.to_bcv) -> dict[str, list[Any]]:
-    """Group a list of tokens into a dict by their BCV values."""
-    return {k: list(g) for k, g in groupby(values, bcvfn)}
+    Tokens with no value for tokenattr are omitted. With lowercase =
+    True (default is False), keys are lower-cased values.
+    """
+    index: dict[str, list[Any]] = {}
+    for token in values:
+        if tokattr := getattr(token, tokenattr):
+            index.setdefault(tokattr.lower() if lowercase else tokattr, []).append(token)
+    return index
@@ -1,28 +1,179 @@
 """Generate a catalog of alignments.
 
+Alignment metadata is in TOML files, like
+data/<lang>/alignments/<version>/<alignment>.toml.
+
 >>> from bible_alignments import catalog
 >>> catalog.Catalog().write()
 
+Parsed TOML data and catalog rows are cached (see Catalog.cachepath)
+by file path, modification time, and size. So only new or changed
+files are parsed and validated, and catalog.tsv is only rewritten if
+its content changes: rebuilding an unchanged catalog is fast.
+
+A catalog can also merge many data roots, like the data directories
+of separate alignments-<lang> repositories (which have
+alignments/<version>/<alignment>.toml, for the language in the
+repository name). Roots are scanned concurrently, and the timing and
+any errors for each are in Catalog.scans.
+
+>>> roots = sorted(Path("~/git/Clear-Bible").expanduser().glob("alignments-*/data"))
+>>> cat = catalog.Catalog(roots=roots)
+>>> for scan in cat.scans:
+...     print(scan)
+<ScanResult: alignments-eng/data, 12 files, 0.004s>
+<ScanResult: alignments-hin/data, 1 files, 0.001s, 1 errors>
+>>> cat.write()
+
 TODO:
 - add check for missing source/target files
 
 """
 
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from csv import DictWriter
+from dataclasses import dataclass, field
+import io
+import json
+import os
 from pathlib import Path
+import time
+from typing import Any, Iterable, Optional
 from warnings import warn
 
 import tomli
 
-from bible_alignments import config
+from bible_alignments import DATAPATH
+
+# increment when the layout of cache files changes
+CACHE_VERSION = 1
+
+
+def _subdirs(path: Path) -> list[os.DirEntry]:
+    """Return entries for the subdirectories of path."""
+    with os.scandir(path) as entries:
+        return [entry for entry in entries if entry.is_dir()]
+
+
+def _root_language(root: Path) -> str:
+    """Return the language for a data root with its own alignments directory.
+
+    This is the data directory for an alignments-<lang> repository,
+    or else a directory named for the language.
+    """
+    reponame = root.parent.name if root.name == "data" else root.name
+    return reponame.removeprefix("alignments-")
+
+
+def find_tomlfiles(root: Path) -> dict[str, Path]:
+    """Return a dict of TOML file paths under root, by lang+version+alignment key.
+
+    root either has <lang>/alignments/<version>/<alignment>.toml
+    (like DATAPATH), or alignments/<version>/<alignment>.toml, for a
+    single language (see _root_language()).
+    """
+    if (root / "alignments").is_dir():
+        langpaths = [(_root_language(root), root / "alignments")]
+    else:
+        # scan each directory once: this is much faster than globbing
+        langpaths = sorted(
+            (entry.name, Path(entry.path) / "alignments")
+            for entry in _subdirs(root)
+            if os.path.isdir(Path(entry.path) / "alignments")
+        )
+    tomlfiles = {}
+    for lang, alignmentspath in langpaths:
+        for version in sorted(entry.name for entry in _subdirs(alignmentspath)):
+            with os.scandir(alignmentspath / version) as entries:
+                tomlpaths = sorted(
+                    Path(entry.path) for entry in entries if entry.name.endswith(".toml") and entry.is_file()
+                )
+            for tomlfile in tomlpaths:
+                # TODO: tomlfile.stem is sufficient to identify an
+                # alignment. Maybe leave these three elements separate
+                # therefore?
+                tomlfiles[f"{lang}+{version}+{tomlfile.stem}"] = tomlfile
+    return tomlfiles
+
+
+@dataclass
+class ScanResult:
+    """The result of scanning a data root for TOML files."""
+
+    root: Path
+    # TOML file paths, by lang+version+alignment key
+    tomlfiles: dict[str, Path] = field(default_factory=dict)
+    # cache entries (see Catalog), by TOML file path
+    entries: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # keys for files that were parsed, not cached
+    changed: set[str] = field(default_factory=set)
+    # seconds to find, stat, and parse the files
+    seconds: float = 0.0
+    # messages for files that couldn't be parsed, or for the root itself
+    errors: list[str] = field(default_factory=list)
+
+    def __repr__(self) -> str:
+        """Return a printed representation."""
+        errors = f", {len(self.errors)} errors" if self.errors else ""
+        rootname = "/".join(self.root.parts[-2:])
+        return f"<ScanResult: {rootname}, {len(self.tomlfiles)} files, {self.seconds:.3f}s{errors}>"
+
+
+def scan_root(root: Path, cached: Optional[dict[str, dict[str, Any]]] = None) -> ScanResult:
+    """Find and parse the TOML files under root, and return a ScanResult.
+
+    cached has cache entries by TOML file path: files with a current
+    entry aren't parsed again. Errors are recorded in the result
+    rather than raised or warned about, so this is safe to call from
+    several threads, and one bad root or file doesn't stop the
+    others. Files that can't be read at all are left out of
+    result.tomlfiles.
+    """
+    cached = cached or {}
+    result = ScanResult(root=root)
+    start = time.perf_counter()
+    try:
+        result.tomlfiles = find_tomlfiles(root)
+    except OSError as e:
+        result.errors.append(f"Skipping {root}: {e}")
+    unreadable = []
+    for alignedver, tomlfile in result.tomlfiles.items():
+        try:
+            stat = tomlfile.stat()
+            entry = cached.get(str(tomlfile))
+            if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "tomldict": None, "row": None, "error": ""}
+                with tomlfile.open("rb") as f:
+                    try:
+                        entry["tomldict"] = tomli.load(f)
+                    except (tomli.TOMLDecodeError, UnicodeDecodeError) as e:
+                        entry["error"] = f"Skipping {alignedver}: {e}"
+                result.changed.add(alignedver)
+        except OSError as e:
+            # removed or unreadable since it was found: not cached,
+            # so it's tried again next time
+            result.errors.append(f"Skipping {alignedver}: {e}")
+            unreadable.append(alignedver)
+            continue
+        # cached errors are reported until the file is fixed
+        if entry.get("error"):
+            result.errors.append(entry["error"])
+        result.entries[str(tomlfile)] = entry
+    for alignedver in unreadable:
+        del result.tomlfiles[alignedver]
+    result.seconds = time.perf_counter() - start
+    return result
 
 
 class Catalog:
     """Manage data across all the alignments."""
 
-    alignments: Path = config.ALIGNMENTS
-    catalogpath: Path = config.DATAPATH / "catalog.tsv"
+    # contains <lang>/alignments/<version>/<alignment>.toml
+    alignments: Path = DATAPATH
+    catalogpath: Path = DATAPATH / "catalog.tsv"
+    # parsed TOML data and catalog rows: None to not cache
+    cachepath: Optional[Path] = DATAPATH / ".catalog-cache.json"
+    langverkey: str = "lang+version+alignment"
     # Standard metadata attributes: warn if not present
     stdattrs: dict[str, dict[str, str]] = {
         "alignment": ["format", "identifier", "license", "process", "scope", "team"],
@@ -56,70 +207,131 @@ class Catalog:
         ],
     }
 
-    def __init__(self) -> None:
-        """Initialize an instance."""
-        self.languages = sorted([lang.name for lang in self.alignments.glob("*")])
-        self.versions = sorted([(lang, v.name) for lang in self.languages for v in self.alignments.glob(f"{lang}/*")])
-        self.tomlfiles = {
-            # TODO: tomlfile.stem is sufficient to identify an
-            # alignment. Maybe leave these three elements separate
-            # therefore?
-            f"{lang}+{version}+{tomlfile.stem}": tomlfile
-            for lang, version in self.versions
-            for tomlfile in sorted(self.alignments.glob(f"{lang}/{version}/*.toml"))
+    def __init__(self, roots: Optional[Iterable[Path]] = None, threads: Optional[int] = None) -> None:
+        """Initialize an instance.
+
+        With roots, merge the alignments under each of them, instead
+        of under self.alignments. Roots are scanned concurrently, with
+        a pool of threads (the default number is the
+        ThreadPoolExecutor default). If the same key is found under
+        more than one root, the first is used, and the others are
+        recorded as errors.
+
+        Only TOML files that are new or changed since they were cached
+        are parsed: their keys are in self.changed. Errors are
+        warned about, and recorded in self.scans.
+        """
+        self.roots = list(roots) if roots is not None else [self.alignments]
+        cached = self._read_cache()
+        if len(self.roots) == 1:
+            self.scans = [scan_root(self.roots[0], cached)]
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                self.scans = list(executor.map(lambda root: scan_root(root, cached), self.roots))
+        self.tomlfiles: dict[str, Path] = {}
+        # path -> cache entry, for the files in this catalog
+        self._entries: dict[str, dict[str, Any]] = {}
+        self.changed: set[str] = set()
+        for scan in self.scans:
+            for alignedver, tomlfile in scan.tomlfiles.items():
+                if alignedver in self.tomlfiles:
+                    scan.errors.append(f"Skipping {tomlfile}: {alignedver} is also in {self.tomlfiles[alignedver]}")
+                    continue
+                self.tomlfiles[alignedver] = tomlfile
+                self._entries[str(tomlfile)] = scan.entries[str(tomlfile)]
+                if alignedver in scan.changed:
+                    self.changed.add(alignedver)
+            for error in scan.errors:
+                warn(error)
+        self.languages = sorted({alignedver.split("+")[0] for alignedver in self.tomlfiles})
+        self.versions = sorted({tuple(alignedver.split("+")[:2]) for alignedver in self.tomlfiles})
+        self.tomldicts = {
+            alignedver: self._entries[str(tomlfile)]["tomldict"]
+            for alignedver, tomlfile in self.tomlfiles.items()
+            if self._entries[str(tomlfile)]["tomldict"] is not None
         }
-        self.tomldicts = {}
-        for alignedver, tomlfile in self.tomlfiles.items():
-            if alignedver in self.tomldicts:
-                raise ValueError(f"Duplicate alignment: {alignedver}")
-            with tomlfile.open("rb") as f:
-                try:
-                    self.tomldicts[alignedver] = tomli.load(f)
-                except tomli.TOMLDecodeError as e:
-                    warn(f"Skipping {alignedver}: {e}")
         self.commonkeys = {k for v in self.tomldicts.values() for k in v}
-
-    def write(self) -> None:
-        """Write the catalog."""
-        langverkey = "lang+version+alignment"
-        self.langverdicts = {}
-        for alignedver, tomldict in self.tomldicts.items():
-            # warn if standard attrs are missing
-            self._validate(alignedver, tomldict)
-            stddict = deepcopy(tomldict)
-            # drop non-standard pairs
-            for stdk in stddict.copy():
-                if stdk not in self.stdattrs:
-                    warn(f"Dropping {stdk} from {alignedver} data: non-standard.")
-                    del stddict[stdk]
-                else:
-                    for stdsubk in stddict[stdk].copy():
-                        if stdsubk not in self.stdattrs[stdk]:
-                            warn(f"Dropping {stdk}.{stdsubk} from {alignedver}: non-standard.")
-                            del stddict[stdk][stdsubk]
-                        elif stdsubk in self.omittedattrs[stdk]:
-                            del stddict[stdk][stdsubk]
-            self.langverdicts[alignedver] = {
-                f"{k}.{subk}": stddict[k][subk] if subk in stddict[k] else ""
-                for k in self.stdattrs
-                for subk in self.stdattrs[k]
-                if subk not in self.omittedattrs[k]
-            }
-            # reformat name
-            fixeddict = self.langverdicts[alignedver]
-            if "target.name" in fixeddict and isinstance(fixeddict["target.name"], dict):
-                langcode, langname = list(fixeddict["target.name"].items())[0]
-                fixeddict["target.name"] = f"'{langname}'@{langcode}"
-        self.fieldnames = [langverkey] + [
+        self.fieldnames = [self.langverkey] + [
             f"{k}.{subk}" for k in self.stdattrs for subk in self.stdattrs[k] if subk not in self.omittedattrs[k]
         ]
-        with self.catalogpath.open("w") as f:
+
+    def _cache_header(self) -> dict[str, Any]:
+        """Return values that must match for cached data to be used."""
+        return {"version": CACHE_VERSION, "stdattrs": self.stdattrs, "omittedattrs": self.omittedattrs}
+
+    def _read_cache(self) -> dict[str, dict[str, Any]]:
+        """Return cached entries from self.cachepath, by TOML file path."""
+        if not (self.cachepath and self.cachepath.exists()):
+            return {}
+        try:
+            cache = json.loads(self.cachepath.read_text(encoding="utf-8"))
+        except ValueError:
+            return {}
+        if cache.get("header") != json.loads(json.dumps(self._cache_header())):
+            return {}
+        return cache["entries"]
+
+    def _write_cache(self) -> None:
+        """Write cache entries for the current TOML files to self.cachepath."""
+        if not self.cachepath:
+            return
+        cache = {"header": self._cache_header(), "entries": self._entries}
+        # TOML dates aren't JSON: they're written to the catalog as strings anyway
+        self.cachepath.write_text(json.dumps(cache, ensure_ascii=False, default=str), encoding="utf-8")
+
+    def _row(self, alignedver: str, tomldict: dict[str, Any]) -> dict[str, str]:
+        """Return the catalog row for alignedver, warning about non-standard data."""
+        # warn if standard attrs are missing
+        self._validate(alignedver, tomldict)
+        # drop non-standard pairs
+        for stdk, subdict in tomldict.items():
+            if stdk not in self.stdattrs:
+                warn(f"Dropping {stdk} from {alignedver} data: non-standard.")
+            else:
+                for stdsubk in subdict:
+                    if stdsubk not in self.stdattrs[stdk]:
+                        warn(f"Dropping {stdk}.{stdsubk} from {alignedver}: non-standard.")
+        row = {
+            f"{k}.{subk}": tomldict.get(k, {}).get(subk, "")
+            for k in self.stdattrs
+            for subk in self.stdattrs[k]
+            if subk not in self.omittedattrs[k]
+        }
+        # reformat name
+        if "target.name" in row and isinstance(row["target.name"], dict):
+            langcode, langname = list(row["target.name"].items())[0]
+            row["target.name"] = f"'{langname}'@{langcode}"
+        row[self.langverkey] = alignedver
+        return row
+
+    def rows(self) -> dict[str, dict[str, str]]:
+        """Return a dict of catalog rows, computing them only for changed files."""
+        rows = {}
+        for alignedver, tomlfile in self.tomlfiles.items():
+            entry = self._entries[str(tomlfile)]
+            if entry["tomldict"] is None:
+                continue
+            if entry["row"] is None:
+                entry["row"] = self._row(alignedver, entry["tomldict"])
+            rows[alignedver] = entry["row"]
+        return rows
+
+    def write(self) -> bool:
+        """Write the catalog if its content has changed, and return True if written."""
+        self.langverdicts = self.rows()
+        self._write_cache()
+        with io.StringIO() as f:
             writer = DictWriter(f, fieldnames=self.fieldnames, delimiter="\t")
             writer.writeheader()
-            for alignedver, langverdict in self.langverdicts.items():
-                # langvervalue = f"{alignedver[0]}+{alignedver[1]}"
-                langverdict.update({langverkey: alignedver})
-                writer.writerow(langverdict)
+            writer.writerows(self.langverdicts.values())
+            content = f.getvalue()
+        if self.catalogpath.exists():
+            with self.catalogpath.open(newline="") as f:
+                if f.read() == content:
+                    return False
+        with self.catalogpath.open("w", newline="") as f:
+            f.write(content)
+        return True
 
     # TODO: add as_markdown() to output a table
     def _validate(self, langver: str, langverdict: dict[str, dict[str, str]]) -> None:
@@ -128,5 +340,5 @@ class Catalog:
             if stdk not in langverdict:
                 warn(f"{langver} is missing standard key '{stdk}'")
             for stdsubk in self.stdattrs[stdk]:
-                if stdsubk not in langverdict[stdk]:
+                if stdsubk not in langverdict.get(stdk, {}):
                     warn(f"{langver} is missing standard subkey {stdsubk}")
@@ -6,19 +6,31 @@ maintain them, and (when forced) use them.
 
 """
 
+from functools import lru_cache
 import re
+from typing import Iterable
 
+_strongsre: re.Pattern = re.compile(r"[AGH]?\d{1,4}[a-d]?")
+# any other alpha suffix is eliminated
+_badsuffixre: re.Pattern = re.compile(r"[e-z]$")
+_nondigitre: re.Pattern = re.compile(r"\D")
+_specials: dict[str, str] = {
+    "1537+4053": "G4053b",
+    "5228+1537+4053": "G4053c",
+    "1417+3461": "G3461b",
+}
 
+
+# the set of distinct raw values is small and highly repetitive.
+# Changing results changes cached source data: increment
+# burrito.columnar.NORMALIZATION_VERSION
+@lru_cache(maxsize=1 << 16)
 def normalize_strongs(strongs: str | int, prefix: str = "", strict: bool = False) -> str:
-    """Return a normalized Strongs id."""
-    _strongsre: re.Pattern = re.compile(r"[AGH]?\d{1,4}[a-d]?")
-    # any other alpha suffix is eliminated
-    _badsuffixre: re.Pattern = re.compile(r"[e-z]$")
-    specials: dict[str, str] = {
-        "1537+4053": "G4053b",
-        "5228+1537+4053": "G4053c",
-        "1417+3461": "G3461b",
-    }
+    """Return a normalized Strongs id.
+
+    Results are cached, so any message about overwriting the prefix
+    parameter is only printed the first time for a given value.
+    """
     # some weird cases from WLCM with vertical bars, like
     # "1886j|2050b". Use the number after the bar, though that
     # sometimes seems wrong.
@@ -36,8 +48,8 @@ def normalize_strongs(strongs: str | int, prefix: str = "", strict: bool = False
     if isinstance(strongs, str) and _badsuffixre.search(strongs):
         strongs = strongs[:-1]
     # some special cases for SBLGNT data
-    if strongs in specials:
-        normed = specials[str(strongs)]
+    if strongs in _specials:
+        normed = _specials[str(strongs)]
     # Macula Hebrew has some empty values: allow these if not strict
     elif strict and (strongs == "H"):
         raise ValueError("Strong's code must not be empty")
@@ -45,16 +57,16 @@ def normalize_strongs(strongs: str | int, prefix: str = "", strict: bool = False
         normed = f"{prefix}{strongs:0>4}"
     elif _strongsre.fullmatch(strongs):
         # check for initial prefix: save if available
-        if re.match(r"[AGH]", strongs):
+        if strongs[0] in "AGH":
             firstchar = strongs[0]
             if prefix:
                 if firstchar != prefix:
                     print(f"Overwriting prefix parameter {prefix} for {strongs}")
             else:
                 prefix = firstchar
-        base = re.sub(r"\D", "", strongs)
+        base = _nondigitre.sub("", strongs)
         # final letter
-        if re.search("[a-d]$", strongs):
+        if strongs[-1] in "abcd":
             suffix = strongs[-1]
         else:
             suffix = ""
@@ -65,3 +77,14 @@ def normalize_strongs(strongs: str | int, prefix: str = "", strict: bool = False
     else:
         raise ValueError(f"Invalid Strong's code: {strongs}")
     return normed
+
+
+def normalize_strongs_many(values: Iterable[str | int], prefix: str = "", strict: bool = False) -> list[str]:
+    """Return a list of normalized Strongs ids for a column of values.
+
+    Each distinct value is only normalized once. As with
+    normalize_strongs(), raise ValueError for an invalid value.
+    """
+    values = list(values)
+    normed = {value: normalize_strongs(value, prefix=prefix, strict=strict) for value in dict.fromkeys(values)}
+    return [normed[value] for value in values]
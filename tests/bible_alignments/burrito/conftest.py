@@ -0,0 +1,76 @@
+"""Shared fixtures for burrito tests.
+
+tinyset is a complete alignment set (source, target, and alignments
+files) for two verses, written to a temporary directory, so tests
+don't depend on the full data.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from bible_alignments.burrito import AlignmentSet
+
+TINYSOURCES = [
+    ("id", "altId", "text", "strongs", "gloss", "gloss2", "lemma", "pos", "morph"),
+    ("n41004003001", "Ἀκούετε-1", "Ἀκούετε", "0191", "Listen", "listen", "ἀκούω", "verb", "V-PAM-2P"),
+    ("n41004003002", "ἰδοὺ-1", "ἰδοὺ", "2400", "Behold", "behold", "ἰδού", "intj", "I"),
+    ("n41004003003", "ἐξῆλθεν-1", "ἐξῆλθεν", "1831", "went out", "went out", "ἐξέρχομαι", "verb", "V-2AAI-3S"),
+    ("n41004004001", "καὶ-1", "καὶ", "2532", "and", "and", "καί", "cj", "CONJ"),
+    ("n41004004002", "ἐγένετο-1", "ἐγένετο", "1096", "it came to pass", "became", "γίνομαι", "verb", "V-2ADI-3S"),
+]
+
+TINYTARGETS = [
+    ("id", "source_verse", "text", "skip_space_after", "exclude"),
+    ("410040030011", "41004003", "Listen", "y", ""),
+    ("410040030021", "41004003", "!", "", ""),
+    ("410040030031", "41004003", "Behold", "", ""),
+    ("410040030041", "41004003", "went", "", ""),
+    ("410040030051", "41004003", "out", "", ""),
+    ("410040040011", "41004004", "And", "", ""),
+    ("410040040021", "41004004", "it", "", ""),
+    ("410040040031", "41004004", "happened", "", ""),
+]
+
+TINYRECORDS = [
+    {"meta": {"id": "41004003.001", "origin": "manual"}, "source": ["n41004003001"], "target": ["410040030011"]},
+    {"meta": {"id": "41004003.002", "origin": "manual"}, "source": ["n41004003002"], "target": ["410040030031"]},
+    {
+        "meta": {"id": "41004003.003", "origin": "manual"},
+        "source": ["n41004003003"],
+        "target": ["410040030041", "410040030051"],
+    },
+    {"meta": {"id": "41004004.001", "origin": "manual"}, "source": ["n41004004001"], "target": ["410040040011"]},
+    {
+        "meta": {"id": "41004004.002", "origin": "manual"},
+        "source": ["n41004004002"],
+        "target": ["410040040021", "410040040031"],
+    },
+    # bad: the target token doesn't exist
+    {"meta": {"id": "41004004.003", "origin": "manual"}, "source": ["n41004004002"], "target": ["410040040091"]},
+]
+
+
+def _write_tsv(path: Path, rows: list[tuple[str, ...]]) -> None:
+    """Write rows as a TSV file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join("\t".join(row) + "\n" for row in rows), encoding="utf-8")
+
+
+@pytest.fixture
+def tinyset(tmp_path: Path) -> AlignmentSet:
+    """Return an AlignmentSet for two verses of data in tmp_path."""
+    alset = AlignmentSet(
+        sourceid="SBLGNT",
+        targetid="BSB",
+        targetlanguage="eng",
+        sourcedatapath=tmp_path / "sources",
+        langdatapath=tmp_path / "eng",
+    )
+    _write_tsv(alset.sourcepath, TINYSOURCES)
+    _write_tsv(alset.targetpath, TINYTARGETS)
+    alset.alignmentpath.parent.mkdir(parents=True, exist_ok=True)
+    alignments = {"meta": {"creator": "GrapeCity"}, "type": "translation", "records": TINYRECORDS}
+    alset.alignmentpath.write_text(json.dumps(alignments, ensure_ascii=False, indent=2), encoding="utf-8")
+    return alset
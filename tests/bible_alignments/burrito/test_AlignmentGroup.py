@@ -207,6 +207,39 @@ class TestAlignmentRecord:
         """Test source_selectors and source_bcv."""
         assert record.source_selectors == ["n41004003001", "n41004003002"]
         assert record.source_bcv == "41004003"
+        assert record.source_verses == ("41004003",)
+
+    def test_source_verses(self, recordmeta: Metadata, reference_bsb: AlignmentReference) -> None:
+        """Test source_bcv and source_verses for records across verses, and with invalid selectors."""
+
+        def _record(selectors: list[str]) -> AlignmentRecord:
+            """Return a record with selectors for the source."""
+            return AlignmentRecord(
+                meta=recordmeta,
+                references={
+                    "source": AlignmentReference(document=Document(docid="SBLGNT"), selectors=selectors),
+                    "target": reference_bsb,
+                },
+            )
+
+        alrec = _record(["n41004003002", "n41004004001", "n41004003001", "n41004004002"])
+        assert alrec.source_bcv == "41004003"
+        assert alrec.source_verses == ("41004003", "41004004")
+        # not computed when made: the error is raised when used, as before
+        alrec = _record(["n41004003001", "MISSING"])
+        assert alrec._source_bcv is None
+        with pytest.raises(AssertionError):
+            alrec.source_bcv
+        alrec = _record([])
+        assert alrec.source_bcv == ""
+        assert alrec.source_verses == ()
+
+    def test_selectors(self, record: AlignmentRecord) -> None:
+        """Test selectors are the lists in the references, not copies."""
+        sources, targets = record.selectors
+        assert sources == ["n41004003001", "n41004003002"]
+        assert sources is record.references["source"].selectors
+        assert targets is record.references["target"].selectors
 
     def test_asdict_positional(self, record: AlignmentRecord) -> None:
         """Test asdict()."""
@@ -252,3 +285,19 @@ class TestAlignmentGroup:
         assert len(recdict) == 3
         for k in ["meta", "type", "records"]:
             assert k in recdict
+
+    def test_verserecords(self, group: AlignmentGroup, recordmeta: Metadata, reference_bsb: AlignmentReference) -> None:
+        """Test verserecords() with records that aren't sorted by BCV."""
+        for selector in ["n41004004001", "n41004003003"]:
+            group.records.append(
+                AlignmentRecord(
+                    meta=recordmeta,
+                    references={
+                        "source": AlignmentReference(document=Document(docid="SBLGNT"), selectors=[selector]),
+                        "target": reference_bsb,
+                    },
+                )
+            )
+        verserecords = group.verserecords()
+        assert list(verserecords) == ["41004003", "41004004"]
+        assert verserecords["41004003"] == [group.records[0], group.records[2]]
@@ -0,0 +1,112 @@
+"""Test code in burrito.BadRecord."""
+
+import random
+from typing import Optional
+
+import pytest
+
+from bible_alignments.burrito import AlignmentRecord, AlignmentReference, AlignmentSet, Document, Manager, Metadata
+from bible_alignments.burrito.BadRecord import BadRecord, Reason, count_reasons, find_badrecords
+
+SOURCEITEMS = {f"41004003{word:03d}1" for word in range(1, 6)}
+TARGETITEMS = {f"41004003{word:03d}" for word in range(1, 6)}
+
+
+def _record(identifier: str, sources: list[str], targets: list[str]) -> AlignmentRecord:
+    """Return an AlignmentRecord with sources and targets."""
+    return AlignmentRecord(
+        meta=Metadata(id=identifier),
+        references={
+            "source": AlignmentReference(document=Document(docid="SBLGNT"), selectors=sources),
+            "target": AlignmentReference(document=Document(docid="BSB"), selectors=targets),
+        },
+    )
+
+
+def _bad_reason(arec: AlignmentRecord) -> Optional[BadRecord]:
+    """Return a BadRecord for arec, checking one record at a time as Manager did."""
+    sources, targets = arec.source_selectors, arec.target_selectors
+    badrecdict = {"identifier": arec.identifier, "record": arec}
+    if not sources:
+        return BadRecord(**badrecdict, reason=Reason.NOSOURCE)
+    elif "" in sources:
+        return BadRecord(**badrecdict, reason=Reason.EMPTYSOURCE)
+    elif not targets:
+        return BadRecord(**badrecdict, reason=Reason.NOTARGET)
+    elif "" in targets:
+        return BadRecord(**badrecdict, reason=Reason.EMPTYTARGET)
+    elif any(tok not in SOURCEITEMS for tok in sources):
+        return BadRecord(**badrecdict, reason=Reason.MISSINGSOURCE, data=[t for t in sources if t not in SOURCEITEMS])
+    elif any(tok not in TARGETITEMS for tok in targets):
+        missing = [tok for tok in targets if tok not in TARGETITEMS]
+        reason = Reason.MISSINGTARGETSOME if set(targets).symmetric_difference(missing) else Reason.MISSINGTARGETALL
+        return BadRecord(**badrecdict, reason=reason, data=missing)
+    else:
+        return None
+
+
+class TestFindBadRecords:
+    """Test find_badrecords() and count_reasons()."""
+
+    def test_reasons(self) -> None:
+        """Test each reason."""
+        records = {
+            "good": _record("good", ["410040030011"], ["41004003001", "41004003002"]),
+            "nosource": _record("nosource", [], ["41004003001"]),
+            "emptysource": _record("emptysource", ["410040030011", ""], []),
+            "notarget": _record("notarget", ["410040030011"], []),
+            "emptytarget": _record("emptytarget", ["410040030099"], ["", "41004003001"]),
+            "missingsource": _record("missingsource", ["410040030099", "410040030011", "410040030098"], ["x"]),
+            "missingsome": _record("missingsome", ["410040030011"], ["41004003001", "41004003099"]),
+            "missingall": _record("missingall", ["410040030011"], ["41004003099", "41004003099"]),
+        }
+        badrecords = find_badrecords(records, SOURCEITEMS, TARGETITEMS)
+        assert {recid: badrec.reason for recid, badrec in badrecords.items()} == {
+            "nosource": Reason.NOSOURCE,
+            "emptysource": Reason.EMPTYSOURCE,
+            "notarget": Reason.NOTARGET,
+            "emptytarget": Reason.EMPTYTARGET,
+            "missingsource": Reason.MISSINGSOURCE,
+            "missingsome": Reason.MISSINGTARGETSOME,
+            "missingall": Reason.MISSINGTARGETALL,
+        }
+        # selectors are sorted
+        assert badrecords["missingsource"].data == ["410040030098", "410040030099"]
+        assert badrecords["missingall"].data == ["41004003099", "41004003099"]
+        assert badrecords["nosource"].data == ()
+        assert badrecords["nosource"].record is records["nosource"]
+        assert count_reasons(badrecords) == {reason: 1 for reason in Reason if reason != Reason.UNKNOWN}
+
+    def test_random(self) -> None:
+        """Test random records give the same results as checking one at a time."""
+        rng = random.Random(1)
+        sources = ["", "410040030099", *sorted(SOURCEITEMS)]
+        targets = ["", "41004003099", *sorted(TARGETITEMS)]
+        records = {
+            f"{index:03d}": _record(
+                f"{index:03d}",
+                rng.choices(sources, weights=[1, 1] + [10] * 5, k=rng.randint(0, 3)),
+                rng.choices(targets, weights=[1, 2] + [10] * 5, k=rng.randint(0, 3)),
+            )
+            for index in range(500)
+        }
+        expected = {recid: badrec for recid, arec in records.items() if (badrec := _bad_reason(arec))}
+        assert find_badrecords(records, SOURCEITEMS, TARGETITEMS) == expected
+        assert len(count_reasons(expected)) == 7
+
+    def test_empty(self) -> None:
+        """Test no records."""
+        assert find_badrecords({}, SOURCEITEMS, TARGETITEMS) == {}
+        assert count_reasons({}) == {}
+
+
+class TestManager:
+    """Test bad records from Manager."""
+
+    def test_badrecords(self, tinyset: AlignmentSet, capsys: pytest.CaptureFixture) -> None:
+        """Test the bad record and report."""
+        mgr = Manager(tinyset)
+        assert list(mgr.badrecords) == ["41004004.003"]
+        assert mgr._bad_reason(mgr.badrecords["41004004.003"].record) == mgr.badrecords["41004004.003"]
+        assert mgr._bad_reason(mgr.alignmentrecords["41004004.002"]) is None
+        assert f"{Reason.MISSINGTARGETALL.value}\t1" in capsys.readouterr().out
@@ -7,7 +7,7 @@ test files: this only tests common functionality.
 
 import pytest
 
-from bible_alignments.burrito import BaseToken, asbool, bare_id
+from bible_alignments.burrito import AlignmentSet, BaseToken, SourceReader, TargetReader, asbool, bare_id, bcv_from_id
 
 
 @pytest.fixture
@@ -44,6 +44,45 @@ class TestBaseToken:
         assert BaseToken(id="n410040090051", text="ὦτα").isempty is False
         assert BaseToken(id="n410040090051", text="").isempty is True
 
+    def test_bcv(self, mrk_4_9_4: BaseToken) -> None:
+        """Test bcv is cached, but follows changes to id."""
+        assert mrk_4_9_4.bcv == "41004009"
+        assert mrk_4_9_4.bcvint == 41004009
+        assert mrk_4_9_4._bcv == "41004009"
+        mrk_4_9_4.id = "410040100011"
+        assert mrk_4_9_4.bcv == "41004010"
+        assert BaseToken(id="410040090051", text="").bcvint < BaseToken(id="410040100011", text="").bcvint
+
+    def test_slots(self, mrk_4_9_4: BaseToken) -> None:
+        """Test tokens have slots, not a __dict__."""
+        assert not hasattr(mrk_4_9_4, "__dict__")
+        with pytest.raises(AttributeError):
+            mrk_4_9_4.notafield = True
+        fromcolumns = BaseToken._fromcolumns({"id": ["410040090051"], "text": ["ὦτα"], "altId": ["ὦτα-1"]})
+        assert fromcolumns == [mrk_4_9_4]
+
+    def test_intern(self, tinyset: AlignmentSet) -> None:
+        """Test interning categorical fields."""
+        sources = SourceReader(tinyset.sourcepath, intern=True)
+        assert sources["41004003001"].pos is sources["41004003003"].pos
+        targets = TargetReader(tinyset.targetpath, intern=True)
+        assert targets["41004003001"].source_verse is targets["41004003005"].source_verse
+
+
+class TestBcvFromId:
+    """Test bcv_from_id()."""
+
+    def test_values(self) -> None:
+        """Test valid and invalid identifiers."""
+        assert bcv_from_id("n41004009005") == "41004009"
+        assert bcv_from_id("410040090051") == "41004009"
+        assert bcv_from_id("o010010010011") == "01001001"
+        # validated like bcvwpid.to_bcv()
+        with pytest.raises(AssertionError):
+            bcv_from_id("n01001001001")
+        with pytest.raises(AssertionError):
+            bcv_from_id("4100400900")
+
 
 class TestAsbool:
     """Test asbool()."""
@@ -0,0 +1,59 @@
+"""Test code in burrito.VerseData."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bible_alignments.burrito import AlignmentSet, Manager, VerseData
+from bible_alignments.burrito.VerseData import alignment_matrices
+
+
+@pytest.fixture
+def mgr(tinyset: AlignmentSet) -> Manager:
+    """Return a Manager for tinyset."""
+    return Manager(tinyset)
+
+
+def _dataframe(vd: VerseData, hitmark: str = "-G-", missmark: str = "  ") -> pd.DataFrame:
+    """Return a DataFrame for vd, checking each source and target as VerseData.dataframe() did."""
+    target_sources = {trg: alpair[0] for alpair in vd.alignments for trg in alpair[1]}
+    dfdata = {
+        textdisplay: [(hitmark if (src in target_sources.get(trg, {})) else missmark) for src in vd.sources]
+        for (trg, textdisplay) in zip(vd.targets, vd.get_texts("targets", unique=True))
+    }
+    return pd.DataFrame(dfdata, index=[src.text for src in vd.sources])
+
+
+class TestMatrix:
+    """Test VerseData.matrix() and alignment_matrices()."""
+
+    def test_matrix(self, mgr: Manager) -> None:
+        """Test the alignments for a verse."""
+        matrix = mgr["41004003"].matrix()
+        assert matrix.dtype == bool
+        # Listen ! Behold went out
+        assert matrix.astype(int).tolist() == [[1, 0, 0, 0, 0], [0, 0, 1, 0, 0], [0, 0, 0, 1, 1]]
+
+    def test_ignored(self, mgr: Manager) -> None:
+        """Test tokens that aren't in the verse are ignored."""
+        vd = mgr["41004004"]
+        alignments = [*vd.alignments, *mgr["41004003"].alignments]
+        other = VerseData(bcvid=vd.bcvid, alignments=alignments, sources=vd.sources, targets=vd.targets)
+        assert np.array_equal(other.matrix(), vd.matrix())
+        assert not VerseData(bcvid="41004004", alignments=[], sources=vd.sources, targets=[]).matrix().size
+
+    def test_dataframe(self, mgr: Manager) -> None:
+        """Test DataFrames are the same as when checking each source and target."""
+        for vd in mgr.values():
+            pd.testing.assert_frame_equal(vd.dataframe(), _dataframe(vd), check_dtype=False)
+        assert mgr["41004003"].dataframe(hitmark="x").loc["ἐξῆλθεν", "out"] == "x"
+
+    def test_bulk(self, mgr: Manager) -> None:
+        """Test matrices for a chapter are the same as for each verse."""
+        matrices = mgr.alignment_matrices("41004")
+        assert list(matrices) == ["41004003", "41004004"]
+        for bcvid, matrix in matrices.items():
+            assert np.array_equal(matrix, mgr[bcvid].matrix())
+        assert list(mgr.alignment_matrices("41004004")) == ["41004004"]
+        assert mgr.alignment_matrices("42") == {}
+        assert alignment_matrices([]) == {}
@@ -1,8 +1,12 @@
 """Test AlignmentsReader."""
 
+import json
+from pathlib import Path
+
 import pytest
 
 from bible_alignments.burrito import DATAPATH, AlignmentSet, AlignmentsReader, AlignmentRecord
+from bible_alignments.burrito.alignments import _JSONStream
 
 # test internal version
 ENGLANGDATAPATH = DATAPATH.parent.parent / "alignments-eng/data"
@@ -35,3 +39,114 @@ class TestAlignmentsReader:
         assert alrec["41004003.001"].asdict()["source"] == ["n41004003001", "n41004003002"]
         assert alrec["41004003.001"].meta.id == "41004003.001"
         assert alrec["41004003.001"].identifier == "41004003.001"
+
+
+ALIGNMENTDATA = {
+    "meta": {"creator": "GrapeCity", "conformsTo": "0.3"},
+    "type": "translation",
+    "records": [
+        {
+            "meta": {"id": "41004003.001", "origin": "manual"},
+            "source": ["n41004003001", "n41004003002"],
+            "target": ["410040030021"],
+        },
+        {"meta": {"id": "41004003.002", "process": "manual"}, "source": ["n41004003003"], "target": ["410040030051"]},
+    ],
+}
+
+
+@pytest.fixture
+def localset(tmp_path: Path) -> AlignmentSet:
+    """Return an AlignmentSet with a small alignments file."""
+    alset = AlignmentSet(sourceid="SBLGNT", targetid="BSB", targetlanguage="eng", langdatapath=tmp_path)
+    alset.alignmentpath.parent.mkdir(parents=True)
+    alset.alignmentpath.write_text(json.dumps(ALIGNMENTDATA, indent=2, ensure_ascii=False), encoding="utf-8")
+    return alset
+
+
+class TestStreamingAlignmentsReader:
+    """Test incremental reading in AlignmentsReader()."""
+
+    def test_read(self, localset: AlignmentSet) -> None:
+        """Test reading the whole group."""
+        algroup = AlignmentsReader(localset).alignmentgroup
+        assert len(algroup.records) == 2
+        assert algroup.meta.creator == "GrapeCity"
+        assert algroup.records[0].source_selectors == ["41004003001", "41004003002"]
+        assert algroup.records[0].target_selectors == ["41004003002"]
+        # upgrade patch
+        assert algroup.records[1].meta.origin == "manual"
+
+    def test_lazy(self, localset: AlignmentSet) -> None:
+        """Test the group is only read when needed."""
+        alreader = AlignmentsReader(localset, lazy=True)
+        assert alreader._alignmentgroup is None
+        assert alreader.meta is None
+        assert [rec.identifier for rec in alreader.iter_records()] == ["41004003.001", "41004003.002"]
+        assert alreader.meta.creator == "GrapeCity"
+        assert len(alreader.alignmentgroup.records) == 2
+
+    def test_record_index(self, localset: AlignmentSet, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test reading the records for a verse from their positions in the file."""
+        # non-ASCII text and a byte order mark shift the byte positions
+        firstrecord = {**ALIGNMENTDATA["records"][0], "meta": {"id": "41004003.001", "origin": "ἰδοὺ"}}
+        alignmentdata = {
+            **ALIGNMENTDATA,
+            "meta": {"creator": "Ἀκούετε"},
+            "records": [firstrecord, ALIGNMENTDATA["records"][1]],
+        }
+        localset.alignmentpath.write_text(json.dumps(alignmentdata, ensure_ascii=False), encoding="utf-8-sig")
+        algroup = AlignmentsReader(localset).alignmentgroup
+        recordindex = AlignmentsReader(localset, lazy=True).record_index(cachedir=tmp_path / "cache")
+        assert list(recordindex) == ["41004003"]
+        records = recordindex["41004003"]
+        assert [rec.asdict(withmeta=True) for rec in records] == [rec.asdict(withmeta=True) for rec in algroup.records]
+        assert records[0].meta.origin == "ἰδοὺ"
+        # JSON Lines
+        jsonlpath = tmp_path / "alignments.jsonl"
+        algroup.write_jsonl(jsonlpath)
+        records = AlignmentsReader(localset, lazy=True, alignmentpath=jsonlpath).record_index()["41004003"]
+        assert [rec.asdict(withmeta=True) for rec in records] == [rec.asdict(withmeta=True) for rec in algroup.records]
+        # an unchanged file isn't read again
+        monkeypatch.setattr(AlignmentsReader, "_iter_spans", None)
+        recordindex = AlignmentsReader(localset, lazy=True).record_index(cachedir=tmp_path / "cache")
+        assert [rec.identifier for rec in recordindex["41004003"]] == ["41004003.001", "41004003.002"]
+
+    def test_record_index_reads(self, localset: AlignmentSet, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the records for a verse are read with one open file, whether or not they're adjacent."""
+        # a long record for another verse between the two for 41004003
+        between = {"meta": {"id": "41004004.001"}, "source": ["n41004004001"], "target": ["410040040011"] * 100}
+        records = [ALIGNMENTDATA["records"][0], between, ALIGNMENTDATA["records"][1]]
+        alignmentdata = {**ALIGNMENTDATA, "records": records}
+        localset.alignmentpath.write_text(json.dumps(alignmentdata), encoding="utf-8")
+        recordindex = AlignmentsReader(localset, lazy=True).record_index()
+        opens = []
+        pathopen = Path.open
+        monkeypatch.setattr(Path, "open", lambda path, *args, **kw: opens.append(path) or pathopen(path, *args, **kw))
+        assert [rec.identifier for rec in recordindex["41004003"]] == ["41004003.001", "41004003.002"]
+        assert len(opens) == 1
+        assert [rec.identifier for rec in recordindex["41004004"]] == ["41004004.001"]
+        assert len(opens) == 2
+
+    def test_small_chunks(self, localset: AlignmentSet) -> None:
+        """Test values split across many chunks."""
+        with localset.alignmentpath.open(encoding="utf-8") as f:
+            items = list(_JSONStream(f, chunksize=5).items(arraykey="records"))
+        assert [key for key, _ in items] == ["meta", "type", "records", "records"]
+        assert [value for _, value in items[2:]] == ALIGNMENTDATA["records"]
+
+    def test_list(self, localset: AlignmentSet) -> None:
+        """Test failing on an unconverted list of records."""
+        localset.alignmentpath.write_text(json.dumps(ALIGNMENTDATA["records"]), encoding="utf-8")
+        with pytest.raises(ValueError):
+            AlignmentsReader(localset)
+
+    def test_jsonl(self, localset: AlignmentSet, tmp_path: Path) -> None:
+        """Test writing and reading JSON Lines."""
+        algroup = AlignmentsReader(localset).alignmentgroup
+        jsonlpath = tmp_path / "alignments.jsonl"
+        algroup.write_jsonl(jsonlpath)
+        assert len(jsonlpath.read_text(encoding="utf-8").splitlines()) == 3
+        jsonlgroup = AlignmentsReader(localset, alignmentpath=jsonlpath).alignmentgroup
+        assert jsonlgroup.meta.creator == "GrapeCity"
+        assert [rec.asdict() for rec in jsonlgroup.records] == [rec.asdict() for rec in algroup.records]
@@ -0,0 +1,112 @@
+"""Test code in burrito.columnar, and cached reading of source data."""
+
+from pathlib import Path
+
+import pytest
+
+from bible_alignments.burrito import SourceReader
+from bible_alignments.burrito import columnar
+from bible_alignments.burrito.columnar import StringTable, cache_path, load_columns, save_columns
+
+SOURCEROWS = [
+    ("id", "altId", "text", "strongs", "gloss", "gloss2", "lemma", "pos", "morph"),
+    ("n41004003001", "Ἀκούετε-1", "Ἀκούετε", "0191", "Listen", "listen", "ἀκούω", "verb", "V-PAM-2P"),
+    ("n41004003002", "ἰδοὺ-1", "ἰδοὺ", "2400", "Behold", "behold", "ἰδού", "intj", "I"),
+    ("n41004003003", "ἐξῆλθεν-1", "ἐξῆλθεν", "1831", "went out", "went out", "ἐξέρχομαι", "verb", "V-2AAI-3S"),
+]
+
+
+@pytest.fixture
+def sourcepath(tmp_path: Path) -> Path:
+    """Return the path to a small source TSV file."""
+    tsvpath = tmp_path / "SBLGNT.tsv"
+    tsvpath.write_text("".join("\t".join(row) + "\n" for row in SOURCEROWS), encoding="utf-8")
+    return tsvpath
+
+
+class TestStringTable:
+    """Test StringTable()."""
+
+    def test_indexes(self) -> None:
+        """Test indexes()."""
+        strtable = StringTable()
+        assert strtable.indexes(["noun", "verb", "noun"]).tolist() == [0, 1, 0]
+        assert strtable.index("adj") == 2
+        assert len(strtable) == 3
+
+    def test_buffers(self) -> None:
+        """Test round-tripping through buffers."""
+        strtable = StringTable(["", "ἀκούω", "verb"])
+        buffer, offsets = strtable.tobuffers()
+        assert offsets.tolist() == [0, 0, len("ἀκούω".encode("utf-8")), len("ἀκούωverb".encode("utf-8"))]
+        assert StringTable.frombuffers(buffer, offsets).strings == ["", "ἀκούω", "verb"]
+
+
+class TestColumns:
+    """Test save_columns() and load_columns()."""
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        """Test saving and loading columns."""
+        columns = {"pos": ["noun", "verb", "noun"], "lemma": ["λόγος", "λέγω", "λόγος"]}
+        save_columns(tmp_path / "cols.npz", columns, meta={"note": "test"})
+        loaded, meta = load_columns(tmp_path / "cols.npz")
+        assert loaded == columns
+        assert meta["note"] == "test"
+
+    def test_cache_path(self, sourcepath: Path, tmp_path: Path) -> None:
+        """Test cache_path() changes with content."""
+        firstpath = cache_path(tmp_path, sourcepath, kind="source")
+        assert firstpath.name.startswith("SBLGNT-")
+        assert "-source-v" in firstpath.name
+        with sourcepath.open("a", encoding="utf-8") as f:
+            f.write("\t".join(SOURCEROWS[1]) + "\n")
+        assert cache_path(tmp_path, sourcepath, kind="source") != firstpath
+
+
+class TestSourceReaderCache:
+    """Test SourceReader() with a cache directory."""
+
+    def test_cache(self, sourcepath: Path, tmp_path: Path) -> None:
+        """Test the cache is written, then read back identically."""
+        cachedir = tmp_path / "cache"
+        uncached = SourceReader(sourcepath)
+        written = SourceReader(sourcepath, cachedir=cachedir)
+        assert written.cachepath.exists()
+        cached = SourceReader(sourcepath, cachedir=cachedir)
+        assert list(cached) == list(uncached) == ["41004003001", "41004003002", "41004003003"]
+        assert list(cached.values()) == list(uncached.values())
+        assert cached["41004003001"].strong == "G0191"
+        assert cached["41004003001"].maculaid == "n41004003001"
+
+    def test_stale(self, sourcepath: Path, tmp_path: Path) -> None:
+        """Test a changed source file replaces the old cache."""
+        cachedir = tmp_path / "cache"
+        oldpath = SourceReader(sourcepath, cachedir=cachedir).cachepath
+        with sourcepath.open("a", encoding="utf-8") as f:
+            f.write("\t".join(("n41004003004", "ὁ-1", "ὁ", "3588", "the", "the", "ὁ", "det", "T-NSM")) + "\n")
+        newreader = SourceReader(sourcepath, cachedir=cachedir)
+        assert len(newreader) == 4
+        assert not oldpath.exists()
+        assert list(cachedir.iterdir()) == [newreader.cachepath]
+
+    def test_same_name(self, sourcepath: Path, tmp_path: Path) -> None:
+        """Test files with the same name in different directories don't remove each other's caches."""
+        cachedir = tmp_path / "cache"
+        otherpath = tmp_path / "other" / sourcepath.name
+        otherpath.parent.mkdir()
+        otherpath.write_text(sourcepath.read_text(encoding="utf-8") + "\t".join(SOURCEROWS[1]) + "\n", encoding="utf-8")
+        first = SourceReader(sourcepath, cachedir=cachedir).cachepath
+        other = SourceReader(otherpath, cachedir=cachedir).cachepath
+        assert first != other
+        assert sorted(cachedir.iterdir()) == sorted([first, other])
+        assert SourceReader(sourcepath, cachedir=cachedir).cachepath == first
+        assert other.exists()
+
+    def test_normalization(self, sourcepath: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a new normalization version replaces caches for unchanged files."""
+        cachedir = tmp_path / "cache"
+        oldpath = SourceReader(sourcepath, cachedir=cachedir).cachepath
+        monkeypatch.setattr(columnar, "NORMALIZATION_VERSION", columnar.NORMALIZATION_VERSION + 1)
+        newpath = SourceReader(sourcepath, cachedir=cachedir).cachepath
+        assert newpath != oldpath
+        assert list(cachedir.iterdir()) == [newpath]
@@ -0,0 +1,133 @@
+"""Test code in burrito.database."""
+
+from pathlib import Path
+import shutil
+
+import pytest
+
+from bible_alignments.burrito import AlignmentSet, Manager
+from bible_alignments.burrito.BadRecord import Reason
+from bible_alignments.burrito.database import AlignmentDatabase, StoredManager
+
+
+@pytest.fixture
+def mgr(tinyset: AlignmentSet) -> Manager:
+    """Return a Manager for tinyset."""
+    return Manager(tinyset)
+
+
+@pytest.fixture
+def db(tinyset: AlignmentSet, tmp_path: Path) -> AlignmentDatabase:
+    """Return an AlignmentDatabase with tinyset added."""
+    database = AlignmentDatabase(tmp_path / "alignments.db")
+    database.add_alignmentset(tinyset)
+    return database
+
+
+@pytest.fixture
+def stored(db: AlignmentDatabase, tinyset: AlignmentSet) -> StoredManager:
+    """Return the StoredManager for tinyset."""
+    return db[tinyset.identifier]
+
+
+class TestAlignmentDatabase:
+    """Test AlignmentDatabase."""
+
+    def test_add(self, db: AlignmentDatabase, tinyset: AlignmentSet) -> None:
+        """Test adding an alignment set."""
+        assert list(db) == ["SBLGNT-BSB-manual"]
+        assert "SBLGNT-BSB-manual" in db
+        # unchanged, so not read again
+        assert not db.add_alignmentset(tinyset)
+        assert db.add_alignmentset(tinyset, force=True)
+        assert len(db) == 1
+
+    def test_shared_sources(self, db: AlignmentDatabase, tinyset: AlignmentSet) -> None:
+        """Test alignment sets with the same source file share source tokens."""
+        other = AlignmentSet(
+            sourceid="SBLGNT",
+            targetid="YLT",
+            targetlanguage="eng",
+            sourcedatapath=tinyset.sourcedatapath,
+            langdatapath=tinyset.langdatapath,
+        )
+        for srcpath, dstpath in ((tinyset.targetpath, other.targetpath), (tinyset.alignmentpath, other.alignmentpath)):
+            dstpath.parent.mkdir(parents=True)
+            shutil.copy(srcpath, dstpath)
+        assert db.add_alignmentset(other)
+        assert list(db) == ["SBLGNT-BSB-manual", "SBLGNT-YLT-manual"]
+        assert db.conn.execute("SELECT count(*) FROM sources").fetchone()[0] == 5
+        assert list(db["SBLGNT-YLT-manual"]) == ["41004003", "41004004"]
+
+    def test_delete(self, db: AlignmentDatabase) -> None:
+        """Test deleting an alignment set."""
+        db.delete("SBLGNT-BSB-manual")
+        assert len(db) == 0
+        with pytest.raises(KeyError):
+            db["SBLGNT-BSB-manual"]
+        assert db.conn.execute("SELECT count(*) FROM records").fetchone()[0] == 0
+
+    def test_reopen(self, db: AlignmentDatabase) -> None:
+        """Test data persists."""
+        db.close()
+        reopened = AlignmentDatabase(db.dbpath)
+        assert len(reopened["SBLGNT-BSB-manual"].alignmentrecords) == 5
+
+
+class TestStoredManager:
+    """Test StoredManager against Manager."""
+
+    def test_verses(self, stored: StoredManager, mgr: Manager) -> None:
+        """Test VerseData instances."""
+        assert list(stored) == list(mgr)
+        assert len(stored) == 2
+        assert "41004003" in stored
+        assert "41004005" not in stored
+        for bcvid in mgr:
+            assert stored[bcvid].alignments == mgr[bcvid].alignments
+            assert stored[bcvid].sources == mgr[bcvid].sources
+            assert stored[bcvid].targets == mgr[bcvid].targets
+        with pytest.raises(KeyError):
+            stored["41004005"]
+
+    def test_items(self, stored: StoredManager, mgr: Manager) -> None:
+        """Test token and record mappings."""
+        assert dict(stored.sourceitems) == dict(mgr.sourceitems)
+        assert dict(stored.targetitems) == dict(mgr.targetitems)
+        assert stored.targetitems["41004003001"].skip_space_after is True
+        assert dict(stored.alignmentrecords) == mgr.alignmentrecords
+        assert stored.targetitems.get_many(["41004004001", "41004009001", "41004003002"]) == {
+            "41004004001": mgr.targetitems["41004004001"],
+            "41004003002": mgr.targetitems["41004003002"],
+        }
+
+    def test_badrecords(self, stored: StoredManager, mgr: Manager) -> None:
+        """Test bad records are stored with their reasons."""
+        assert list(stored.badrecords) == ["41004004.003"]
+        badrec = stored.badrecords["41004004.003"]
+        assert badrec.reason == Reason.MISSINGTARGETALL
+        assert badrec.data == ["41004004009"]
+        assert badrec.record == mgr.badrecords["41004004.003"].record
+
+    def test_token_records(self, stored: StoredManager, mgr: Manager) -> None:
+        """Test finding records by token identifiers."""
+        for tokenids, role in ((["41004004002", "41004003001"], "source"), (["41004003005"], "target")):
+            assert stored.token_records(tokenids, role=role) == mgr.token_records(tokenids, role=role)
+        assert stored.token_records(["41004009001"]) == []
+
+    def test_token_alignments(self, stored: StoredManager, mgr: Manager) -> None:
+        """Test finding records by token attributes."""
+        for term, kwargs in (
+            ("verb", {"tokenattr": "pos"}),
+            ("G2532", {"tokenattr": "strong"}),
+            ("γίνομαι", {"tokenattr": "lemma"}),
+            ("and", {"role": "target", "lowercase": True}),
+            ("ΚΑῚ", {"lowercase": True}),
+        ):
+            assert stored.token_alignments(term, **kwargs) == mgr.token_alignments(term, **kwargs), term
+        assert [rec.identifier for rec in stored.token_alignments("verb", tokenattr="pos")] == [
+            "41004003.001",
+            "41004003.003",
+            "41004004.002",
+        ]
+        assert stored.sourceitems.term_tokens("ΚΑῚ", lowercase=True) == [mgr.sourceitems["41004004001"]]
@@ -0,0 +1,46 @@
+"""Test code in burrito.loader."""
+
+import shutil
+
+from bible_alignments.burrito import AlignmentSet
+from bible_alignments.burrito.loader import load_managers
+
+
+class TestLoadManagers:
+    """Test load_managers()."""
+
+    def test_load(self, tinyset: AlignmentSet) -> None:
+        """Test loading two alignment sets that share a source."""
+        # copy tinyset to a second target
+        other = AlignmentSet(
+            sourceid="SBLGNT",
+            targetid="YLT",
+            targetlanguage="eng",
+            sourcedatapath=tinyset.sourcedatapath,
+            langdatapath=tinyset.langdatapath,
+        )
+        for srcpath, dstpath in ((tinyset.targetpath, other.targetpath), (tinyset.alignmentpath, other.alignmentpath)):
+            dstpath.parent.mkdir(parents=True)
+            shutil.copy(srcpath, dstpath)
+        missing = AlignmentSet(
+            sourceid="SBLGNT",
+            targetid="NONE",
+            targetlanguage="eng",
+            sourcedatapath=tinyset.sourcedatapath,
+            langdatapath=tinyset.langdatapath,
+        )
+        results = load_managers([tinyset, other, missing], processes=2)
+        assert [result.alignmentset for result in results] == [tinyset, other, missing]
+        assert results[0].summary == {"sources": 5, "targets": 8, "records": 5, "badrecords": 1, "verses": 2}
+        assert results[1].summary == results[0].summary
+        assert list(results[1].manager) == ["41004003", "41004004"]
+        assert results[0].sourceseconds == results[1].sourceseconds > 0
+        assert results[2].manager is None
+        assert "FileNotFoundError" in results[2].error
+
+    def test_summaries(self, tinyset: AlignmentSet) -> None:
+        """Test returning only summaries."""
+        (result,) = load_managers([tinyset], keep=False, processes=1)
+        assert result.manager is None
+        assert result.summary["records"] == 5
+        assert result.seconds > 0
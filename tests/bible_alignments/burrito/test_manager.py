@@ -1,5 +1,7 @@
 """Test manager.py and local imports."""
 
+from pathlib import Path
+
 import pytest
 
 from bible_alignments.burrito import DATAPATH, AlignmentSet, Manager, VerseData
@@ -70,4 +72,88 @@ class TestWLCMManager:
         assert self.alset.targetid == "BSB"
 
 
+class TestLazyManager:
+    """Test Manager() with lazy=True."""
+
+    def test_lookup(self, tinyset: AlignmentSet) -> None:
+        """Test VerseData instances are made on demand, and match eager ones."""
+        eager = Manager(tinyset)
+        lazy = Manager(tinyset, lazy=True)
+        assert lazy.bcv["versedata"]._cache == {}
+        assert list(lazy) == list(eager) == ["41004003", "41004004"]
+        vd43 = lazy["41004003"]
+        assert vd43.bcvid == "41004003"
+        assert vd43.get_texts() == eager["41004003"].get_texts() == ["Listen", "!", "Behold", "went", "out"]
+        assert vd43.alignments == eager["41004003"].alignments
+        assert "41004005" not in lazy
+        with pytest.raises(KeyError):
+            lazy["41004005"]
+
+    def test_cachesize(self, tinyset: AlignmentSet) -> None:
+        """Test the least recently used VerseData is dropped."""
+        lazy = Manager(tinyset, lazy=True, cachesize=1)
+        vd43 = lazy["41004003"]
+        assert lazy["41004003"] is vd43
+        lazy["41004004"]
+        assert list(lazy.bcv["versedata"]._cache) == ["41004004"]
+        assert lazy["41004003"] is not vd43
+
+    def test_groups(self, tinyset: AlignmentSet) -> None:
+        """Test BCV groupings."""
+        lazy = Manager(tinyset, lazy=True)
+        assert [tok.id for tok in lazy.bcv["sources"]["41004004"]] == ["41004004001", "41004004002"]
+        assert len(lazy.bcv["target_sourceverses"]["41004004"]) == 3
+        # not checked until the verse is made
+        assert [rec.identifier for rec in lazy.bcv["records"]["41004004"]] == [
+            "41004004.001",
+            "41004004.002",
+            "41004004.003",
+        ]
+
+    def test_badrecords(self, tinyset: AlignmentSet, tmp_path: Path) -> None:
+        """Test records are read and checked for each verse as it's made."""
+        eager = Manager(tinyset)
+        lazy = Manager(tinyset, lazy=True, cachedir=tmp_path)
+        assert lazy._alignmentrecords is None
+        assert lazy["41004003"].alignments == eager["41004003"].alignments
+        assert lazy.badrecords == {}
+        assert lazy["41004004"].alignments == eager["41004004"].alignments
+        assert list(lazy.badrecords) == ["41004004.003"]
+        # all the records are read and checked when needed
+        assert list(lazy.alignmentrecords) == list(eager.alignmentrecords)
+        assert len(lazy.alignmentgroup.records) == 5
+        # positions are read from the cache
+        lazy = Manager(tinyset, lazy=True, cachedir=tmp_path, keepbadrecords=True)
+        assert len(lazy["41004004"].alignments) == 2
+        assert list(lazy.badrecords) == ["41004004.003"]
+
+
+class TestTokenRecords:
+    """Test Manager.token_records() and token_alignments()."""
+
+    def test_token_records(self, tinyset: AlignmentSet) -> None:
+        """Test finding records by token identifiers."""
+        mgr = Manager(tinyset)
+        records = mgr.token_records(["41004004002", "41004003001"])
+        assert [rec.identifier for rec in records] == ["41004003.001", "41004004.002"]
+        records = mgr.token_records(["41004003005"], role="target")
+        assert [rec.identifier for rec in records] == ["41004003.003"]
+        assert mgr.token_records(["41004009001"]) == []
+
+    def test_token_alignments(self, tinyset: AlignmentSet) -> None:
+        """Test finding records by token attributes."""
+        mgr = Manager(tinyset)
+        records = mgr.token_alignments("verb", tokenattr="pos")
+        assert [rec.identifier for rec in records] == ["41004003.001", "41004003.003", "41004004.002"]
+        records = mgr.token_alignments("and", role="target", lowercase=True)
+        assert [rec.identifier for rec in records] == ["41004004.001"]
+
+    def test_replaced_records(self, tinyset: AlignmentSet) -> None:
+        """Test the index follows replaced records."""
+        mgr = Manager(tinyset)
+        assert len(mgr.token_records(["41004003001"])) == 1
+        mgr.alignmentgroup.records = mgr.alignmentgroup.records[1:]
+        assert mgr.token_records(["41004003001"]) == []
+
+
 # Should add tests for Reason/BadRecord
@@ -0,0 +1,100 @@
+"""Test code in burrito.parquet."""
+
+from pathlib import Path
+
+import pytest
+
+from bible_alignments.burrito import AlignmentSet, Manager
+
+pytest.importorskip("pyarrow")
+
+from bible_alignments.burrito import parquet  # noqa: E402
+
+
+@pytest.fixture
+def mgr(tinyset: AlignmentSet) -> Manager:
+    """Return a Manager for tinyset."""
+    return Manager(tinyset)
+
+
+@pytest.fixture
+def export(mgr: Manager, tmp_path: Path) -> parquet.ParquetExport:
+    """Return a ParquetExport for mgr."""
+    return parquet.ParquetExport(parquet.write_manager(mgr, tmp_path / "export"))
+
+
+class TestBcvFilter:
+    """Test bcv_filter()."""
+
+    def test_filter(self) -> None:
+        """Test filters for references."""
+        assert parquet.bcv_filter("41") == [("source_bcv", ">=", "41"), ("source_bcv", "<", "41\uffff")]
+        assert parquet.bcv_filter("41004", column="id") == [("id", ">=", "41004"), ("id", "<", "41004\uffff")]
+        assert parquet.bcv_filter("09999999")[1] == ("source_bcv", "<", "09999999\uffff")
+
+    def test_last_book(self, tmp_path: Path) -> None:
+        """Test the upper bound isn't the next number, which would be '100' for '99'."""
+        pa, pq = pytest.importorskip("pyarrow"), pytest.importorskip("pyarrow.parquet")
+        pq.write_table(pa.table({"id": ["98001001001", "99001001001", "99150006001"]}), tmp_path / "ids.parquet")
+        table = pq.read_table(tmp_path / "ids.parquet", filters=parquet.bcv_filter("99", column="id"))
+        assert table.to_pydict() == {"id": ["99001001001", "99150006001"]}
+
+    def test_invalid(self) -> None:
+        """Test invalid references."""
+        for reference in ("4", "4100400", "41004003001", "MRK"):
+            with pytest.raises(ValueError):
+                parquet.bcv_filter(reference)
+
+
+class TestParquetExport:
+    """Test write_manager() and ParquetExport."""
+
+    def test_tables(self, export: parquet.ParquetExport) -> None:
+        """Test the exported tables."""
+        assert export.alignmentset.identifier == "SBLGNT-BSB-manual"
+        records = export.table("records").to_pydict()
+        # the bad record was dropped by Manager
+        assert records["id"] == ["41004003.001", "41004003.002", "41004003.003", "41004004.001", "41004004.002"]
+        assert records["source_bcv"] == ["41004003"] * 3 + ["41004004"] * 2
+        assert records["origin"] == ["manual"] * 5
+        targets = export.table("record_targets", filters=[("id", "=", "41004003.003")]).to_pydict()
+        assert targets["selector"] == ["41004003004", "41004003005"]
+        assert targets["record"] == [2, 2]
+        assert export.table("sources").num_rows == 5
+        assert export.table("targets", columns=["skip_space_after"]).to_pydict() == {
+            "skip_space_after": [True] + [False] * 7
+        }
+
+    def test_filters(self, export: parquet.ParquetExport) -> None:
+        """Test reading a subset of a table."""
+        records = export.table("records", filters=parquet.bcv_filter("41004004"), columns=["id"])
+        assert records.to_pydict() == {"id": ["41004004.001", "41004004.002"]}
+        assert export.table("records", filters=parquet.bcv_filter("42")).num_rows == 0
+        assert export.table("sources", filters=parquet.bcv_filter("41004003", column="id")).num_rows == 3
+
+    def test_alignmentgroup(self, mgr: Manager, export: parquet.ParquetExport) -> None:
+        """Test reading the AlignmentGroup."""
+        algroup = export.read_alignmentgroup()
+        assert algroup == mgr.alignmentgroup
+        verse = export.read_alignmentgroup(filters=parquet.bcv_filter("41004003"))
+        assert verse.records == mgr.alignmentgroup.records[:3]
+
+    def test_manager(self, mgr: Manager, export: parquet.ParquetExport) -> None:
+        """Test reading a Manager."""
+        exported = export.manager()
+        assert dict(exported.sourceitems) == dict(mgr.sourceitems)
+        assert dict(exported.targetitems) == dict(mgr.targetitems)
+        assert exported.alignmentrecords == mgr.alignmentrecords
+        assert list(exported) == list(mgr)
+        assert exported["41004003"].alignments == mgr["41004003"].alignments
+        verse = export.manager(reference="41004004")
+        assert list(verse) == ["41004004"]
+        assert len(verse.sourceitems) == 2
+        assert len(verse.targetitems) == 3
+
+    def test_no_records(self, export: parquet.ParquetExport) -> None:
+        """Test references and filters with no records."""
+        with pytest.raises(KeyError, match="42"):
+            export.manager(reference="42")
+        with pytest.raises(ValueError):
+            export.read_alignmentgroup(filters=parquet.bcv_filter("41004005"))
@@ -0,0 +1,109 @@
+"""Test code in burrito.snapshot."""
+
+import json
+from pathlib import Path
+import shutil
+
+import numpy as np
+import pytest
+
+from bible_alignments.burrito import AlignmentSet, Manager
+from bible_alignments.burrito.BadRecord import Reason
+from bible_alignments.burrito import snapshot
+
+
+@pytest.fixture
+def snapshotdir(tmp_path: Path) -> Path:
+    """Return a directory for snapshots."""
+    return tmp_path / "snapshots"
+
+
+@pytest.fixture
+def mgr(tinyset: AlignmentSet, snapshotdir: Path) -> Manager:
+    """Return a Manager for tinyset, saving a snapshot."""
+    return Manager(tinyset, snapshotdir=snapshotdir)
+
+
+def _assert_same(restored: Manager, mgr: Manager) -> None:
+    """Assert restored has the same data as mgr."""
+    assert dict(restored.sourceitems) == dict(mgr.sourceitems)
+    assert dict(restored.targetitems) == dict(mgr.targetitems)
+    assert restored.alignmentgroup == mgr.alignmentgroup
+    assert restored.alignmentrecords == mgr.alignmentrecords
+    assert restored.badrecords == mgr.badrecords
+    for key in Manager.bcvkeys:
+        assert restored.bcv[key] == mgr.bcv[key], key
+    assert restored.data == mgr.data
+
+
+class TestSnapshot:
+    """Test saving and restoring Managers."""
+
+    def test_restore(self, mgr: Manager, tinyset: AlignmentSet, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test restoring a Manager without checking records again."""
+        assert mgr.snapshotpath.exists()
+        monkeypatch.setattr(Manager, "_bad_reason", lambda self, arec: pytest.fail("records checked"))
+        restored = Manager(tinyset, snapshotdir=mgr.snapshotpath.parent)
+        _assert_same(restored, mgr)
+        # records are shared, as when built
+        assert restored.alignmentgroup.records[0] is restored.alignmentrecords["41004003.001"]
+        assert restored["41004003"].sources is restored.bcv["sources"]["41004003"]
+        badrec = restored.badrecords["41004004.003"]
+        assert badrec.reason == Reason.MISSINGTARGETALL
+        assert badrec.data == ["41004004009"]
+
+    def test_keepbadrecords(
+        self, mgr: Manager, tinyset: AlignmentSet, snapshotdir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test options that change the data have their own snapshot, and don't remove each other's."""
+        kept = Manager(tinyset, snapshotdir=snapshotdir, keepbadrecords=True)
+        assert kept.snapshotpath != mgr.snapshotpath
+        assert sorted(snapshotdir.iterdir()) == sorted([mgr.snapshotpath, kept.snapshotpath])
+        monkeypatch.setattr(Manager, "_check_records", lambda self: pytest.fail("records checked"))
+        restored = Manager(tinyset, snapshotdir=snapshotdir, keepbadrecords=True)
+        _assert_same(restored, kept)
+        assert "41004004.003" in restored.alignmentrecords
+        assert restored.badrecords["41004004.003"].record is restored.alignmentrecords["41004004.003"]
+        _assert_same(Manager(tinyset, snapshotdir=snapshotdir), mgr)
+
+    def test_changed(self, mgr: Manager, tinyset: AlignmentSet, snapshotdir: Path) -> None:
+        """Test a snapshot isn't used when an input file changes."""
+        alignments = json.loads(tinyset.alignmentpath.read_text(encoding="utf-8"))
+        alignments["records"] = alignments["records"][:2]
+        tinyset.alignmentpath.write_text(json.dumps(alignments), encoding="utf-8")
+        changed = Manager(tinyset, snapshotdir=snapshotdir)
+        assert changed.snapshotpath != mgr.snapshotpath
+        assert len(changed.alignmentrecords) == 2
+        # the old snapshot is removed
+        assert list(snapshotdir.iterdir()) == [changed.snapshotpath]
+
+    def test_same_identifier(self, mgr: Manager, tinyset: AlignmentSet, snapshotdir: Path, tmp_path: Path) -> None:
+        """Test alignment sets with the same identifier in different directories keep their own snapshots."""
+        for dirname in ("sources", "eng"):
+            shutil.copytree(tmp_path / dirname, tmp_path / "other" / dirname)
+        otherset = AlignmentSet(
+            sourceid="SBLGNT",
+            targetid="BSB",
+            targetlanguage="eng",
+            sourcedatapath=tmp_path / "other" / "sources",
+            langdatapath=tmp_path / "other" / "eng",
+        )
+        other = Manager(otherset, snapshotdir=snapshotdir)
+        assert other.snapshotpath != mgr.snapshotpath
+        assert sorted(snapshotdir.iterdir()) == sorted([mgr.snapshotpath, other.snapshotpath])
+
+    def test_version(self, mgr: Manager, tinyset: AlignmentSet) -> None:
+        """Test snapshots with another format version are rejected."""
+        with np.load(mgr.snapshotpath) as archive:
+            arrays = dict(archive)
+        meta = json.loads(arrays["meta"].tobytes())
+        meta["version"] = 0
+        arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+        np.savez(mgr.snapshotpath, **arrays)
+        with pytest.raises(ValueError):
+            snapshot.load_snapshot(Manager.__new__(Manager), mgr.snapshotpath)
+
+    def test_options(self, tinyset: AlignmentSet, snapshotdir: Path) -> None:
+        """Test options that can't be used with snapshots."""
+        with pytest.raises(ValueError):
+            Manager(tinyset, snapshotdir=snapshotdir, lazy=True)
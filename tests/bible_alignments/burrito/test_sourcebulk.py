@@ -0,0 +1,74 @@
+"""Test bulk (columnar) reading of source data."""
+
+from pathlib import Path
+import unicodedata
+
+import pytest
+
+from bible_alignments.burrito import SourceReader
+from bible_alignments.burrito.source import read_source_columns
+
+# includes OT and NT identifiers, with and without prefixes and
+# parts, Strong's values needing normalization, and text needing
+# NFKC normalization
+SOURCEROWS = [
+    ("id", "altId", "text", "strongs", "gloss", "lemma", "pos", "morph"),
+    ("n41004003001", "Ἀκούετε-1", "Ἀκούετε", "0191", "Listen", "ἀκούω", "verb", "V-PAM-2P"),
+    ("410040030021", "ἰδοὺ-1", unicodedata.normalize("NFD", "ἰδοὺ"), "G2400", "Behold", "ἰδού", "intj", "I"),
+    ("41004003003", "ἐξῆλθεν-1", "ἐξῆλθεν", "1831a", "went out", "ἐξέρχομαι", "verb", "V-2AAI-3S"),
+    ("o010010010011", "בְּ-1", "בְּ", "H9003", "in", "בְּ", "prep", "R"),
+    ("01001001002", "רֵאשִׁ֖ית-1", "רֵאשִׁ֖ית", "H7225", "beginning", "רֵאשִׁית", "noun", "Ncfsa"),
+    ("o010010010012", "x-1", "x", "H", "", "", "", ""),
+    ("010010010031", "y-1", unicodedata.normalize("NFD", "ἰδοὺ"), "", "", "", "", ""),
+]
+
+
+@pytest.fixture
+def sourcepath(tmp_path: Path) -> Path:
+    """Return the path to a small source TSV file."""
+    tsvpath = tmp_path / "SBLGNT.tsv"
+    tsvpath.write_text("".join("\t".join(row) + "\n" for row in SOURCEROWS), encoding="utf-8")
+    return tsvpath
+
+
+class TestBulkSourceReader:
+    """Test SourceReader(bulk=True) and read_source_columns()."""
+
+    def test_same(self, sourcepath: Path) -> None:
+        """Test bulk reading matches reading by row."""
+        byrow = SourceReader(sourcepath)
+        bulk = SourceReader(sourcepath, bulk=True)
+        assert list(bulk) == list(byrow)
+        for bulktoken, rowtoken in zip(bulk.values(), byrow.values()):
+            assert bulktoken == rowtoken
+            assert bulktoken.asdict() == rowtoken.asdict()
+        assert list(bulk) == [
+            "41004003001",
+            "41004003002",
+            "41004003003",
+            "010010010011",
+            "010010010021",
+            "010010010012",
+            "010010010031",
+        ]
+
+    def test_columns(self, sourcepath: Path) -> None:
+        """Test getting columns without tokens."""
+        columns = read_source_columns(sourcepath)
+        assert set(columns) == set(SourceReader.inmap.values())
+        assert columns["strong"][:3] == ["G0191", "G2400", "G1831a"]
+        # NFKC only for NT
+        assert columns["text"][1] == unicodedata.normalize("NFKC", SOURCEROWS[2][2])
+        assert columns["text"][6] == SOURCEROWS[7][2]
+        # missing column
+        assert columns["gloss2"] == [""] * 7
+
+    def test_invalid(self, tmp_path: Path) -> None:
+        """Test invalid identifiers raise the same errors as by row."""
+        for badid in ("n01001001001", "4100400300", "o41004003001"):
+            tsvpath = tmp_path / "bad.tsv"
+            tsvpath.write_text(f"id\ttext\n41004003001\ta\n{badid}\tb\n", encoding="utf-8")
+            with pytest.raises(AssertionError):
+                SourceReader(tsvpath)
+            with pytest.raises(AssertionError):
+                SourceReader(tsvpath, bulk=True)
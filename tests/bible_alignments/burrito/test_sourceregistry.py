@@ -0,0 +1,56 @@
+"""Test SourceRegistry and sharing source data across Managers."""
+
+import os
+
+import pytest
+
+from bible_alignments.burrito import AlignmentSet, Manager
+from bible_alignments.burrito.source import SourceRegistry, sourceregistry
+
+
+class TestSourceRegistry:
+    """Test SourceRegistry()."""
+
+    def test_get(self, tinyset: AlignmentSet) -> None:
+        """Test readers are shared and frozen."""
+        registry = SourceRegistry()
+        reader = registry.get(tinyset.sourcepath)
+        assert registry.get(tinyset.sourcepath) is reader
+        assert tinyset.sourcepath in registry
+        assert len(reader) == 5
+        assert reader.frozen
+        with pytest.raises(TypeError):
+            reader["41004003001"] = reader["41004003002"]
+        with pytest.raises(TypeError):
+            del reader["41004003001"]
+
+    def test_changed(self, tinyset: AlignmentSet) -> None:
+        """Test a reader is replaced when its file changes."""
+        registry = SourceRegistry()
+        reader = registry.get(tinyset.sourcepath)
+        with tinyset.sourcepath.open("a", encoding="utf-8") as f:
+            f.write("\t".join(("n41004004003", "τις-1", "τις", "5100", "", "", "τις", "pron", "X")) + "\n")
+        stat = tinyset.sourcepath.stat()
+        os.utime(tinyset.sourcepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        changed = registry.get(tinyset.sourcepath)
+        assert changed is not reader
+        assert len(changed) == 6
+        assert len(registry) == 1
+
+    def test_evict(self, tinyset: AlignmentSet) -> None:
+        """Test evicting readers."""
+        registry = SourceRegistry()
+        reader = registry.get(tinyset.sourcepath)
+        registry.evict(tinyset.sourcepath)
+        assert len(registry) == 0
+        assert registry.get(tinyset.sourcepath) is not reader
+        registry.evict()
+        assert len(registry) == 0
+
+    def test_manager(self, tinyset: AlignmentSet) -> None:
+        """Test Managers sharing source data."""
+        first = Manager(tinyset, sharesources=True)
+        second = Manager(tinyset, sharesources=True, lazy=True)
+        assert first.sourceitems is second.sourceitems
+        assert Manager(tinyset).sourceitems is not first.sourceitems
+        sourceregistry.evict(tinyset.sourcepath)
@@ -0,0 +1,76 @@
+"""Test bulk (columnar) reading of target data."""
+
+from pathlib import Path
+
+import pytest
+
+from bible_alignments.burrito import TargetReader
+from bible_alignments.burrito.target import read_target_columns
+
+# includes word parts, missing source_verse values, varied boolean
+# values, an empty token, and a duplicate
+TARGETROWS = [
+    ("id", "source_verse", "text", "skip_space_after", "exclude", "isPunc"),
+    ("410040030011", "41004003", "Listen", "", "", ""),
+    ("410040030021", "", "!", "y", "True", "TRUE"),
+    ("410040030031", "41004002", "Behold", "n", "false", "Yes"),
+    ("410040030041", "", "", "Y", "", "x"),
+    ("41004003005", "", "a", "true", "y", ""),
+    ("410040030031", "41004003", "again", "", "y", ""),
+]
+
+
+@pytest.fixture
+def targetpath(tmp_path: Path) -> Path:
+    """Return the path to a small target TSV file."""
+    tsvpath = tmp_path / "nt_BSB.tsv"
+    tsvpath.write_text("".join("\t".join(row) + "\n" for row in TARGETROWS), encoding="utf-8")
+    return tsvpath
+
+
+class TestBulkTargetReader:
+    """Test TargetReader(bulk=True) and read_target_columns()."""
+
+    @pytest.mark.parametrize("keepwordpart", [False, True])
+    def test_same(self, targetpath: Path, keepwordpart: bool) -> None:
+        """Test bulk reading matches reading by row."""
+        with pytest.warns(UserWarning, match="duplicated"):
+            byrow = TargetReader(targetpath, keepwordpart=keepwordpart)
+        with pytest.warns(UserWarning, match="duplicated"):
+            bulk = TargetReader(targetpath, keepwordpart=keepwordpart, bulk=True)
+        assert list(bulk) == list(byrow)
+        for bulktoken, rowtoken in zip(bulk.values(), byrow.values()):
+            assert bulktoken == rowtoken
+            assert bulktoken.asdict(fields=TargetReader.inmap.values()) == rowtoken.asdict(
+                fields=TargetReader.inmap.values()
+            )
+        assert list(bulk.badtokens) == list(byrow.badtokens)
+
+    def test_columns(self, targetpath: Path) -> None:
+        """Test getting columns without tokens."""
+        columns = read_target_columns(targetpath)
+        assert set(columns) == set(TargetReader.inmap.values())
+        assert columns["id"][:2] == ["41004003001", "41004003002"]
+        assert columns["source_verse"][:3] == ["41004003", "41004003", "41004002"]
+        assert columns["skip_space_after"] == [False, True, False, True, True, False]
+        assert columns["exclude"] == [False, True, False, False, True, True]
+        assert columns["isPunc"] == [False, True, False, False, False, False]
+        # missing columns
+        assert columns["isPrimary"] == [False] * 6
+        assert columns["transType"] == [""] * 6
+        assert read_target_columns(targetpath, keepwordpart=True)["id"][0] == "410040030011"
+
+    def test_badtokens(self, targetpath: Path) -> None:
+        """Test empty tokens are collected."""
+        with pytest.warns(UserWarning):
+            bulk = TargetReader(targetpath, bulk=True)
+        assert list(bulk.badtokens) == ["41004003004"]
+
+    def test_store(self, targetpath: Path, tmp_path: Path) -> None:
+        """Test bulk reading into a TargetStore."""
+        with pytest.warns(UserWarning):
+            byrow = TargetReader(targetpath)
+        with pytest.warns(UserWarning):
+            stored = TargetReader(targetpath, storedir=tmp_path / "store", bulk=True)
+        assert dict(stored.items()) == dict(byrow.items())
+        assert list(stored.badtokens) == list(byrow.badtokens)
@@ -0,0 +1,116 @@
+"""Test TargetStore and TargetReader with a store directory."""
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bible_alignments.burrito import AlignmentSet, Manager, TargetReader
+from bible_alignments.burrito.target import TargetStore
+from bible_alignments.burrito.util import BCVIndex
+
+TARGETROWS = [
+    ("id", "source_verse", "text", "skip_space_after", "exclude", "isPunc", "isPrimary"),
+    ("410040030011", "41004003", "“", "y", "", "y", ""),
+    ("410040030021", "41004003", "Listen", "", "", "", "y"),
+    ("410040030031", "41004003", "!", "", "", "True", ""),
+    ("410040030041", "", "", "", "y", "", ""),
+]
+
+
+@pytest.fixture
+def targetpath(tmp_path: Path) -> Path:
+    """Return the path to a small target TSV file."""
+    tsvpath = tmp_path / "nt_BSB.tsv"
+    tsvpath.write_text("".join("\t".join(row) + "\n" for row in TARGETROWS), encoding="utf-8")
+    return tsvpath
+
+
+class TestTargetStore:
+    """Test TargetReader() with storedir."""
+
+    def test_mapping(self, targetpath: Path, tmp_path: Path) -> None:
+        """Test the store matches reading into a dict."""
+        plain = TargetReader(targetpath)
+        stored = TargetReader(targetpath, storedir=tmp_path / "store")
+        assert isinstance(stored.data, TargetStore)
+        assert stored.storepath.is_dir()
+        assert len(stored) == len(plain) == 4
+        assert list(stored) == list(plain) == ["41004003001", "41004003002", "41004003003", "41004003004"]
+        assert list(stored.values()) == list(plain.values())
+        assert "41004003002" in stored
+        assert "41004003009" not in stored
+        assert 41004003002 not in stored
+        with pytest.raises(KeyError):
+            stored["41004003009"]
+
+    def test_values(self, targetpath: Path, tmp_path: Path) -> None:
+        """Test materialized Target values."""
+        stored = TargetReader(targetpath, storedir=tmp_path / "store")
+        listen = stored["41004003002"]
+        assert listen.text == "Listen"
+        assert listen.isPrimary and not listen.isPunc
+        assert stored["41004003001"].skip_space_after
+        assert stored["41004003003"].isPunc
+        # source_verse is filled from the ID
+        assert stored["41004003004"].source_verse == "41004003"
+        assert stored["41004003004"].exclude
+        assert list(stored.badtokens) == ["41004003004"]
+
+    def test_reuse(self, targetpath: Path, tmp_path: Path) -> None:
+        """Test the store is reused, and replaced when the file changes."""
+        storedir = tmp_path / "store"
+        first = TargetReader(targetpath, storedir=storedir)
+        assert TargetReader(targetpath, storedir=storedir).storepath == first.storepath
+        with targetpath.open("a", encoding="utf-8") as f:
+            f.write("\t".join(("410040030051", "41004003", "A", "", "", "", "")) + "\n")
+        second = TargetReader(targetpath, storedir=storedir)
+        assert second.storepath != first.storepath
+        assert len(second) == 5
+        assert not first.storepath.exists()
+
+    def test_term_tokens(self, targetpath: Path, tmp_path: Path) -> None:
+        """Test term lookups use the store's columns, without making every Target."""
+        plain = TargetReader(targetpath)
+        stored = TargetReader(targetpath, storedir=tmp_path / "store")
+        assert stored.term_tokens("Listen") == plain.term_tokens("Listen")
+        assert stored.term_tokens("listen", lowercase=True) == plain.term_tokens("listen", lowercase=True)
+        assert stored.term_tokens("41004003", tokenattr="source_verse") == plain.term_tokens(
+            "41004003", tokenattr="source_verse"
+        )
+        assert stored.term_tokens("missing") == stored.term_tokens("") == []
+        # still backed by the store, and the indexes only hold rows
+        assert isinstance(stored.data, TargetStore)
+        for index in stored._termindexes.values():
+            assert all(isinstance(rows, np.ndarray) for rows in index.values())
+        assert stored.term_tokens("Listen")[0] is not stored.term_tokens("Listen")[0]
+        # non-string attributes are indexed by token
+        assert stored.term_tokens(True, tokenattr="isPunc") == plain.term_tokens(True, tokenattr="isPunc")
+
+    def test_pickle(self, targetpath: Path, tmp_path: Path) -> None:
+        """Test pickling by reference to the store."""
+        stored = TargetReader(targetpath, storedir=tmp_path / "store")
+        restored = pickle.loads(pickle.dumps(stored.data))
+        assert restored.storepath == stored.storepath
+        assert restored["41004003002"] == stored["41004003002"]
+
+
+class TestManagerStore:
+    """Test Manager() with storedir."""
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_shared(self, tinyset: AlignmentSet, tmp_path: Path, lazy: bool) -> None:
+        """Test targets are grouped as identifiers, and VerseData instances share one Target for each token."""
+        mgr = Manager(tinyset, storedir=tmp_path / "store", lazy=lazy)
+        plain = Manager(tinyset)
+        for key in ("targets", "target_sourceverses"):
+            index = mgr.bcv[key]
+            assert isinstance(index, BCVIndex)
+            assert index.offsets and all(isinstance(value, str) for value in index._values)
+        for bcvid in plain:
+            vd = mgr[bcvid]
+            assert vd.targets == plain[bcvid].targets
+            assert vd.alignments == plain[bcvid].alignments
+            versetargets = {id(trg) for trg in vd.targets}
+            assert all(id(trg) in versetargets for _, targets in vd.alignments for trg in targets)
@@ -0,0 +1,69 @@
+"""Test code in burrito.tokenids."""
+
+import numpy as np
+import pytest
+
+from bible_alignments.burrito import BaseToken, tokenids
+
+IDENTIFIERS = ["n41004003001", "410040030011", "o010010010011", "01001001001", "66022021010"]
+
+
+class TestEncode:
+    """Test encoding and decoding identifiers."""
+
+    def test_roundtrip(self) -> None:
+        """Test identifiers survive encoding."""
+        for identifier in IDENTIFIERS:
+            assert tokenids.decode(tokenids.encode(identifier)) == identifier
+        values = tokenids.encode_many(IDENTIFIERS)
+        assert values.dtype == np.int64
+        assert values.tolist() == [tokenids.encode(identifier) for identifier in IDENTIFIERS]
+        assert tokenids.decode_many(values) == IDENTIFIERS
+        assert len(tokenids.encode_many([])) == 0
+        assert BaseToken(id="410040030011", text="").idint == tokenids.encode("410040030011")
+
+    def test_order(self) -> None:
+        """Test encodings sort in identifier order."""
+        identifiers = sorted(["41004003001", "410040030011", "410040030012", "40028020001", "41010001002", "01001001001"])
+        values = tokenids.encode_many(identifiers)
+        assert (np.diff(values) > 0).all()
+
+    def test_invalid(self) -> None:
+        """Test invalid identifiers."""
+        for bad in ["", "4100400300", "4100400300a", "x41004003001", "4100400300112", "n410040030011234"]:
+            with pytest.raises(ValueError):
+                tokenids.encode(bad)
+            with pytest.raises(ValueError):
+                tokenids.encode_many(["41004003001", bad])
+
+    def test_strip_canon(self) -> None:
+        """Test comparing prefixed and unprefixed identifiers."""
+        values = tokenids.encode_many(["n41004003001", "41004003001"])
+        assert values[0] != values[1]
+        assert tokenids.strip_canon(values)[0] == tokenids.strip_canon(values)[1]
+
+
+class TestRanges:
+    """Test reference ranges."""
+
+    def test_bcv_ints(self) -> None:
+        """Test BCV references for encodings."""
+        assert tokenids.bcv_ints(tokenids.encode_many(IDENTIFIERS)).tolist() == [
+            41004003,
+            41004003,
+            1001001,
+            1001001,
+            66022021,
+        ]
+
+    def test_select(self) -> None:
+        """Test selecting values by reference."""
+        identifiers = ["41004002009", "41004003001", "41004003002", "41004004001", "41005001001", "42001001001"]
+        values = np.sort(tokenids.encode_many(identifiers))
+        assert tokenids.decode_many(tokenids.select(values, "41004003")) == identifiers[1:3]
+        assert tokenids.decode_many(tokenids.select(values, "41004")) == identifiers[:4]
+        assert tokenids.decode_many(tokenids.select(values, "41")) == identifiers[:5]
+        assert tokenids.decode_many(tokenids.select(values, "41004003002")) == ["41004003002"]
+        assert len(tokenids.select(values, "43")) == 0
+        with pytest.raises(ValueError):
+            tokenids.reference_range("4100")
@@ -0,0 +1,98 @@
+"""Test code in burrito.util."""
+
+from bible_alignments.burrito import AlignmentSet, BaseToken, SourceReader
+from bible_alignments.burrito.util import BCVIndex, bcv_offsets, groupby_bcv, id_to_bcv, index_terms
+
+
+def tokens(*identifiers: str) -> list[BaseToken]:
+    """Return a list of BaseToken instances for identifiers."""
+    return [BaseToken(id=identifier, text="") for identifier in identifiers]
+
+
+class TestGroupbyBCV:
+    """Test groupby_bcv() and bcv_offsets()."""
+
+    def test_unsorted(self) -> None:
+        """Test a BCV isn't split into several groups when values aren't sorted."""
+        toks = tokens("41004004001", "41004003001", "41004004002", "41004003002")
+        groups = groupby_bcv(iter(toks))
+        assert groups == {"41004004": [toks[0], toks[2]], "41004003": [toks[1], toks[3]]}
+        assert groupby_bcv([]) == {}
+
+    def test_offsets(self) -> None:
+        """Test a flat list and offsets, in order of first occurrence or sorted."""
+        identifiers = ["41004004001", "41004003001", "41004004002", "41004003002"]
+        values, offsets = bcv_offsets(identifiers, bcvfn=id_to_bcv)
+        assert values == ["41004004001", "41004004002", "41004003001", "41004003002"]
+        assert offsets == {"41004004": (0, 2), "41004003": (2, 4)}
+        values, offsets = bcv_offsets(identifiers, bcvfn=id_to_bcv, sort=True)
+        assert values == ["41004003001", "41004003002", "41004004001", "41004004002"]
+        assert list(offsets.items()) == [("41004003", (0, 2)), ("41004004", (2, 4))]
+
+
+class TestBCVIndex:
+    """Test BCVIndex()."""
+
+    def test_unsorted(self) -> None:
+        """Test grouping values that aren't sorted by BCV."""
+        bcvindex = BCVIndex(tokens("41004003001", "41004004001", "41004003002"))
+        assert list(bcvindex) == ["41004003", "41004004"]
+        assert [tok.id for tok in bcvindex["41004003"]] == ["41004003001", "41004003002"]
+        assert bcvindex.offsets == {"41004003": (0, 2), "41004004": (2, 3)}
+
+    def test_deferred(self) -> None:
+        """Test grouping is deferred until first use."""
+        calls = []
+        bcvindex = BCVIndex(["41004003001"], bcvfn=lambda identifier: calls.append(identifier) or id_to_bcv(identifier))
+        assert calls == []
+        assert "41004003" in bcvindex
+        assert calls == ["41004003001"]
+
+    def test_getter(self) -> None:
+        """Test storing keys and retrieving values."""
+        tokendict = {tok.id: tok for tok in tokens("41004003001", "41004003002")}
+        bcvindex = BCVIndex(tokendict, bcvfn=id_to_bcv, getter=tokendict.__getitem__)
+        assert bcvindex["41004003"] == list(tokendict.values())
+        assert len(bcvindex) == 1
+        assert bcvindex.get("41004004", []) == []
+
+    def test_fromoffsets(self) -> None:
+        """Test an index for values already grouped by BCV."""
+        values, offsets = bcv_offsets(["41004004001", "41004003001", "41004004002"], bcvfn=id_to_bcv)
+        bcvindex = BCVIndex.fromoffsets(values, offsets, getter=int)
+        assert list(bcvindex) == ["41004004", "41004003"]
+        assert bcvindex["41004004"] == [41004004001, 41004004002]
+
+    def test_groupgetter(self) -> None:
+        """Test retrieving the values for a BCV with one call."""
+        calls = []
+        bcvindex = BCVIndex(
+            ["41004003001", "41004004001", "41004003002"],
+            bcvfn=id_to_bcv,
+            groupgetter=lambda keys: calls.append(keys) or [int(key) for key in keys],
+        )
+        assert bcvindex["41004003"] == [41004003001, 41004003002]
+        assert calls == [["41004003001", "41004003002"]]
+
+
+class TestTermIndex:
+    """Test index_terms() and its use by term_tokens()."""
+
+    def test_index_terms(self) -> None:
+        """Test indexing tokens by value."""
+        toks = [BaseToken(id="41004003001", text="Listen"), BaseToken(id="41004003002", text="")]
+        toks.append(BaseToken(id="41004003003", text="listen"))
+        assert index_terms(toks) == {"Listen": [toks[0]], "listen": [toks[2]]}
+        assert index_terms(toks, lowercase=True) == {"listen": [toks[0], toks[2]]}
+
+    def test_term_tokens(self, tinyset: AlignmentSet) -> None:
+        """Test term_tokens() keeps up with changes to the reader."""
+        sr = SourceReader(tinyset.sourcepath)
+        assert [token.id for token in sr.term_tokens("verb", tokenattr="pos")] == ["41004003001", "41004003003", "41004004002"]
+        # results are copies
+        sr.term_tokens("verb", tokenattr="pos").clear()
+        assert len(sr.term_tokens("verb", tokenattr="pos")) == 3
+        del sr["41004003001"]
+        assert [token.id for token in sr.term_tokens("verb", tokenattr="pos")] == ["41004003003", "41004004002"]
+        sr["41004003001"] = sr["41004003003"]
+        assert len(sr.term_tokens("ἐξέρχομαι", tokenattr="lemma")) == 2
@@ -0,0 +1,201 @@
+"""Test code in catalog."""
+
+import os
+from pathlib import Path
+import warnings
+
+import pytest
+
+from bible_alignments import catalog
+from bible_alignments.catalog import Catalog, find_tomlfiles, scan_root
+
+TOMLDATA = """[alignment]
+format = "Scripture Burrito Alignment"
+identifier = "SBLGNT-BSB-manual"
+license = "CC-BY 4.0"
+process = "manual"
+scope = "NT"
+team = "Example"
+
+[source]
+identifier = "SBLGNT"
+license = "CC-BY 4.0"
+
+[target]
+identifier = "BSB"
+license = "Public domain"
+name = {eng = "Berean Standard Bible"}
+url = "https://berean.bible"
+copyright = ""
+"""
+
+
+def _write_toml(path: Path, content: str) -> None:
+    """Write content to path, with a different modification time."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    previous = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(previous + 10**9, previous + 10**9))
+
+
+@pytest.fixture
+def catalogclass(tmp_path: Path) -> type[Catalog]:
+    """Return a Catalog subclass for data under tmp_path."""
+    datapath = tmp_path / "data"
+    _write_toml(datapath / "eng" / "alignments" / "BSB" / "SBLGNT-BSB-manual.toml", TOMLDATA)
+    # not a language: no alignments directory
+    (datapath / "sources").mkdir()
+
+    class TmpCatalog(Catalog):
+        alignments = datapath
+        catalogpath = datapath / "catalog.tsv"
+        cachepath = datapath / ".catalog-cache.json"
+
+    return TmpCatalog
+
+
+class TestCatalog:
+    """Test Catalog."""
+
+    def test_write(self, catalogclass: type[Catalog]) -> None:
+        """Test writing the catalog."""
+        cat = catalogclass()
+        assert cat.languages == ["eng"]
+        assert cat.versions == [("eng", "BSB")]
+        assert cat.changed == {"eng+BSB+SBLGNT-BSB-manual"}
+        assert cat.write()
+        lines = cat.catalogpath.read_text(encoding="utf-8").splitlines()
+        assert lines[0].split("\t") == cat.fieldnames
+        row = dict(zip(cat.fieldnames, lines[1].split("\t")))
+        assert row["lang+version+alignment"] == "eng+BSB+SBLGNT-BSB-manual"
+        assert row["target.name"] == "'Berean Standard Bible'@eng"
+        assert row["alignment.scope"] == "NT"
+
+    def test_cached(self, catalogclass: type[Catalog]) -> None:
+        """Test an unchanged catalog isn't parsed or written again."""
+        catalogclass().write()
+        mtime = catalogclass.catalogpath.stat().st_mtime_ns
+        cat = catalogclass()
+        assert cat.changed == set()
+        assert cat.tomldicts["eng+BSB+SBLGNT-BSB-manual"]["alignment"]["team"] == "Example"
+        assert not cat.write()
+        assert catalogclass.catalogpath.stat().st_mtime_ns == mtime
+
+    def test_changed(self, catalogclass: type[Catalog]) -> None:
+        """Test changed and new TOML files are parsed again."""
+        catalogclass().write()
+        tomlpath = catalogclass.alignments / "eng" / "alignments" / "BSB" / "SBLGNT-BSB-manual.toml"
+        _write_toml(tomlpath, TOMLDATA.replace('"Example"', '"Other"'))
+        _write_toml(tomlpath.with_name("SBLGNT-BSB-other.toml"), TOMLDATA)
+        cat = catalogclass()
+        assert cat.changed == {"eng+BSB+SBLGNT-BSB-manual", "eng+BSB+SBLGNT-BSB-other"}
+        assert cat.write()
+        content = cat.catalogpath.read_text(encoding="utf-8")
+        assert "\tOther\t" in content
+        assert "eng+BSB+SBLGNT-BSB-other" in content
+
+    def test_header_mismatch(self, catalogclass: type[Catalog]) -> None:
+        """Test the cache isn't used with different standard attributes."""
+        catalogclass().write()
+
+        class OtherCatalog(catalogclass):
+            stdattrs = {**Catalog.stdattrs, "source": ["identifier"]}
+
+        assert OtherCatalog().changed == {"eng+BSB+SBLGNT-BSB-manual"}
+
+    def test_no_cache(self, catalogclass: type[Catalog]) -> None:
+        """Test catalogs without a cache."""
+        catalogclass.cachepath = None
+        catalogclass().write()
+        assert catalogclass().changed == {"eng+BSB+SBLGNT-BSB-manual"}
+        assert not (catalogclass.alignments / ".catalog-cache.json").exists()
+
+    def test_validate(self, catalogclass: type[Catalog]) -> None:
+        """Test warnings for missing standard attributes, only when parsed."""
+        tomlpath = catalogclass.alignments / "eng" / "alignments" / "BSB" / "SBLGNT-BSB-manual.toml"
+        _write_toml(tomlpath, TOMLDATA.replace('url = "https://berean.bible"\n', ""))
+        with pytest.warns(UserWarning, match="missing standard subkey url"):
+            catalogclass().write()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            catalogclass().write()
+
+
+@pytest.fixture
+def reporoots(tmp_path: Path) -> list[Path]:
+    """Return data roots for alignments-<lang> repositories under tmp_path."""
+    roots = [tmp_path / "alignments-eng" / "data", tmp_path / "alignments-hin" / "data"]
+    _write_toml(roots[0] / "alignments" / "BSB" / "SBLGNT-BSB-manual.toml", TOMLDATA)
+    _write_toml(roots[0] / "alignments" / "YLT" / "SBLGNT-YLT-manual.toml", TOMLDATA.replace("BSB", "YLT"))
+    _write_toml(roots[1] / "alignments" / "IRVHin" / "SBLGNT-IRVHin-manual.toml", TOMLDATA.replace("BSB", "IRVHin"))
+    return roots
+
+
+class TestScanRoot:
+    """Test find_tomlfiles() and scan_root()."""
+
+    def test_find_tomlfiles(self, catalogclass: type[Catalog], reporoots: list[Path]) -> None:
+        """Test both layouts of data roots."""
+        assert list(find_tomlfiles(catalogclass.alignments)) == ["eng+BSB+SBLGNT-BSB-manual"]
+        assert list(find_tomlfiles(reporoots[0])) == ["eng+BSB+SBLGNT-BSB-manual", "eng+YLT+SBLGNT-YLT-manual"]
+        assert list(find_tomlfiles(reporoots[1])) == ["hin+IRVHin+SBLGNT-IRVHin-manual"]
+
+    def test_errors(self, reporoots: list[Path], tmp_path: Path) -> None:
+        """Test errors are recorded, not raised."""
+        result = scan_root(tmp_path / "missing")
+        assert result.tomlfiles == {}
+        assert result.errors[0].startswith("Skipping")
+        _write_toml(reporoots[1] / "alignments" / "IRVHin" / "SBLGNT-IRVHin-manual.toml", "[alignment\n")
+        result = scan_root(reporoots[1])
+        assert result.changed == {"hin+IRVHin+SBLGNT-IRVHin-manual"}
+        assert len(result.errors) == 1
+        # still an error when cached
+        assert scan_root(reporoots[1], cached=result.entries).errors == result.errors
+
+    def test_unreadable(self, reporoots: list[Path], monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test files that aren't UTF-8, or are gone once found, are recorded as errors."""
+        tomlpath = reporoots[1] / "alignments" / "IRVHin" / "SBLGNT-IRVHin-manual.toml"
+        tomlpath.write_bytes(TOMLDATA.encode("utf-8") + b"\xff\n")
+        result = scan_root(reporoots[1])
+        assert result.errors[0].startswith("Skipping hin+IRVHin+SBLGNT-IRVHin-manual")
+        assert result.entries[str(tomlpath)]["tomldict"] is None
+        monkeypatch.setattr(catalog, "find_tomlfiles", lambda root: {"hin+IRVHin+gone": root / "gone.toml"})
+        result = scan_root(reporoots[1])
+        assert len(result.errors) == 1
+        assert result.tomlfiles == result.entries == {}
+
+
+class TestCatalogRoots:
+    """Test Catalog with several data roots."""
+
+    def test_merge(self, catalogclass: type[Catalog], reporoots: list[Path]) -> None:
+        """Test merging the alignments under each root."""
+        with pytest.warns(UserWarning, match="eng\\+BSB\\+SBLGNT-BSB-manual is also in"):
+            cat = catalogclass(roots=[*reporoots, catalogclass.alignments], threads=2)
+        assert [len(scan.tomlfiles) for scan in cat.scans] == [2, 1, 1]
+        assert [len(scan.errors) for scan in cat.scans] == [0, 0, 1]
+        assert all(scan.seconds > 0 for scan in cat.scans)
+        assert cat.languages == ["eng", "hin"]
+        assert cat.versions == [("eng", "BSB"), ("eng", "YLT"), ("hin", "IRVHin")]
+        # the first root wins
+        assert cat.tomlfiles["eng+BSB+SBLGNT-BSB-manual"].is_relative_to(reporoots[0])
+        assert cat.write()
+        assert list(cat.langverdicts) == [
+            "eng+BSB+SBLGNT-BSB-manual",
+            "eng+YLT+SBLGNT-YLT-manual",
+            "hin+IRVHin+SBLGNT-IRVHin-manual",
+        ]
+
+    def test_unreadable(self, catalogclass: type[Catalog], reporoots: list[Path]) -> None:
+        """Test a file that isn't UTF-8 doesn't stop the other roots."""
+        (reporoots[1] / "alignments" / "IRVHin" / "SBLGNT-IRVHin-manual.toml").write_bytes(b"\xff\xfe")
+        with pytest.warns(UserWarning, match="Skipping hin\\+IRVHin"):
+            cat = catalogclass(roots=reporoots, threads=2)
+        assert list(cat.tomldicts) == ["eng+BSB+SBLGNT-BSB-manual", "eng+YLT+SBLGNT-YLT-manual"]
+
+    def test_cached(self, catalogclass: type[Catalog], reporoots: list[Path]) -> None:
+        """Test the cache is shared across roots."""
+        catalogclass(roots=reporoots).write()
+        cat = catalogclass(roots=reporoots)
+        assert cat.changed == set()
+        assert not cat.write()
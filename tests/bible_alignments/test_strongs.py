@@ -2,7 +2,7 @@
 
 import pytest
 
-from bible_alignments import normalize_strongs
+from bible_alignments import normalize_strongs, normalize_strongs_many
 
 
 class TestNormalizeStrongs:
@@ -45,3 +45,29 @@ class TestNormalizeStrongs:
         """Test cases with pipes."""
         # special cases
         assert normalize_strongs("1886j|2050b", "H") == "H2050b"
+
+    def test_cached(self) -> None:
+        """Test repeated values are cached."""
+        normalize_strongs.cache_clear()
+        assert normalize_strongs("0191", "G") == "G0191"
+        assert normalize_strongs("0191", "G") == "G0191"
+        assert normalize_strongs.cache_info().hits == 1
+
+
+class TestNormalizeStrongsMany:
+    """Test normalize_strongs_many()."""
+
+    def test_column(self) -> None:
+        """Test normalizing a column of values."""
+        assert normalize_strongs_many(["191", "G2400", "191", "1537+4053"], prefix="G") == [
+            "G0191",
+            "G2400",
+            "G0191",
+            "G4053b",
+        ]
+        assert normalize_strongs_many([]) == []
+
+    def test_invalid(self) -> None:
+        """Test an invalid value raises ValueError."""
+        with pytest.raises(ValueError):
+            normalize_strongs_many(["191", "G19x1"], prefix="G")